@@ -1,10 +1,36 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash
+from flask import Flask, Response, abort, render_template, request, redirect, url_for, session, flash, jsonify
 import sqlite3
 from werkzeug.security import generate_password_hash, check_password_hash
-import requests
 from dotenv import load_dotenv
 import os
+import json
 import math
+import numpy as np
+
+from calculators import CALCULATORS, float_fields
+from batch import BatchError, evaluate_batch
+import db
+from rates import RateError, provider_from_env
+from trajectory import trajectories
+from oscillator import simulate as simulate_oscillator
+from processes import iter_process_chunks, process_curve, process_work
+from cycles import CYCLES, cycle_sweep, simulate_cycle
+import eos
+from tables import TableError, Tables
+import fluids
+from partition import thermodynamics as partition_thermodynamics
+import saha
+import jarzynski
+import information
+from uploads import read_chunks
+import units
+import constants
+import plotdata
+from cache import cache_from_env
+from jobs import JobError, JobLimitError, JobUnavailableError, queue_from_env
+from molsim import SIMULATIONS
+from metrics import metrics_from_env
+from assets import assets_from_env
 
 load_dotenv()  # loads variables from .env into environment
 
@@ -12,19 +38,79 @@ SECRET_KEY = os.getenv('SECRET_KEY')
 
 app = Flask(__name__)
 app.secret_key = 'your_secret_key'
+app.config['BATCH_MAX_ROWS'] = int(os.getenv('BATCH_MAX_ROWS', 100000))
+app.config['STREAM_MAX_POINTS'] = int(os.getenv('STREAM_MAX_POINTS', 10_000_000))
+# Curves embedded in a rendered page; larger ones go through the streaming API.
+PAGE_MAX_POINTS = 5000
+# Points a plotted curve is decimated to before it is embedded in a page.
+app.config['PLOT_MAX_POINTS'] = int(os.getenv('PLOT_MAX_POINTS', 1000))
 
 # Database Setup
-def init_db():
-    conn = sqlite3.connect('users.db')
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT NOT NULL UNIQUE,
-                    password TEXT NOT NULL)''')
-    conn.commit()
-    conn.close()
-
-init_db()
+if os.getenv('DATABASE_PATH'):
+    app.config['DATABASE'] = os.getenv('DATABASE_PATH')
+db.init_app(app)
+
+exchange_rates = provider_from_env()
+property_tables = Tables(os.getenv('TABLES_DIR') or
+                         os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'tables'))
+response_cache = cache_from_env()
+response_cache.float_fields = float_fields
+simulation_jobs = queue_from_env(app.config['DATABASE'])
+metrics = metrics_from_env()
+metrics.init_app(app)
+if hasattr(exchange_rates.backend, 'on_request'):
+    exchange_rates.backend.on_request = metrics.observe_outbound
+assets_from_env(app)
+
+# ---------------------------------
+# Calculator pages
+# ---------------------------------
+def _echo_items(echo):
+    return echo.items() if isinstance(echo, dict) else ((field, field) for field in echo)
+
+def calculator_page(template, name, mode_field=None, echo=(), digits=None, extra=None,
+                    series=None, error='Invalid input values'):
+    """Render ``template`` with the result of the registered calculator ``name``.
+
+    With ``mode_field`` the form selects ``<name>.<mode>``, the result is
+    labelled with that calculator's title, and ``echo``/``extra`` are looked
+    up per mode.  ``echo`` copies parsed inputs into the result, either as a
+    tuple of fields or ``{result_key: field}`` (a tuple of fields becomes a
+    list); ``digits`` rounds result keys; ``series`` builds plot data from the
+    parsed inputs.
+    """
+    result = None
+    if request.method == 'POST':
+        try:
+            result = {}
+            if mode_field:
+                mode = request.form[mode_field]
+                calc = CALCULATORS.get(f'{name}.{mode}')
+                if calc is None:
+                    return render_template(template, result=None)
+                result[mode_field] = calc.title
+                echo = echo.get(mode, ()) if echo else ()
+                extra = (extra or {}).get(mode)
+            else:
+                calc = CALCULATORS[name]
+
+            values = calc.parse(request.form)
+            result.update(calc.evaluate(**values))
+            for key, field in _echo_items(echo):
+                if isinstance(field, tuple):
+                    result[key] = [values[f] for f in field]
+                else:
+                    result[key] = values[field]
+            result.update(extra or {})
+            if series is not None:
+                result.update(series(**values))
+            for key, places in (digits or {}).items():
+                if key in result:
+                    result[key] = round(result[key], places)
+        except (KeyError, ValueError) as e:
+            metrics.count_error(e)
+            result = {'error': error}
+    return render_template(template, result=result)
 
 # Routes
 @app.route('/')
@@ -37,11 +123,7 @@ def login():
         username = request.form['username']
         password = request.form['password']
 
-        conn = sqlite3.connect('users.db')
-        c = conn.cursor()
-        c.execute("SELECT * FROM users WHERE username=?", (username,))
-        user = c.fetchone()
-        conn.close()
+        user = db.get_db().execute(db.FIND_USER, (username,)).fetchone()
 
         if user and check_password_hash(user[2], password):
             session['username'] = username
@@ -57,17 +139,14 @@ def register():
         username = request.form['username']
         password = generate_password_hash(request.form['password'])
 
-        conn = sqlite3.connect('users.db')
-        c = conn.cursor()
+        conn = db.get_db()
         try:
-            c.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, password))
-            conn.commit()
+            with conn:
+                conn.execute(db.INSERT_USER, (username, password))
             flash('Registration Successful! Please log in.')
             return redirect(url_for('login'))
         except sqlite3.IntegrityError:
             flash('Username already exists.')
-        finally:
-            conn.close()
 
     return render_template('register.html')
 
@@ -83,76 +162,76 @@ def logout():
     return redirect(url_for('login'))
 
 @app.route('/projectile', methods=['GET', 'POST'])
+@response_cache.memoize()
 def projectile():
     result = None
     if request.method == 'POST':
         try:
             u = float(request.form['velocity'])
             angle = float(request.form['angle'])
-            import math
-            R = (u**2 * math.sin(math.radians(2*angle))) / 9.8
-            H = (u**2 * (math.sin(math.radians(angle))**2)) / (2*9.8)
-            T = (2*u*math.sin(math.radians(angle))) / 9.8
-            result = {'range': R, 'height': H, 'time': T}
-        except:
+            h = float(request.form.get('height', 0) or 0)
+            g = float(request.form.get('gravity', 9.8) or 9.8)
+            drag = request.form.get('drag', 'none')
+            k = float(request.form.get('drag_coefficient', 0) or 0)
+
+            path = trajectories(u, angle, height=h, gravity=g, drag=drag,
+                                drag_coefficient=k, samples=100)
+            result = {
+                'range': float(path['range']),
+                'height': float(path['max_height']),
+                'time': float(path['flight_time']),
+                **plotdata.pack({'x': path['x'], 'y': path['y']},
+                                app.config['PLOT_MAX_POINTS'], 'x', 'y')
+            }
+        except (KeyError, ValueError) as e:
+            metrics.count_error(e)
             result = {'error': 'Invalid input'}
     return render_template('projectile.html', result=result)
 
+# Factors of the converter pages' units to each page's base unit, keyed by
+# the <option> values of the templates.
+TIME_RATES = units.rates({'seconds': 's', 'minutes': 'min', 'hours': 'h', 'days': 'day',
+                          'milliseconds': 'ms'}, 's')
+SPEED_RATES = units.rates({'mps': 'm/s', 'kmph': 'km/h', 'mph': 'mph', 'fps': 'ft/s',
+                           'knot': 'knot', 'cmps': 'cm/s'}, 'm/s')
+LITRE_RATES = units.rates({'litre': 'L', 'ml': 'mL', 'gallon': 'gal', 'm3': 'm³'}, 'L')
+VOLUME_RATES = units.rates({'m3': 'm³', 'cm3': 'cm³', 'litre': 'L'}, 'm³')
+PHYSICS_FACTORS = {'dyn': units.convert(1.0, 'N', 'dyn'), 'cal': units.convert(1.0, 'cal', 'J'),
+                   'atm': units.convert(1.0, 'atm', 'Pa'), 'hp': units.convert(1.0, 'hp', 'W'),
+                   'eV': units.convert(1.0, 'eV', 'J')}
+
 @app.route('/time_conversion')
 def time_conversion():
-    return render_template('time_conversion.html')
+    return render_template('time_conversion.html', rates=TIME_RATES)
 
 @app.route('/speed_conversion')
 def speed_conversion():
-    return render_template('speed_conversion.html')
+    return render_template('speed_conversion.html', rates=SPEED_RATES)
 
 @app.route('/kinetic_energy', methods=['GET', 'POST'])
+@response_cache.memoize()
 def kinetic_energy():
-    result = None
-    if request.method == 'POST':
-        try:
-            mass = float(request.form['mass'])
-            velocity = float(request.form['velocity'])
-            ke = 0.5 * mass * velocity ** 2
-            result = {'ke': ke}
-        except:
-            result = {'error': 'Invalid input'}
-    return render_template('kinetic_energy.html', result=result)
+    return calculator_page('kinetic_energy.html', 'kinetic_energy', error='Invalid input')
 
 @app.route('/litre_conversion')
 def litre_conversion():
-    return render_template('litre_conversion.html')
+    return render_template('litre_conversion.html', rates=LITRE_RATES)
 
 @app.route('/specific_heat_capacity', methods=['GET', 'POST'])
+@response_cache.memoize()
 def specific_heat_capacity():
-    result = None
-    if request.method == 'POST':
-        try:
-            m = float(request.form['mass'])
-            c = float(request.form['specific_heat'])
-            dT = float(request.form['change_temp'])
-            q = m * c * dT
-            result = {'heat': q}
-        except:
-            result = {'error': 'Invalid input'}
-    return render_template('specific_heat_capacity.html', result=result)
+    return calculator_page('specific_heat_capacity.html', 'specific_heat_capacity',
+                           error='Invalid input')
 
 @app.route('/basic_physics_conversion')
 def basic_physics_conversion():
-    return render_template('basic_physics_conversion.html')
+    return render_template('basic_physics_conversion.html', factors=PHYSICS_FACTORS)
 
 @app.route('/frequency_wavelength', methods=['GET', 'POST'])
+@response_cache.memoize()
 def frequency_wavelength():
-    result = None
-    if request.method == 'POST':
-        try:
-            speed = float(request.form['speed'])
-            frequency = float(request.form['frequency'])
-            wavelength = speed / frequency
-            result = {'wavelength': wavelength}
-        except:
-            result = {'error': 'Invalid input'}
-    return render_template('frequency_wavelength.html', result=result)
+    return calculator_page('frequency_wavelength.html', 'frequency_wavelength',
+                           error='Invalid input')
 
 @app.route('/currency_conversion', methods=['GET', 'POST'])
 def currency_conversion():
@@ -162,348 +241,176 @@ def currency_conversion():
             amount = float(request.form['amount'])
             from_currency = request.form['from_currency']
             to_currency = request.form['to_currency']
-            url = f"https://api.exchangerate-api.com/v4/latest/{from_currency}"
-            response = requests.get(url)
-            data = response.json()
-            converted = amount * data['rates'][to_currency]
+            converted = exchange_rates.convert(amount, from_currency, to_currency)
             result = {'converted': converted}
-        except:
+        except (KeyError, ValueError, RateError) as e:
+            metrics.count_error(e)
             result = {'error': 'Conversion failed'}
     return render_template('currency_conversion.html', result=result)
 
 @app.route('/energy_conversion', methods=['GET', 'POST'])
+@response_cache.memoize()
 def energy_conversion():
-    result = None
-    if request.method == 'POST':
-        try:
-            joules = float(request.form['joules'])
-            ev = joules / 1.602e-19
-            result = {'ev': ev}
-        except:
-            result = {'error': 'Invalid input'}
-    return render_template('energy_conversion.html', result=result)
+    return calculator_page('energy_conversion.html', 'energy_conversion', error='Invalid input')
 
 @app.route('/temperature_conversion')
 def temperature_conversion():
     return render_template('temperature_conversion.html')
 
 @app.route('/ohms_law', methods=['GET', 'POST'])
+@response_cache.memoize()
 def ohms_law():
-    result = None
-    if request.method == 'POST':
-        try:
-            voltage = float(request.form['voltage'])
-            current = float(request.form['current'])
-            resistance = voltage / current
-            result = {'resistance': resistance}
-        except:
-            result = {'error': 'Invalid input'}
-    return render_template('ohms_law.html', result=result)
+    return calculator_page('ohms_law.html', 'ohms_law', error='Invalid input')
 
 @app.route('/volume_conversion')
 def volume_conversion():
-    return render_template('volume_conversion.html')
+    return render_template('volume_conversion.html', rates=VOLUME_RATES)
 @app.route('/shm', methods=['GET', 'POST'])
+@response_cache.memoize()
 def shm():
     result = None
 
     if request.method == 'POST':
         try:
-            # Input values
-            mass = float(request.form['mass'])
-            k = float(request.form['k'])
-            A = float(request.form['amplitude'])
-
-            if mass <= 0 or k <= 0 or A <= 0:
-                raise ValueError("Values must be positive")
-
-            import math
-
-            # SHM calculations
-            omega = math.sqrt(k / mass)          # Angular frequency
-            T = 2 * math.pi / omega              # Time period
-            f = 1 / T                            # Frequency
-            vmax = A * omega                     # Maximum velocity
-
-            # Send everything to HTML
-            result = {
-                'mass': mass,
-                'k': k,
-                'amplitude': A,
-                'omega': round(omega, 4),
-                'time_period': round(T, 4),
-                'frequency': round(f, 4),
-                'vmax': round(vmax, 4)
-            }
-
-        except:
+            calc = CALCULATORS['shm']
+            values = calc.parse(request.form)
+            c = float(request.form.get('damping', 0) or 0)
+            F0 = float(request.form.get('force', 0) or 0)
+            wd = float(request.form.get('drive_frequency', 0) or 0)
+            # Ten periods of the fastest motion unless a duration is given.
+            duration = float(request.form['duration']) if request.form.get('duration') else None
+            if not all(map(math.isfinite, (c, F0, wd))) or c < 0:
+                raise ValueError('damping, force and drive frequency must be finite, damping >= 0')
+
+            result = {key: round(value, 4) for key, value in calc.evaluate(**values).items()}
+            result.update(values)
+            result.update({
+                'damping': c,
+                'force': F0,
+                'drive_frequency': wd,
+                'damping_ratio': round(c / (2 * math.sqrt(values['mass'] * values['k'])), 4),
+            })
+        except (KeyError, ValueError, RuntimeError) as e:
+            metrics.count_error(e)
             result = {'error': 'Invalid input. Please enter valid positive numbers.'}
+        else:
+            # Time-domain solution (damped / driven when c, F0 are set); the
+            # closed-form results above stand even if it cannot be simulated.
+            try:
+                sim = simulate_oscillator(values['mass'], values['k'], values['amplitude'],
+                                          damping=c, force=F0, drive_frequency=wd,
+                                          duration=duration, samples=201)
+                result.update(plotdata.pack({'t': sim['t'], 'x': sim['x']},
+                                            app.config['PLOT_MAX_POINTS'], 't', 'x', 'minmax'))
+            except (ValueError, RuntimeError) as e:
+                metrics.count_error(e)
+                result['plot_error'] = f'No plot: {e}'
 
     return render_template('shm.html', result=result)
 
 @app.route('/doppler', methods=['GET', 'POST'])
+@response_cache.memoize()
 def doppler():
-    result = None
-    if request.method == 'POST':
-        try:
-            f = float(request.form['source_freq'])        # Source frequency
-            vo = float(request.form['observer_velocity']) # Observer velocity
-            vs = float(request.form['source_velocity'])   # Source velocity
-            direction = request.form['direction']
-
-            v = 343  # Speed of sound in air (m/s)
-
-            # Doppler Effect formula
-            if direction == 'approaching':
-                f_observed = f * ((v + vo) / (v - vs))
-            else:
-                f_observed = f * ((v - vo) / (v + vs))
-
-            # Send ALL required values to template
-            result = {
-                'observed_freq': round(f_observed, 2),
-                'source_freq': round(f, 2),
-                'observer_velocity': round(vo, 2),
-                'source_velocity': round(vs, 2)
-            }
-
-        except Exception as e:
-            result = {'error': 'Invalid input values'}
+    return calculator_page(
+        'doppler.html', 'doppler',
+        echo=('source_freq', 'observer_velocity', 'source_velocity'),
+        digits={'observed_freq': 2, 'source_freq': 2, 'observer_velocity': 2,
+                'source_velocity': 2}
+    )
 
-    return render_template('doppler.html', result=result)
+def _heating_curve(mass, specific_heat, initial_temp, final_temp):
+    # Time simulation (5 steps)
+    time = list(range(0, 6))  # 0 to 5 seconds
+    deltaT = final_temp - initial_temp
+    return {'time': time, 'temp': [initial_temp + (deltaT / 5) * i for i in time]}
 
 @app.route('/heat_transfer', methods=['GET', 'POST'])
+@response_cache.memoize()
 def heat_transfer():
-    result = None
-    if request.method == 'POST':
-        try:
-            m = float(request.form['mass'])
-            c = float(request.form['specific_heat'])
-            t1 = float(request.form['initial_temp'])
-            t2 = float(request.form['final_temp'])
+    return calculator_page('heat_transfer.html', 'heat_transfer',
+                           echo=('initial_temp', 'final_temp'),
+                           series=_heating_curve, error='Invalid input.')
 
-            deltaT = t2 - t1
-            q = m * c * deltaT
+def _circular_path(radius, angular_velocity):
+    t = np.arange(100) * 0.1
+    return plotdata.pack({
+        'x': radius * np.cos(angular_velocity * t),
+        'y': radius * np.sin(angular_velocity * t)
+    }, app.config['PLOT_MAX_POINTS'], 'x', 'y')
 
-            # Time simulation (5 steps)
-            time = list(range(0, 6))  # 0 to 5 seconds
-            temp = [t1 + (deltaT / 5) * i for i in time]
-
-            result = {
-                'heat': q,
-                'time': time,
-                'temp': temp,
-                'initial_temp': t1,
-                'final_temp': t2
-            }
-        except:
-            result = {'error': 'Invalid input.'}
-    return render_template('heat_transfer.html', result=result)
 @app.route('/circular_motion', methods=['GET', 'POST'])
+@response_cache.memoize()
 def circular_motion():
-    result = None
-    if request.method == 'POST':
-        try:
-            r = float(request.form['radius'])
-            omega = float(request.form['angular_velocity'])
+    return calculator_page('circular_motion.html', 'circular_motion',
+                           echo={'radius': 'radius', 'omega': 'angular_velocity'},
+                           series=_circular_path, error='Invalid input.')
 
-            t = [i * 0.1 for i in range(100)]
-            x = [r * math.cos(omega * ti) for ti in t]
-            y = [r * math.sin(omega * ti) for ti in t]
-            v = [r * omega for _ in t]
-            a = [r * omega ** 2 for _ in t]
-
-            result = {
-                'x': x,
-                'y': y,
-                'v': v[0],
-                'a': a[0],
-                'radius': r,
-                'omega': omega
-            }
-        except:
-            result = {'error': 'Invalid input.'}
-    return render_template('circular_motion.html', result=result)
+# The constants page's tables, built once from the registry.
+CONSTANT_SECTIONS = [(title, [constants.as_dict(c) for c in constants.search(group=group)])
+                     for group, title in constants.GROUPS.items()]
+# {{ constant('R') }} in templates prints the value the formulas use.
+app.jinja_env.globals['constant'] = lambda key: constants.display(constants.CONSTANTS[key])
 
 @app.route('/physics-constants')
 def physics_constants():
-    return render_template('physics_constants.html')
+    return render_template('physics_constants.html', sections=CONSTANT_SECTIONS)
 
 @app.route('/thermodynamics')
 def thermo_dashboard():
     return render_template('thermo/thermo_dashboard.html')
 
 @app.route('/thermodynamics/first-law', methods=['GET', 'POST'])
+@response_cache.memoize()
 def first_law():
-    result = None
-    if request.method == 'POST':
-        try:
-            Q = float(request.form['heat'])
-            W = float(request.form['work'])
-            deltaU = Q - W
-            result = {
-                'Q': Q,
-                'W': W,
-                'deltaU': round(deltaU, 2)
-            }
-        except:
-            result = {'error': 'Invalid input'}
-    return render_template('thermo/first_law.html', result=result)
+    return calculator_page('thermo/first_law.html', 'first_law',
+                           echo={'Q': 'heat', 'W': 'work'},
+                           digits={'deltaU': 2}, error='Invalid input')
 
 @app.route('/thermodynamics/ideal-gas', methods=['GET', 'POST'])
+@response_cache.memoize()
 def ideal_gas():
-    result = None
-    if request.method == 'POST':
-        try:
-            n = float(request.form['moles'])
-            T = float(request.form['temperature'])
-            V = float(request.form['volume'])
-
-            R = 8.314  # J/mol·K
-            P = (n * R * T) / V
-
-            result = {
-                'n': n,
-                'T': T,
-                'V': V,
-                'P': round(P, 2)
-            }
-        except:
-            result = {'error': 'Invalid input'}
-    return render_template('thermo/ideal_gas.html', result=result)
+    return calculator_page('thermo/ideal_gas.html', 'ideal_gas',
+                           echo={'n': 'moles', 'T': 'temperature', 'V': 'volume'},
+                           digits={'P': 2}, error='Invalid input')
 @app.route('/thermodynamics/work-done', methods=['GET', 'POST'])
+@response_cache.memoize()
 def work_done():
-    result = None
-    if request.method == 'POST':
-        try:
-            P = float(request.form['pressure'])
-            V1 = float(request.form['v1'])
-            V2 = float(request.form['v2'])
-
-            deltaV = V2 - V1
-            W = P * deltaV
-
-            result = {
-                'P': P,
-                'V1': V1,
-                'V2': V2,
-                'deltaV': round(deltaV, 4),
-                'W': round(W, 2)
-            }
-        except:
-            result = {'error': 'Invalid input'}
-    return render_template('thermo/work_done.html', result=result)
+    return calculator_page('thermo/work_done.html', 'work_done',
+                           echo={'P': 'pressure', 'V1': 'v1', 'V2': 'v2'},
+                           digits={'deltaV': 4, 'W': 2}, error='Invalid input')
 @app.route('/thermodynamics/cp-cv', methods=['GET', 'POST'])
+@response_cache.memoize()
 def cp_cv():
-    result = None
-    if request.method == 'POST':
-        try:
-            R = float(request.form['R'])
-            gamma = float(request.form['gamma'])
-
-            Cv = R / (gamma - 1)
-            Cp = gamma * Cv
-
-            result = {
-                'R': round(R, 4),
-                'gamma': round(gamma, 4),
-                'Cv': round(Cv, 4),
-                'Cp': round(Cp, 4)
-            }
-        except:
-            result = {'error': 'Invalid input'}
-    return render_template('thermo/cp_cv.html', result=result)
+    return calculator_page('thermo/cp_cv.html', 'cp_cv', echo=('R', 'gamma'),
+                           digits={'R': 4, 'gamma': 4, 'Cv': 4, 'Cp': 4},
+                           error='Invalid input')
 @app.route('/thermodynamics/heat-engine', methods=['GET', 'POST'])
+@response_cache.memoize()
 def heat_engine():
-    result = None
-    if request.method == 'POST':
-        try:
-            Q1 = float(request.form['Q1'])
-            Q2 = float(request.form['Q2'])
-
-            if Q2 >= Q1:
-                raise ValueError
-
-            work = Q1 - Q2
-            efficiency = (work / Q1) * 100
-
-            result = {
-                'Q1': round(Q1, 3),
-                'Q2': round(Q2, 3),
-                'work': round(work, 3),
-                'efficiency': round(efficiency, 2)
-            }
-        except:
-            result = {'error': 'Invalid input or Q₂ must be less than Q₁'}
-    return render_template('thermo/heat_engine.html', result=result)
+    return calculator_page('thermo/heat_engine.html', 'heat_engine', echo=('Q1', 'Q2'),
+                           digits={'Q1': 3, 'Q2': 3, 'work': 3, 'efficiency': 2},
+                           error='Invalid input or Q₂ must be less than Q₁')
 @app.route('/thermodynamics/carnot-engine', methods=['GET', 'POST'])
+@response_cache.memoize()
 def carnot_engine():
-    result = None
-    if request.method == 'POST':
-        try:
-            Th = float(request.form['Th'])
-            Tc = float(request.form['Tc'])
-
-            if Th <= 0 or Tc <= 0 or Tc >= Th:
-                raise ValueError
-
-            efficiency = (1 - (Tc / Th)) * 100
-
-            result = {
-                'Th': round(Th, 2),
-                'Tc': round(Tc, 2),
-                'efficiency': round(efficiency, 2)
-            }
-        except:
-            result = {'error': 'Invalid input (Ensure Th > Tc and both in Kelvin)'}
-    return render_template('thermo/carnot_engine.html', result=result)
+    return calculator_page('thermo/carnot_engine.html', 'carnot_engine', echo=('Th', 'Tc'),
+                           digits={'Th': 2, 'Tc': 2, 'efficiency': 2},
+                           error='Invalid input (Ensure Th > Tc and both in Kelvin)')
 @app.route('/thermodynamics/entropy', methods=['GET', 'POST'])
+@response_cache.memoize()
 def entropy():
-    result = None
-    if request.method == 'POST':
-        try:
-            Q = float(request.form['heat'])
-            T = float(request.form['temperature'])
-
-            if T <= 0:
-                raise ValueError
-
-            entropy = Q / T
-
-            result = {
-                'heat': round(Q, 2),
-                'temperature': round(T, 2),
-                'entropy': round(entropy, 4)
-            }
-        except:
-            result = {'error': 'Invalid input (Temperature must be > 0 Kelvin)'}
-    return render_template('thermo/entropy.html', result=result)
+    return calculator_page('thermo/entropy.html', 'entropy', echo=('heat', 'temperature'),
+                           digits={'heat': 2, 'temperature': 2, 'entropy': 4},
+                           error='Invalid input (Temperature must be > 0 Kelvin)')
 
 @app.route('/thermodynamics/refrigerator', methods=['GET', 'POST'])
+@response_cache.memoize()
 def refrigerator():
-    result = None
-    if request.method == 'POST':
-        try:
-            qc = float(request.form['qc'])
-            work = float(request.form['work'])
-
-            if work <= 0:
-                raise ValueError
-
-            cop = qc / work
-
-            result = {
-                'qc': round(qc, 2),
-                'work': round(work, 2),
-                'cop': round(cop, 4)
-            }
-        except:
-            result = {'error': 'Invalid input (Work must be > 0)'}
-    return render_template('thermo/refrigerator.html', result=result)
-import numpy as np
-import math
-
+    return calculator_page('thermo/refrigerator.html', 'refrigerator', echo=('qc', 'work'),
+                           digits={'qc': 2, 'work': 2, 'cop': 4},
+                           error='Invalid input (Work must be > 0)')
 @app.route('/thermo/process', methods=['GET', 'POST'])
+@response_cache.memoize()
 def thermo_process():
     result = None
 
@@ -516,31 +423,27 @@ def thermo_process():
             gamma = float(request.form.get('gamma', 1.4) or 1.4)
             P_const = float(request.form.get('P', 0) or 0)
 
-            steps = []
-            V_plot = []
-            P_plot = []
-            W = None
+            # Straight-line processes need only their end points by default.
+            default_points = 50 if process in ('isothermal', 'adiabatic') else 2
+            resolution = int(request.form.get('resolution') or default_points)
+            if resolution > PAGE_MAX_POINTS:
+                raise ValueError(f'resolution must be at most {PAGE_MAX_POINTS}')
+
+            curve = process_curve(process, P1, V1, V2, gamma, P_const, resolution)
+            W = round(curve['W'], 3)
             P2 = None
 
             # ---------------- ISOTHERMAL ----------------
             if process == 'isothermal':
-                C = P1 * V1
-                V_plot = np.linspace(V1, V2, 50).tolist()
-                P_plot = [(C / v) for v in V_plot]
-                W = round(C * math.log(V2 / V1), 3)
-
                 steps = [
-                    f"P₁V₁ = constant = {C}",
+                    f"P₁V₁ = constant = {P1 * V1}",
                     "Isothermal work formula: W = P₁V₁ ln(V₂/V₁)",
                     f"W = {W} J"
                 ]
 
             # ---------------- ADIABATIC ----------------
             elif process == 'adiabatic':
-                C = P1 * (V1 ** gamma)
-                V_plot = np.linspace(V1, V2, 50).tolist()
-                P_plot = [(C / (v ** gamma)) for v in V_plot]
-                P2 = round(C / (V2 ** gamma), 3)
+                P2 = round(curve['P2'], 3)
                 W = round((P1 * V1 - P2 * V2) / (gamma - 1), 3)
 
                 steps = [
@@ -551,10 +454,6 @@ def thermo_process():
 
             # ---------------- ISOBARIC ----------------
             elif process == 'isobaric':
-                P_plot = [P_const, P_const]
-                V_plot = [V1, V2]
-                W = round(P_const * (V2 - V1), 3)
-
                 steps = [
                     "Pressure is constant",
                     f"W = P(V₂ − V₁)",
@@ -562,9 +461,7 @@ def thermo_process():
                 ]
 
             # ---------------- ISOCHORIC ----------------
-            elif process == 'isochoric':
-                V_plot = [V1, V1]
-                P_plot = [P1, P1 * 1.5]
+            else:
                 W = 0
 
                 steps = [
@@ -573,200 +470,60 @@ def thermo_process():
                     "W = 0 J"
                 ]
 
+            plot = plotdata.pack({'V': curve['V'], 'P': curve['P']},
+                                 app.config['PLOT_MAX_POINTS'], 'V', 'P')
             result = {
                 "steps": steps,
                 "W": W,
                 "P2": P2,
-                "V_plot": V_plot,
-                "P_plot": P_plot
+                "V_plot": plot['V'],
+                "P_plot": plot['P']
             }
 
-        except Exception as e:
+        except (KeyError, ValueError, ArithmeticError) as e:
+            metrics.count_error(e)
             result = {"error": str(e)}
 
     return render_template('thermo/process.html', result=result)
 
 @app.route('/thermodynamics/zeroth-law', methods=['GET', 'POST'])
+@response_cache.memoize()
 def zeroth_law():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            T1 = float(request.form['T1'])
-            T2 = float(request.form['T2'])
-
-            equilibrium = "YES" if T1 == T2 else "NO"
-
-            result = {
-                'T1': T1,
-                'T2': T2,
-                'equilibrium': equilibrium
-            }
-
-        except:
-            result = {'error': 'Invalid temperature values'}
-
-    return render_template('thermo/zeroth_law.html', result=result)
+    return calculator_page('thermo/zeroth_law.html', 'zeroth_law', echo=('T1', 'T2'),
+                           error='Invalid temperature values')
 @app.route('/thermodynamics/internal-energy', methods=['GET', 'POST'])
+@response_cache.memoize()
 def internal_energy():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            f = float(request.form['f'])   # degrees of freedom
-            n = float(request.form['n'])   # moles
-            T = float(request.form['T'])   # temperature (K)
-
-            R = 8.314  # J/mol·K
-            U = (f / 2) * n * R * T
-
-            result = {
-                'f': f,
-                'n': n,
-                'T': T,
-                'U': round(U, 3)
-            }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template('thermo/internal_energy.html', result=result)
+    return calculator_page('thermo/internal_energy.html', 'internal_energy',
+                           echo=('f', 'n', 'T'), digits={'U': 3})
 @app.route('/thermodynamics/gibbs-free-energy', methods=['GET', 'POST'])
+@response_cache.memoize()
 def gibbs_free_energy():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            # Read inputs from form
-            H = float(request.form['H'])   # ΔH (J)
-            T = float(request.form['T'])   # Temperature (K)
-            S = float(request.form['S'])   # ΔS (J/K)
-
-            # Gibbs Free Energy calculation
-            G = H - (T * S)
-
-            result = {
-                'H': H,
-                'T': T,
-                'S': S,
-                'G': round(G, 3)
-            }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template('thermo/gibbs_free_energy.html', result=result)
+    return calculator_page('thermo/gibbs_free_energy.html', 'gibbs_free_energy',
+                           echo=('H', 'T', 'S'), digits={'G': 3})
 @app.route('/thermodynamics/enthalpy', methods=['GET', 'POST'])
+@response_cache.memoize()
 def enthalpy():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            # Read inputs
-            m = float(request.form['mass'])          # mass (kg)
-            cp = float(request.form['cp'])           # specific heat capacity (J/kg·K)
-            dT = float(request.form['deltaT'])       # temperature change (K)
-
-            # Enthalpy change calculation
-            deltaH = m * cp * dT
-
-            result = {
-                'mass': m,
-                'cp': cp,
-                'deltaT': dT,
-                'deltaH': round(deltaH, 3)
-            }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template('thermo/enthalpy_change.html', result=result)
+    return calculator_page('thermo/enthalpy_change.html', 'enthalpy',
+                           echo=('mass', 'cp', 'deltaT'), digits={'deltaH': 3})
 @app.route('/thermodynamics/hess', methods=['GET', 'POST'])
+@response_cache.memoize()
 def hess():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            # Input enthalpy changes of individual steps
-            H1 = float(request.form['H1'])
-            H2 = float(request.form['H2'])
-            H3 = float(request.form.get('H3', 0))  # optional third step
-
-            # Hess's Law: total enthalpy change
-            deltaH = H1 + H2 + H3
-
-            result = {
-                'H1': H1,
-                'H2': H2,
-                'H3': H3,
-                'deltaH': round(deltaH, 3)
-            }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template('thermo/hess_law.html', result=result)
+    return calculator_page('thermo/hess_law.html', 'hess',
+                           echo=('H1', 'H2', 'H3'), digits={'deltaH': 3})
 @app.route('/thermodynamics/helmholtz', methods=['GET', 'POST'])
+@response_cache.memoize()
 def helmholtz():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            # Input values
-            U = float(request.form['U'])   # Internal Energy (J)
-            T = float(request.form['T'])   # Temperature (K)
-            S = float(request.form['S'])   # Entropy (J/K)
-
-            # Helmholtz free energy formula
-            A = U - (T * S)
-
-            result = {
-                'U': U,
-                'T': T,
-                'S': S,
-                'A': round(A, 3)
-            }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template('thermo/helmholtz_free_energy.html', result=result)
+    return calculator_page('thermo/helmholtz_free_energy.html', 'helmholtz',
+                           echo=('U', 'T', 'S'), digits={'A': 3})
 @app.route('/thermodynamics/phase', methods=['GET', 'POST'])
+@response_cache.memoize()
 def phase():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            # Inputs
-            m = float(request.form['mass'])          # mass (kg)
-            L = float(request.form['latent_heat'])  # latent heat (J/kg)
-            T1 = float(request.form['T1'])           # initial temperature (K)
-            T2 = float(request.form['T2'])           # final temperature (K)
-            H_vap = float(request.form['H_vap'])     # enthalpy of vaporization (J/mol)
-
-            R = 8.314  # J/mol·K
-
-            # Latent heat calculation
-            Q = m * L
-
-            # Clausius–Clapeyron (integrated form)
-            lnP_ratio = (H_vap / R) * ((1 / T1) - (1 / T2))
-
-            result = {
-                'mass': m,
-                'latent_heat': L,
-                'Q': round(Q, 3),
-                'T1': T1,
-                'T2': T2,
-                'H_vap': H_vap,
-                'lnP_ratio': round(lnP_ratio, 5)
-            }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template('thermo/phase_transition.html', result=result)
+    return calculator_page('thermo/phase_transition.html', 'phase',
+                           echo=('mass', 'latent_heat', 'T1', 'T2', 'H_vap'),
+                           digits={'Q': 3, 'lnP_ratio': 5})
 @app.route('/thermodynamics/maxwell', methods=['GET', 'POST'])
+@response_cache.memoize()
 def maxwell():
     result = None
 
@@ -809,1482 +566,825 @@ def maxwell():
         try:
             key = request.form['relation']
             result = relations[key]
-        except:
+        except KeyError as e:
+            metrics.count_error(e)
             result = {'error': 'Invalid selection'}
 
     return render_template('thermo/maxwell_relation.html', result=result)
 
 @app.route('/thermodynamics/real-gas', methods=['GET', 'POST'])
+@response_cache.memoize()
 def real_gas():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            # Inputs
-            P = float(request.form['P'])   # Pressure (Pa)
-            V = float(request.form['V'])   # Volume (m^3)
-            n = float(request.form['n'])   # Number of moles
-            a = float(request.form['a'])   # van der Waals constant a
-            b = float(request.form['b'])   # van der Waals constant b
-
-            R = 8.314  # Gas constant (J/mol·K)
-
-            # Van der Waals equation solved for temperature
-            T = ((P + (a * n * n) / (V * V)) * (V - n * b)) / (n * R)
-
-            result = {
-                'P': P,
-                'V': V,
-                'n': n,
-                'a': a,
-                'b': b,
-                'T': round(T, 3)
-            }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template('thermo/real_gas.html', result=result)
+    return calculator_page('thermo/real_gas.html', 'real_gas',
+                           echo=('P', 'V', 'n', 'a', 'b'), digits={'T': 3})
 @app.route('/thermodynamics/statistical', methods=['GET', 'POST'])
+@response_cache.memoize()
 def statistical():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            # Inputs
-            omega = float(request.form['omega'])   # number of microstates
-            f = float(request.form['f'])           # degrees of freedom
-            n = float(request.form['n'])           # moles
-            T = float(request.form['T'])           # temperature (K)
-
-            k = 1.38e-23    # Boltzmann constant (J/K)
-            R = 8.314       # Gas constant (J/mol·K)
-
-            # Calculations
-            entropy = k * math.log(omega)
-            internal_energy = (f / 2) * n * R * T
-
-            result = {
-                'omega': omega,
-                'f': f,
-                'n': n,
-                'T': T,
-                'entropy': round(entropy, 6),
-                'internal_energy': round(internal_energy, 3)
-            }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template(
-        'thermo/statistical_mechanics.html',
-        result=result
-    )
+    return calculator_page('thermo/statistical_mechanics.html', 'statistical',
+                           echo=('omega', 'f', 'n', 'T'),
+                           digits={'entropy': 6, 'internal_energy': 3})
 @app.route('/thermodynamics/heat-transfer-advanced', methods=['GET', 'POST'])
+@response_cache.memoize()
 def heat_transfer_adv():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            # Inputs
-            k = float(request.form['k'])          # thermal conductivity (W/m·K)
-            A = float(request.form['A'])          # area (m^2)
-            dT = float(request.form['dT'])        # temperature difference (K)
-            dx = float(request.form['dx'])        # thickness (m)
-
-            L0 = float(request.form['L0'])        # original length (m)
-            alpha = float(request.form['alpha']) # coefficient of expansion (1/K)
-
-            T = float(request.form['T'])          # temperature (K)
-
-            # Constants
-            b = 2.898e-3  # Wien's constant (m·K)
-
-            # Calculations
-            heat_rate = (k * A * dT) / dx                     # Fourier's Law
-            expanded_length = L0 * (1 + alpha * dT)           # Linear expansion
-            lambda_max = b / T                                 # Wien's law
-
-            result = {
-                'k': k,
-                'A': A,
-                'dT': dT,
-                'dx': dx,
-                'heat_rate': round(heat_rate, 3),
-                'L0': L0,
-                'alpha': alpha,
-                'expanded_length': round(expanded_length, 6),
-                'T': T,
-                'lambda_max': round(lambda_max, 9)
-            }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template(
-        'thermo/heat_transfer_advanced.html',
-        result=result
-    )
+    return calculator_page('thermo/heat_transfer_advanced.html', 'heat_transfer_adv',
+                           echo=('k', 'A', 'dT', 'dx', 'L0', 'alpha', 'T'),
+                           digits={'heat_rate': 3, 'expanded_length': 6, 'lambda_max': 9})
 @app.route('/thermodynamics/stability', methods=['GET', 'POST'])
+@response_cache.memoize()
 def stability():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            # Inputs
-            T = float(request.form['T'])          # Temperature (K)
-            dSdT = float(request.form['dSdT'])    # (∂S/∂T)V
-            V = float(request.form['V'])          # Volume (m^3)
-            dVdP = float(request.form['dVdP'])    # (∂V/∂P)T
-            dmu = float(request.form['dmu'])      # (∂μi/∂ni)
-
-            # Calculations
-            Cv = T * dSdT
-            kappa_T = -(1 / V) * dVdP
-
-            thermal = "Stable" if Cv > 0 else "Unstable"
-            mechanical = "Stable" if kappa_T > 0 else "Unstable"
-            diffusional = "Stable" if dmu > 0 else "Unstable"
-
-            result = {
-                'T': T,
-                'Cv': round(Cv, 4),
-                'kappa_T': round(kappa_T, 6),
-                'dmu': dmu,
-                'thermal': thermal,
-                'mechanical': mechanical,
-                'diffusional': diffusional
-            }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template(
-        'thermo/thermodynamic_stability.html',
-        result=result
-    )
+    return calculator_page('thermo/thermodynamic_stability.html', 'stability',
+                           echo=('T', 'dmu'), digits={'Cv': 4, 'kappa_T': 6})
 @app.route('/thermodynamics/advanced-cycles', methods=['GET', 'POST'])
+@response_cache.memoize()
 def advanced_cycles():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            cycle = request.form['cycle']
-            gamma = float(request.form['gamma'])
-
-            # ------------------------
-            # Brayton Cycle
-            # ------------------------
-            if cycle == 'brayton':
-                rp = float(request.form['rp'])
-                eta = 1 - (rp ** ((1 - gamma) / gamma))
-
-                result = {
-                    'cycle': 'Brayton Cycle',
-                    'eta': round(eta, 4)
-                }
-
-            # ------------------------
-            # Rankine Cycle
-            # ------------------------
-            elif cycle == 'rankine':
-                h1 = float(request.form['h1'])
-                h2 = float(request.form['h2'])
-                h3 = float(request.form['h3'])
-                h4 = float(request.form['h4'])
-
-                W_net = (h1 - h2) - (h4 - h3)
-
-                result = {
-                    'cycle': 'Rankine Cycle',
-                    'W_net': round(W_net, 3)
-                }
-
-            # ------------------------
-            # Otto / Diesel Cycle
-            # ------------------------
-            elif cycle == 'otto':
-                r = float(request.form['r'])
-                eta = 1 - (r ** (1 - gamma))
-
-                result = {
-                    'cycle': 'Otto / Diesel Cycle',
-                    'eta': round(eta, 4)
-                }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template(
-        'thermo/advanced_thermodynamic_cycles.html',
-        result=result
-    )
+    return calculator_page('thermo/advanced_thermodynamic_cycles.html', 'advanced_cycles',
+                           mode_field='cycle',
+                           digits={'eta': 4, 'W_net': 3, 'q_in': 3,
+                                   'h1': 3, 'h2': 3, 'h3': 3, 'h4': 3})
 
 @app.route('/thermodynamics/chemical-phase-equilibrium', methods=['GET', 'POST'])
+@response_cache.memoize()
 def chem_phase_eq():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            law = request.form['law']
-
-            # ---------------------------------
-            # Chemical Potential
-            # ---------------------------------
-            if law == 'chemical_potential':
-                G = float(request.form['G'])
-                n = float(request.form['n'])
-                mu = G / n
-
-                result = {
-                    'law': 'Chemical Potential',
-                    'mu': round(mu, 4)
-                }
-
-            # ---------------------------------
-            # Gibbs Phase Rule
-            # ---------------------------------
-            elif law == 'gibbs_phase':
-                C = int(request.form['C'])
-                P = int(request.form['P'])
-                F = C - P + 2
-
-                result = {
-                    'law': 'Gibbs Phase Rule',
-                    'F': F
-                }
-
-            # ---------------------------------
-            # Van der Waals Differential
-            # ---------------------------------
-            elif law == 'vdw':
-                dv = float(request.form['dv'])
-                ds = float(request.form['ds'])
-                dP = float(request.form['dP'])
-                dT = float(request.form['dT'])
-                d2gdx2 = float(request.form['d2gdx2'])
-                dx = float(request.form['dx'])
-
-                lhs = dv * dP
-                rhs = (ds * dT) + (d2gdx2 * dx)
-
-                result = {
-                    'law': 'Van der Waals Differential',
-                    'lhs': round(lhs, 5),
-                    'rhs': round(rhs, 5),
-                    'equilibrium': "Satisfied" if abs(lhs - rhs) < 1e-3 else "Not satisfied"
-                }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template(
-        'thermo/chemical_phase_equilibrium.html',
-        result=result
-    )
+    return calculator_page('thermo/chemical_phase_equilibrium.html', 'chem_phase_eq',
+                           mode_field='law', digits={'mu': 4, 'lhs': 5, 'rhs': 5})
 
 @app.route('/thermodynamics/thermochemistry', methods=['GET', 'POST'])
+@response_cache.memoize()
 def thermochemistry():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            law = request.form['law']
-
-            # -------------------------------
-            # Kirchhoff’s Law
-            # -------------------------------
-            if law == 'kirchhoff':
-                H1 = float(request.form['H1'])      # ΔH at T1
-                Cp = float(request.form['Cp'])      # ΔCp (assumed constant)
-                T1 = float(request.form['T1'])
-                T2 = float(request.form['T2'])
-
-                H2 = H1 + Cp * (T2 - T1)
-
-                result = {
-                    'law': 'Kirchhoff’s Law',
-                    'H2': round(H2, 4),
-                    'details': f"ΔH(T₂) = ΔH(T₁) + ΔCp(T₂ − T₁)"
-                }
-
-            # -------------------------------
-            # Partial Molar Properties
-            # -------------------------------
-            elif law == 'partial_molar':
-                n1 = float(request.form['n1'])
-                n2 = float(request.form['n2'])
-                V1 = float(request.form['V1'])
-                V2 = float(request.form['V2'])
-
-                V_total = (n1 * V1) + (n2 * V2)
-
-                result = {
-                    'law': 'Partial Molar Properties',
-                    'V_total': round(V_total, 4),
-                    'details': "V = Σ nᵢ V̄ᵢ"
-                }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template(
-        'thermo/thermochemistry_solution_laws.html',
-        result=result
+    return calculator_page(
+        'thermo/thermochemistry_solution_laws.html', 'thermochemistry',
+        mode_field='law',
+        digits={'H2': 4, 'V_total': 4},
+        extra={
+            'kirchhoff': {'details': "ΔH(T₂) = ΔH(T₁) + ΔCp(T₂ − T₁)"},
+            'partial_molar': {'details': "V = Σ nᵢ V̄ᵢ"},
+        }
     )
 
 @app.route('/thermodynamics/fugacity-activity', methods=['GET', 'POST'])
+@response_cache.memoize()
 def fugacity_activity():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            law = request.form['law']
-
-            # ---------------------------------
-            # Fugacity
-            # ---------------------------------
-            if law == 'fugacity':
-                phi = float(request.form['phi'])
-                P = float(request.form['P'])
-
-                f = phi * P
-
-                result = {
-                    'law': 'Fugacity',
-                    'phi': phi,
-                    'P': P,
-                    'f': round(f, 4)
-                }
-
-            # ---------------------------------
-            # Fugacity Coefficient (Conceptual)
-            # ---------------------------------
-            elif law == 'fugacity_coeff':
-                GR = float(request.form['GR'])   # Residual Gibbs free energy
-                T = float(request.form['T'])
-
-                R = 8.314
-                ln_phi = GR / (R * T)
-                phi = round(pow(2.71828, ln_phi), 5)
-
-                result = {
-                    'law': 'Fugacity Coefficient',
-                    'ln_phi': round(ln_phi, 5),
-                    'phi': phi
-                }
-
-            # ---------------------------------
-            # Activity
-            # ---------------------------------
-            elif law == 'activity':
-                gamma = float(request.form['gamma'])
-                x = float(request.form['x'])
-
-                a = gamma * x
-
-                result = {
-                    'law': 'Activity',
-                    'gamma': gamma,
-                    'x': x,
-                    'a': round(a, 5)
-                }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template(
-        'thermo/fugacity_activity.html',
-        result=result
+    return calculator_page(
+        'thermo/fugacity_activity.html', 'fugacity_activity',
+        mode_field='law',
+        echo={'fugacity': ('phi', 'P'), 'activity': ('gamma', 'x')},
+        digits={'f': 4, 'ln_phi': 5, 'phi': 5, 'a': 5, 'Z': 5}
     )
 @app.route('/thermodynamics/legendre', methods=['GET', 'POST'])
+@response_cache.memoize()
 def legendre():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            transform = request.form['transform']
-
-            # ---------------------------------
-            # U → Helmholtz Free Energy
-            # F = U − TS
-            # ---------------------------------
-            if transform == 'helmholtz':
-                U = float(request.form['U'])
-                T = float(request.form['T'])
-                S = float(request.form['S'])
-
-                F = U - T * S
-
-                result = {
-                    'transform': 'Internal Energy → Helmholtz Free Energy',
-                    'formula': 'F = U − TS',
-                    'value': round(F, 4)
-                }
-
-            # ---------------------------------
-            # U → Enthalpy
-            # H = U + PV
-            # ---------------------------------
-            elif transform == 'enthalpy':
-                U = float(request.form['U'])
-                P = float(request.form['P'])
-                V = float(request.form['V'])
-
-                H = U + P * V
-
-                result = {
-                    'transform': 'Internal Energy → Enthalpy',
-                    'formula': 'H = U + PV',
-                    'value': round(H, 4)
-                }
-
-            # ---------------------------------
-            # U → Gibbs Free Energy
-            # G = U − TS + PV
-            # ---------------------------------
-            elif transform == 'gibbs':
-                U = float(request.form['U'])
-                T = float(request.form['T'])
-                S = float(request.form['S'])
-                P = float(request.form['P'])
-                V = float(request.form['V'])
-
-                G = U - T * S + P * V
-
-                result = {
-                    'transform': 'Internal Energy → Gibbs Free Energy',
-                    'formula': 'G = U − TS + PV',
-                    'value': round(G, 4)
-                }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template(
-        'thermo/legendre_transformations.html',
-        result=result
+    return calculator_page(
+        'thermo/legendre_transformations.html', 'legendre',
+        mode_field='transform',
+        digits={'value': 4},
+        extra={
+            'helmholtz': {'formula': 'F = U − TS'},
+            'enthalpy': {'formula': 'H = U + PV'},
+            'gibbs': {'formula': 'G = U − TS + PV'},
+        }
     )
 @app.route('/thermodynamics/non-equilibrium', methods=['GET', 'POST'])
+@response_cache.memoize()
 def non_equilibrium():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            law = request.form['law']
-
-            # ---------------------------------
-            # Entropy Production Rate
-            # σ = Σ Ji Xi
-            # ---------------------------------
-            if law == 'entropy_prod':
-                J = float(request.form['J'])   # flux
-                X = float(request.form['X'])   # thermodynamic force
-
-                sigma = J * X
-
-                result = {
-                    'law': 'Entropy Production Rate',
-                    'sigma': round(sigma, 6),
-                    'validity': 'Irreversible (σ ≥ 0)' if sigma >= 0 else 'Violates Second Law'
-                }
-
-            # ---------------------------------
-            # Onsager Reciprocal Relations
-            # ---------------------------------
-            elif law == 'onsager':
-                L12 = float(request.form['L12'])
-                L21 = float(request.form['L21'])
-
-                result = {
-                    'law': 'Onsager Reciprocal Relations',
-                    'L12': L12,
-                    'L21': L21,
-                    'relation': 'Satisfied (L₁₂ = L₂₁)' if abs(L12 - L21) < 1e-3 else 'Not Satisfied'
-                }
-
-            # ---------------------------------
-            # Thermal Diffusion (Coupled Transport)
-            # ---------------------------------
-            elif law == 'thermal_diffusion':
-                kT = float(request.form['kT'])     # thermal diffusion coefficient
-                gradT = float(request.form['gradT'])  # temperature gradient
-
-                Jq = -kT * gradT
-
-                result = {
-                    'law': 'Thermal Diffusion',
-                    'Jq': round(Jq, 6),
-                    'meaning': 'Heat & mass transport are coupled'
-                }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template(
-        'thermo/non_equilibrium_transport.html',
-        result=result
+    return calculator_page(
+        'thermo/non_equilibrium_transport.html', 'non_equilibrium',
+        mode_field='law',
+        echo={'onsager': ('L12', 'L21')},
+        digits={'sigma': 6, 'Jq': 6},
+        extra={'thermal_diffusion': {'meaning': 'Heat & mass transport are coupled'}}
     )
 @app.route('/thermodynamics/molecular-simulation', methods=['GET', 'POST'])
+@response_cache.memoize()
 def molecular_simulation():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            method = request.form['method']
-            R = 8.314
-
-            # ---------------------------------
-            # Thermodynamic Integration
-            # ΔF = ∫ ⟨∂U/∂λ⟩ dλ  (simplified numeric)
-            # ---------------------------------
-            if method == 'thermo_integration':
-                avg_dU = float(request.form['avg_dU'])   # ⟨∂U/∂λ⟩
-                delta_lambda = float(request.form['delta_lambda'])
-
-                deltaF = avg_dU * delta_lambda
-
-                result = {
-                    'method': 'Thermodynamic Integration',
-                    'deltaF': round(deltaF, 5),
-                    'explain': 'Free energy difference obtained by integrating along a path'
-                }
-
-            # ---------------------------------
-            # Widom Particle Insertion
-            # μ = -RT ln⟨exp(-ΔU/RT)⟩
-            # ---------------------------------
-            elif method == 'widom':
-                deltaU = float(request.form['deltaU'])
-                T = float(request.form['T'])
-
-                mu = -R * T * (deltaU / (R * T))
-
-                result = {
-                    'method': 'Widom Particle Insertion',
-                    'mu': round(mu, 5),
-                    'explain': 'Chemical potential estimated via particle insertion'
-                }
-
-            # ---------------------------------
-            # Langevin Equation (1D steady state)
-            # m dv/dt = -γv + ξ(t)
-            # ---------------------------------
-            elif method == 'langevin':
-                gamma = float(request.form['gamma'])
-                v = float(request.form['v'])
-
-                friction = -gamma * v
-
-                result = {
-                    'method': 'Langevin Dynamics',
-                    'force': round(friction, 5),
-                    'explain': 'Motion under friction and thermal noise'
-                }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template(
-        'thermo/molecular_simulation_methods.html',
-        result=result
+    return calculator_page(
+        'thermo/molecular_simulation_methods.html', 'molecular_simulation',
+        mode_field='method',
+        digits={'deltaF': 5, 'mu': 5, 'force': 5},
+        extra={
+            'thermo_integration': {'explain': 'Free energy difference obtained by integrating along a path'},
+            'widom': {'explain': 'Chemical potential estimated via particle insertion'},
+            'langevin': {'explain': 'Motion under friction and thermal noise'},
+        }
     )
 @app.route('/thermodynamics/exergy', methods=['GET', 'POST'])
+@response_cache.memoize()
 def exergy():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            # System state
-            U1 = float(request.form['U1'])
-            V1 = float(request.form['V1'])
-            S1 = float(request.form['S1'])
-
-            # Dead state (environment)
-            U0 = float(request.form['U0'])
-            V0 = float(request.form['V0'])
-            S0 = float(request.form['S0'])
-
-            P0 = float(request.form['P0'])
-            T0 = float(request.form['T0'])
-
-            # Exergy change calculation
-            delta_psi = (U1 - U0) + P0 * (V1 - V0) - T0 * (S1 - S0)
-
-            result = {
-                'U1': U1, 'U0': U0,
-                'V1': V1, 'V0': V0,
-                'S1': S1, 'S0': S0,
-                'P0': P0, 'T0': T0,
-                'delta_psi': round(delta_psi, 4)
-            }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template(
-        'thermo/exergy_analysis.html',
-        result=result
-    )
+    return calculator_page('thermo/exergy_analysis.html', 'exergy',
+                           echo=('U1', 'U0', 'V1', 'V0', 'S1', 'S0', 'P0', 'T0'),
+                           digits={'delta_psi': 4})
 @app.route('/thermodynamics/surface-interface', methods=['GET', 'POST'])
+@response_cache.memoize()
 def surface_interface():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            law = request.form['law']
-            R = 8.314
-
-            # ---------------------------------
-            # Surface Tension
-            # γ = ∂G / ∂A
-            # ---------------------------------
-            if law == 'surface_tension':
-                dG = float(request.form['dG'])
-                dA = float(request.form['dA'])
-
-                gamma = dG / dA
-
-                result = {
-                    'law': 'Surface Tension',
-                    'gamma': round(gamma, 6)
-                }
-
-            # ---------------------------------
-            # Gibbs Adsorption Isotherm
-            # dγ = − Γ dμ
-            # ---------------------------------
-            elif law == 'gibbs_adsorption':
-                Gamma = float(request.form['Gamma'])
-                dmu = float(request.form['dmu'])
-
-                dgamma = -Gamma * dmu
-
-                result = {
-                    'law': 'Gibbs Adsorption Isotherm',
-                    'dgamma': round(dgamma, 6)
-                }
-
-            # ---------------------------------
-            # Laplace Equation
-            # ΔP = γ (1/R1 + 1/R2)
-            # ---------------------------------
-            elif law == 'laplace':
-                gamma = float(request.form['gamma'])
-                R1 = float(request.form['R1'])
-                R2 = float(request.form['R2'])
-
-                deltaP = gamma * ((1 / R1) + (1 / R2))
-
-                result = {
-                    'law': 'Laplace Equation',
-                    'deltaP': round(deltaP, 6)
-                }
-
-            # ---------------------------------
-            # Kelvin Equation
-            # ln(P/P0) = 2γVm / rRT
-            # ---------------------------------
-            elif law == 'kelvin':
-                gamma = float(request.form['gamma'])
-                Vm = float(request.form['Vm'])
-                r = float(request.form['r'])
-                T = float(request.form['T'])
-
-                ln_ratio = (2 * gamma * Vm) / (r * R * T)
-
-                result = {
-                    'law': 'Kelvin Equation',
-                    'ln_ratio': round(ln_ratio, 6)
-                }
-
-            # ---------------------------------
-            # Young Equation
-            # cosθ = (γsv − γsl) / γlv
-            # ---------------------------------
-            elif law == 'young':
-                gamma_sv = float(request.form['gamma_sv'])
-                gamma_sl = float(request.form['gamma_sl'])
-                gamma_lv = float(request.form['gamma_lv'])
-
-                cos_theta = (gamma_sv - gamma_sl) / gamma_lv
-
-                result = {
-                    'law': 'Young Equation',
-                    'cos_theta': round(cos_theta, 6)
-                }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template(
-        'thermo/surface_interface_thermodynamics.html',
-        result=result
+    return calculator_page(
+        'thermo/surface_interface_thermodynamics.html', 'surface_interface',
+        mode_field='law',
+        digits={'gamma': 6, 'dgamma': 6, 'deltaP': 6, 'ln_ratio': 6, 'cos_theta': 6}
     )
 @app.route('/thermodynamics/advanced-efficiency', methods=['GET', 'POST'])
+@response_cache.memoize()
 def advanced_efficiency():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            calc = request.form['calc']
-            gamma = float(request.form['gamma'])
-
-            # -------------------------------
-            # Diesel Cycle Efficiency
-            # -------------------------------
-            if calc == 'diesel':
-                r = float(request.form['r'])         # compression ratio
-                beta = float(request.form['beta'])   # cut-off ratio
-
-                eta_diesel = 1 - (1/gamma) * ((beta**gamma - 1) / (r**(gamma - 1) * (beta - 1)))
-
-                result = {
-                    'calc': 'Diesel Cycle Efficiency',
-                    'eta': round(eta_diesel, 5)
-                }
-
-            # -------------------------------
-            # Refrigerator COP
-            # -------------------------------
-            elif calc == 'cop_r':
-                QL = float(request.form['QL'])
-                W = float(request.form['W'])
-
-                COP_R = QL / W
-
-                result = {
-                    'calc': 'Refrigerator COP',
-                    'cop': round(COP_R, 5)
-                }
-
-            # -------------------------------
-            # Heat Pump COP
-            # -------------------------------
-            elif calc == 'cop_hp':
-                QH = float(request.form['QH'])
-                W = float(request.form['W'])
-
-                COP_HP = QH / W
-
-                result = {
-                    'calc': 'Heat Pump COP',
-                    'cop': round(COP_HP, 5)
-                }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template(
-        'thermo/advanced_efficiencies.html',
-        result=result
-    )
+    return calculator_page('thermo/advanced_efficiencies.html', 'advanced_efficiency',
+                           mode_field='calc', digits={'eta': 5, 'cop': 5})
 @app.route('/thermodynamics/non-ideal-mixture', methods=['GET', 'POST'])
+@response_cache.memoize()
 def non_ideal_mixture():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            law = request.form['law']
-
-            # ---------------------------------
-            # Residual Property
-            # Gᴿ = G_real − G_ideal
-            # ---------------------------------
-            if law == 'residual':
-                G_real = float(request.form['G_real'])
-                G_ideal = float(request.form['G_ideal'])
-
-                GR = G_real - G_ideal
-
-                result = {
-                    'law': 'Residual Property',
-                    'GR': round(GR, 5)
-                }
-
-            # ---------------------------------
-            # Activity Coefficient
-            # aᵢ = γᵢ xᵢ
-            # ---------------------------------
-            elif law == 'activity_coeff':
-                gamma = float(request.form['gamma'])
-                x = float(request.form['x'])
-
-                a = gamma * x
-
-                result = {
-                    'law': 'Activity Coefficient',
-                    'a': round(a, 5)
-                }
-
-            # ---------------------------------
-            # Poynting Correction (Simplified)
-            # f = f⁰ exp[V(P−P⁰)/RT]
-            # ---------------------------------
-            elif law == 'poynting':
-                V = float(request.form['V'])
-                P = float(request.form['P'])
-                P0 = float(request.form['P0'])
-                T = float(request.form['T'])
-
-                R = 8.314
-                correction = (V * (P - P0)) / (R * T)
-
-                result = {
-                    'law': 'Poynting Correction',
-                    'correction': round(correction, 6)
-                }
-
-            # ---------------------------------
-            # Dalton’s Law
-            # P_total = Σ Pi
-            # ---------------------------------
-            elif law == 'dalton':
-                P1 = float(request.form['P1'])
-                P2 = float(request.form['P2'])
-                P3 = float(request.form['P3'])
-
-                P_total = P1 + P2 + P3
-
-                result = {
-                    'law': 'Dalton’s Law',
-                    'P_total': round(P_total, 5),
-                    'partials': [P1, P2, P3]
-                }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template(
-        'thermo/non_ideal_mixture.html',
-        result=result
+    return calculator_page(
+        'thermo/non_ideal_mixture.html', 'non_ideal_mixture',
+        mode_field='law',
+        echo={'dalton': {'partials': ('P1', 'P2', 'P3')}},
+        digits={'GR': 5, 'a': 5, 'correction': 6, 'P_total': 5}
     )
 @app.route('/thermodynamics/relativistic-quantum', methods=['GET', 'POST'])
+@response_cache.memoize()
 def relativistic_quantum():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            law = request.form['law']
-
-            # ---------------------------------
-            # Relativistic First Law (Scalar Form)
-            # dξ = dΘ − P dV
-            # ---------------------------------
-            if law == 'relativistic_first':
-                dTheta = float(request.form['dTheta'])
-                P = float(request.form['P'])
-                dV = float(request.form['dV'])
-
-                dXi = dTheta - P * dV
-
-                result = {
-                    'law': 'Relativistic First Law',
-                    'dXi': round(dXi, 6)
-                }
-
-            # ---------------------------------
-            # Black Hole Entropy (Bekenstein–Hawking)
-            # S = kB A / (4 lP²)
-            # ---------------------------------
-            elif law == 'black_hole':
-                A = float(request.form['A'])
-
-                kB = 1.380649e-23      # Boltzmann constant
-                lP = 1.616255e-35      # Planck length
-
-                S = (kB * A) / (4 * lP**2)
-
-                result = {
-                    'law': 'Black Hole Entropy',
-                    'S': S
-                }
-
-            # ---------------------------------
-            # Quantum Master Equation (Relaxation)
-            # dρ/dt = −γ(ρ − ρ_eq)
-            # ---------------------------------
-            elif law == 'quantum_master':
-                gamma = float(request.form['gamma'])
-                rho = float(request.form['rho'])
-                rho_eq = float(request.form['rho_eq'])
-
-                drho_dt = -gamma * (rho - rho_eq)
-
-                result = {
-                    'law': 'Quantum Master Equation',
-                    'drho_dt': round(drho_dt, 6)
-                }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template(
-        'thermo/relativistic_quantum_thermodynamics.html',
-        result=result
-    )
+    return calculator_page('thermo/relativistic_quantum_thermodynamics.html',
+                           'relativistic_quantum', mode_field='law',
+                           digits={'dXi': 6, 'drho_dt': 6})
 @app.route('/thermodynamics/information-thermodynamics', methods=['GET', 'POST'])
+@response_cache.memoize()
 def info_thermo():
-    result = None
+    law = request.form.get('law') if request.method == 'POST' else None
+    if law == 'jarzynski':
+        return render_template('thermo/information_theoretic_thermodynamics.html',
+                               result=_jarzynski_page())
+    if law in INFORMATION_MEASURES:
+        return render_template('thermo/information_theoretic_thermodynamics.html',
+                               result=_information_page(law))
+    return calculator_page('thermo/information_theoretic_thermodynamics.html',
+                           'info_thermo', mode_field='law')
+
+# Page mode -> (title, measure, distribution fields); a field named 'joint' is a 2-D table.
+INFORMATION_MEASURES = {
+    'shannon': ('Shannon Entropy', information.entropy, ('p',)),
+    'kl': ('Kullback–Leibler Divergence', information.divergence, ('p', 'q')),
+    'mutual_information': ('Mutual Information', information.mutual_information, ('joint',)),
+}
+
+def _information(values, fields, measure):
+    distributions = []
+    for field in fields:
+        numbers = _uploaded_numbers(values, field, rows=field == 'joint')
+        if numbers is None:
+            raise KeyError(field)
+        distributions.append(numbers)
+    T = values.get('T')
+    return measure(*distributions, T=None if T in (None, '') else float(T))
+
+def _information_page(law):
+    title, measure, fields = INFORMATION_MEASURES[law]
+    try:
+        result = _information(request.form, fields, measure)
+    except KeyError as e:
+        metrics.count_error(e)
+        return {'error': f'Enter or upload the distribution {e}'}
+    except (ValueError, TypeError) as e:
+        metrics.count_error(e)
+        return {'error': str(e)}
+    result['law'] = title
+    return result
+
+def _uploaded_numbers(values, name, rows=False):
+    """Numbers ``name`` from an uploaded file (a callable reading it in chunks,
+    once per pass) or from ``values``: a list, or text with one row per line
+    when ``rows``; None if neither is given."""
+    upload = request.files.get(name)
+    if upload is not None and upload.filename:
+        return lambda: read_chunks(upload.stream, rows=rows)
+    numbers = values.get(name)
+    if isinstance(numbers, str):
+        if rows:
+            lines = [line.replace(',', ' ').split() for line in numbers.splitlines()]
+            numbers = [line for line in lines if line]
+        else:
+            numbers = numbers.replace(',', ' ').split()
+    if numbers is None or not len(numbers):
+        return None
+    numbers = np.asarray(numbers, dtype=float)
+    if numbers.size > app.config['BATCH_MAX_ROWS'] * 10:
+        raise ValueError('Too many values in one request; upload them as a file')
+    return numbers
+
+def _work_options(values):
+    T = values.get('T')
+    return {'T': None if T in (None, '') else float(T), 'units': values.get('units', 'J'),
+            'confidence': float(values.get('confidence') or 0.95)}
+
+def _jarzynski_page():
+    try:
+        forward = _uploaded_numbers(request.form, 'W')
+        if forward is None:
+            raise ValueError('Enter or upload forward work samples')
+        result = jarzynski.estimate(forward, _uploaded_numbers(request.form, 'W_reverse'),
+                                    **_work_options(request.form))
+    except (KeyError, ValueError, TypeError) as e:
+        metrics.count_error(e)
+        return {'error': str(e)}
+    result['law'] = 'Jarzynski Equality'
+    for key in ('forward', 'reverse'):
+        if key in result:
+            result[key]['sample'] = result[key]['sample'].tolist()
+    return result
 
-    if request.method == 'POST':
-        try:
-            law = request.form['law']
-            kB = 1.380649e-23   # Boltzmann constant
-
-            # ---------------------------------
-            # Landauer’s Principle
-            # Q ≥ kB T ln 2
-            # ---------------------------------
-            if law == 'landauer':
-                T = float(request.form['T'])
-
-                Qmin = kB * T * 0.693147  # ln(2)
-
-                result = {
-                    'law': "Landauer’s Principle",
-                    'Qmin': Qmin
-                }
-
-            # ---------------------------------
-            # Shannon Entropy
-            # H = − Σ pi ln(pi)
-            # ---------------------------------
-            elif law == 'shannon':
-                p1 = float(request.form['p1'])
-                p2 = float(request.form['p2'])
-                p3 = float(request.form['p3'])
-
-                probs = [p1, p2, p3]
-                H = -sum(p * __import__('math').log(p) for p in probs if p > 0)
-
-                result = {
-                    'law': "Shannon Entropy",
-                    'H': round(H, 6),
-                    'probs': probs
-                }
-
-            # ---------------------------------
-            # Jarzynski Equality
-            # ⟨e^(−βW)⟩ = e^(−βΔG)
-            # ---------------------------------
-            elif law == 'jarzynski':
-                W = float(request.form['W'])
-                T = float(request.form['T'])
-                deltaG = float(request.form['deltaG'])
-
-                beta = 1 / (kB * T)
-                lhs = __import__('math').exp(-beta * W)
-                rhs = __import__('math').exp(-beta * deltaG)
-
-                result = {
-                    'law': "Jarzynski Equality",
-                    'lhs': lhs,
-                    'rhs': rhs,
-                    'validity': "Satisfied" if abs(lhs - rhs) / rhs < 0.05 else "Not satisfied"
-                }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template(
-        'thermo/information_theoretic_thermodynamics.html',
-        result=result
-    )
 @app.route('/thermodynamics/fluctuation-noise', methods=['GET', 'POST'])
+@response_cache.memoize()
 def fluctuation_noise():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            law = request.form['law']
-            kB = 1.380649e-23  # Boltzmann constant
-
-            # ---------------------------------
-            # Einstein Relation
-            # D = μ kB T
-            # ---------------------------------
-            if law == 'einstein':
-                mu = float(request.form['mu'])   # mobility
-                T = float(request.form['T'])     # temperature
-
-                D = mu * kB * T
-
-                result = {
-                    'law': 'Einstein Relation (Diffusion)',
-                    'D': D
-                }
-
-            # ---------------------------------
-            # Johnson–Nyquist Noise
-            # <V^2> = 4 kB T R Δf
-            # ---------------------------------
-            elif law == 'johnson':
-                T = float(request.form['T'])
-                R = float(request.form['R'])
-                df = float(request.form['df'])
-
-                V2 = 4 * kB * T * R * df
-
-                result = {
-                    'law': 'Johnson–Nyquist Noise',
-                    'V2': V2
-                }
-
-            # ---------------------------------
-            # Fluctuation–Dissipation (Simplified)
-            # <x^2> = kB T χ
-            # ---------------------------------
-            elif law == 'fdt':
-                chi = float(request.form['chi'])
-                T = float(request.form['T'])
-
-                fluct = kB * T * chi
-
-                result = {
-                    'law': 'Fluctuation–Dissipation Theorem',
-                    'fluct': fluct
-                }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template(
-        'thermo/fluctuation_noise_calculations.html',
-        result=result
-    )
+    return calculator_page('thermo/fluctuation_noise_calculations.html',
+                           'fluctuation_noise', mode_field='law')
 @app.route('/thermodynamics/turbulence-flow', methods=['GET', 'POST'])
+@response_cache.memoize()
 def turbulence_thermo():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            law = request.form['law']
-
-            # ---------------------------------
-            # Spectral Energy Balance
-            # ∂E/∂t = P − ε − ∂J/∂k
-            # ---------------------------------
-            if law == 'spectral':
-                P = float(request.form['P'])          # production
-                eps = float(request.form['eps'])      # dissipation
-                dJdk = float(request.form['dJdk'])    # flux gradient
-
-                dEdt = P - eps - dJdk
-
-                result = {
-                    'law': 'Spectral Energy Balance',
-                    'P': P,
-                    'eps': eps,
-                    'dJdk': dJdk,
-                    'dEdt': round(dEdt, 6)
-                }
-
-            # ---------------------------------
-            # Turbulent Entropy Production
-            # Σ = ε / T
-            # ---------------------------------
-            elif law == 'entropy_prod':
-                eps = float(request.form['eps'])      # dissipation
-                T = float(request.form['T'])          # temperature
-
-                Sigma = eps / T
-
-                result = {
-                    'law': 'Turbulent Entropy Production',
-                    'Sigma': round(Sigma, 6)
-                }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template(
-        'thermo/turbulence_flow_thermodynamics.html',
-        result=result
-    )
+    return calculator_page('thermo/turbulence_flow_thermodynamics.html',
+                           'turbulence_thermo', mode_field='law',
+                           echo={'spectral': ('P', 'eps', 'dJdk')},
+                           digits={'dEdt': 6, 'Sigma': 6})
 @app.route('/thermodynamics/advanced-properties', methods=['GET', 'POST'])
+@response_cache.memoize()
 def advanced_properties():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            law = request.form['law']
-
-            # ---------------------------------
-            # Isothermal Compressibility
-            # κT = − (1/V) (∂V/∂P)
-            # ---------------------------------
-            if law == 'compressibility':
-                V = float(request.form['V'])
-                dVdP = float(request.form['dVdP'])
-
-                kT = -(1 / V) * dVdP
-
-                result = {
-                    'law': 'Isothermal Compressibility',
-                    'kT': round(kT, 6)
-                }
-
-            # ---------------------------------
-            # Thermal Expansion Coefficient
-            # α = (1/V) (∂V/∂T)
-            # ---------------------------------
-            elif law == 'expansion':
-                V = float(request.form['V'])
-                dVdT = float(request.form['dVdT'])
-
-                alpha = (1 / V) * dVdT
-
-                result = {
-                    'law': 'Thermal Expansion Coefficient',
-                    'alpha': round(alpha, 6)
-                }
-
-            # ---------------------------------
-            # Joule–Thomson Coefficient
-            # μJT = (∂T/∂P)H
-            # ---------------------------------
-            elif law == 'joule_thomson':
-                dTdP = float(request.form['dTdP'])
-
-                result = {
-                    'law': 'Joule–Thomson Coefficient',
-                    'muJT': round(dTdP, 6)
-                }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template(
-        'thermo/advanced_property_relations.html',
-        result=result
-    )
+    return calculator_page('thermo/advanced_property_relations.html',
+                           'advanced_properties', mode_field='law',
+                           digits={'kT': 6, 'alpha': 6, 'muJT': 6})
 @app.route('/thermodynamics/multi-component-equilibrium', methods=['GET', 'POST'])
+@response_cache.memoize()
 def multi_component_eq():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            law = request.form['law']
-
-            # ---------------------------------
-            # Raoult's Law
-            # Pi = xi * Pi*
-            # ---------------------------------
-            if law == 'raoult':
-                xi = float(request.form['xi'])
-                P_star = float(request.form['P_star'])
-
-                Pi = xi * P_star
-
-                result = {
-                    'law': "Raoult's Law",
-                    'Pi': round(Pi, 5),
-                    'xi': xi,
-                    'P_star': P_star
-                }
-
-            # ---------------------------------
-            # Nernst / Electrochemical Relation
-            # ΔG = −n F E
-            # ---------------------------------
-            elif law == 'nernst':
-                n = float(request.form['n'])
-                E = float(request.form['E'])
-                F = 96485  # Faraday constant (C/mol)
-
-                deltaG = -n * F * E
-
-                result = {
-                    'law': "Nernst / Electrochemical Relation",
-                    'deltaG': round(deltaG, 3),
-                    'n': n,
-                    'E': E
-                }
-
-            # ---------------------------------
-            # Duhem–Margules (Simplified Form)
-            # x1 d(ln P1) + x2 d(ln P2) = 0
-            # ---------------------------------
-            elif law == 'duhem':
-                x1 = float(request.form['x1'])
-                dlnP1 = float(request.form['dlnP1'])
-                x2 = 1 - x1
-
-                dlnP2 = -(x1 / x2) * dlnP1
-
-                result = {
-                    'law': "Duhem–Margules Equation",
-                    'x1': x1,
-                    'x2': round(x2, 4),
-                    'dlnP1': dlnP1,
-                    'dlnP2': round(dlnP2, 6)
-                }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template(
-        'thermo/multi_component_equilibrium.html',
-        result=result
+    return calculator_page(
+        'thermo/multi_component_equilibrium.html', 'multi_component_eq',
+        mode_field='law',
+        echo={'raoult': ('xi', 'P_star'), 'nernst': ('n', 'E'), 'duhem': ('x1', 'dlnP1')},
+        digits={'Pi': 5, 'deltaG': 3, 'x2': 4, 'dlnP2': 6}
     )
 @app.route('/thermodynamics/superconductivity', methods=['GET', 'POST'])
+@response_cache.memoize()
 def superconductivity():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            law = request.form['law']
-
-            # ---------------------------------
-            # Critical Magnetic Field
-            # Hc = H0 [1 − (T/Tc)^2]
-            # ---------------------------------
-            if law == 'critical_field':
-                H0 = float(request.form['H0'])
-                T = float(request.form['T'])
-                Tc = float(request.form['Tc'])
-
-                Hc = H0 * (1 - (T / Tc) ** 2)
-
-                result = {
-                    'law': 'Critical Magnetic Field',
-                    'Hc': round(Hc, 6),
-                    'H0': H0,
-                    'T': T,
-                    'Tc': Tc
-                }
-
-            # ---------------------------------
-            # London Penetration Depth
-            # H(x) = H(0) e^(−x/λ)
-            # ---------------------------------
-            elif law == 'london':
-                H0 = float(request.form['H0'])
-                x = float(request.form['x'])
-                lam = float(request.form['lam'])
-
-                Hx = H0 * __import__('math').exp(-x / lam)
-
-                result = {
-                    'law': 'London Penetration Depth',
-                    'Hx': round(Hx, 6),
-                    'H0': H0,
-                    'x': x,
-                    'lam': lam
-                }
-
-            # ---------------------------------
-            # Gibbs Free Energy Difference
-            # ΔG = Gn − Gs
-            # ---------------------------------
-            elif law == 'gibbs_transition':
-                Gn = float(request.form['Gn'])
-                Gs = float(request.form['Gs'])
-
-                deltaG = Gn - Gs
-
-                result = {
-                    'law': 'Gibbs Free Energy of Transition',
-                    'deltaG': round(deltaG, 6)
-                }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template(
-        'thermo/superconductivity_phase_transition.html',
-        result=result
+    return calculator_page(
+        'thermo/superconductivity_phase_transition.html', 'superconductivity',
+        mode_field='law',
+        echo={'critical_field': ('H0', 'T', 'Tc'), 'london': ('H0', 'x', 'lam')},
+        digits={'Hc': 6, 'Hx': 6, 'deltaG': 6}
     )
+_STAGES = ('I', 'II', 'III', 'IV')
+
+def _ionization_curves(element=None, T=None, n=None, **_):
+    # Stage fractions from T/4 to 4T at the posted density (ionization mode only).
+    if element is None:
+        return {}
+    T_curve = np.geomspace(T / 4, T * 4, 120)
+    state = saha.ionize(T_curve, n, element)
+    abundances = saha.MIXTURES.get(element, {element: 1.0})
+    curves = {}
+    for name, fractions in state['fractions'].items():
+        if abundances[name] < 0.01 * sum(abundances.values()):
+            continue  # trace elements of a mixture would crowd the plot
+        for i in range(fractions.shape[-1]):
+            curves[f'{name} {_STAGES[i]}'] = plotdata.encode(fractions[:, i])
+    return {'curve_T': plotdata.encode(T_curve), 'curve_n': n, 'curves': curves}
+
 @app.route('/thermodynamics/plasma-astrophysical', methods=['GET', 'POST'])
+@response_cache.memoize()
 def plasma_astro():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            law = request.form['law']
-
-            kB = 1.380649e-23     # Boltzmann constant (J/K)
-            h = 6.62607015e-34    # Planck constant (J·s)
-            me = 9.10938356e-31   # Electron mass (kg)
-
-            # ---------------------------------
-            # Saha Ionization Equation (Simplified)
-            # ni+1 ne / ni = (2πme kT / h²)^(3/2) e^(−χ / kT)
-            # ---------------------------------
-            if law == 'saha':
-                T = float(request.form['T'])          # temperature
-                chi = float(request.form['chi'])      # ionization energy (J)
-
-                saha_ratio = ((2 * 3.14159 * me * kB * T) / h**2) ** 1.5 \
-                              * __import__('math').exp(-chi / (kB * T))
-
-                result = {
-                    'law': 'Saha Ionization Equation',
-                    'ratio': saha_ratio
-                }
-
-            # ---------------------------------
-            # Internal Partition Function (Simplified)
-            # Z = Σ gi e^(−Ei / kT)
-            # ---------------------------------
-            elif law == 'partition':
-                g1 = float(request.form['g1'])
-                E1 = float(request.form['E1'])
-                g2 = float(request.form['g2'])
-                E2 = float(request.form['E2'])
-                T = float(request.form['T'])
-
-                Z = g1 * __import__('math').exp(-E1 / (kB * T)) + \
-                    g2 * __import__('math').exp(-E2 / (kB * T))
-
-                result = {
-                    'law': 'Internal Partition Function',
-                    'Z': round(Z, 6)
-                }
-
-            # ---------------------------------
-            # Hydrostatic Equilibrium (Barometric Law)
-            # P(z) = P0 e^(−mgz / kT)
-            # ---------------------------------
-            elif law == 'hydrostatic':
-                P0 = float(request.form['P0'])
-                m = float(request.form['m'])
-                g = float(request.form['g'])
-                z = float(request.form['z'])
-                T = float(request.form['T'])
-
-                Pz = P0 * __import__('math').exp(-(m * g * z) / (kB * T))
-
-                result = {
-                    'law': 'Hydrostatic Equilibrium',
-                    'Pz': round(Pz, 6)
-                }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template(
-        'thermo/plasma_astrophysical_thermodynamics.html',
-        result=result
-    )
+    return calculator_page('thermo/plasma_astrophysical_thermodynamics.html',
+                           'plasma_astro', mode_field='law',
+                           digits={'Z': 6, 'Pz': 6, 'mean_charge': 6},
+                           series=_ionization_curves)
 @app.route('/thermodynamics/biological-chemical', methods=['GET', 'POST'])
+@response_cache.memoize()
 def bio_chem_thermo():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            law = request.form['law']
-
-            R = 8.314      # J/mol·K
-            F = 96485     # C/mol
-
-            # ---------------------------------
-            # Nernst Equation (Membrane Potential)
-            # E = (RT / zF) ln(Co / Ci)
-            # ---------------------------------
-            if law == 'nernst_membrane':
-                T = float(request.form['T'])
-                z = float(request.form['z'])
-                Cout = float(request.form['Cout'])
-                Cin = float(request.form['Cin'])
-
-                E = (R * T) / (z * F) * __import__('math').log(Cout / Cin)
-
-                result = {
-                    'law': 'Nernst Equation (Membrane Potential)',
-                    'E': round(E, 6)
-                }
-
-            # ---------------------------------
-            # Coupled Reactions
-            # ΔGtotal = ΔG1 + ΔG2
-            # ---------------------------------
-            elif law == 'coupled':
-                dG1 = float(request.form['dG1'])
-                dG2 = float(request.form['dG2'])
-
-                dG_total = dG1 + dG2
-
-                result = {
-                    'law': 'Coupled Biochemical Reactions',
-                    'dG_total': round(dG_total, 4),
-                    'feasible': 'Spontaneous' if dG_total < 0 else 'Non-spontaneous'
-                }
-
-            # ---------------------------------
-            # Chemical Potential (Biological Mixture)
-            # μ = μ0 + RT ln a
-            # ---------------------------------
-            elif law == 'chemical_potential':
-                mu0 = float(request.form['mu0'])
-                a = float(request.form['a'])
-                T = float(request.form['T'])
-
-                mu = mu0 + R * T * __import__('math').log(a)
-
-                result = {
-                    'law': 'Chemical Potential (Biological Systems)',
-                    'mu': round(mu, 4)
-                }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template(
-        'thermo/biological_chemical_thermodynamics.html',
-        result=result
-    )
+    return calculator_page('thermo/biological_chemical_thermodynamics.html',
+                           'bio_chem_thermo', mode_field='law',
+                           digits={'E': 6, 'dG_total': 4, 'mu': 4})
 @app.route('/thermodynamics/advanced-materials', methods=['GET', 'POST'])
+@response_cache.memoize()
 def advanced_materials():
-    result = None
-
-    if request.method == 'POST':
-        try:
-            law = request.form['law']
-
-            # ---------------------------------
-            # Roeser–Huber Formalism (Simplified)
-            # Tc = K * (a / d)^2
-            # ---------------------------------
-            if law == 'roeser_huber':
-                K = float(request.form['K'])      # material constant
-                a = float(request.form['a'])      # lattice parameter
-                d = float(request.form['d'])      # interatomic spacing
-
-                Tc = K * (a / d) ** 2
-
-                result = {
-                    'law': 'Roeser–Huber Formalism',
-                    'Tc': round(Tc, 4)
-                }
-
-            # ---------------------------------
-            # Low-Temperature Specific Heat
-            # Cv = γT + A T^3
-            # ---------------------------------
-            elif law == 'specific_heat':
-                gamma = float(request.form['gamma'])   # electronic coefficient
-                A = float(request.form['A'])           # lattice coefficient
-                T = float(request.form['T'])           # temperature
-
-                Cv = gamma * T + A * T**3
-
-                result = {
-                    'law': 'Low-Temperature Specific Heat of Metals',
-                    'Cv': round(Cv, 6),
-                    'T': T,
-                    'Ce': round(gamma * T, 6),
-                    'Cl': round(A * T**3, 6)
-                }
-
-        except:
-            result = {'error': 'Invalid input values'}
-
-    return render_template(
-        'thermo/advanced_material_calculations.html',
-        result=result
-    )
+    return calculator_page('thermo/advanced_material_calculations.html',
+                           'advanced_materials', mode_field='law',
+                           echo={'specific_heat': ('T',)},
+                           digits={'Tc': 4, 'Cv': 6, 'Ce': 6, 'Cl': 6})
+
+@app.route('/metrics')
+def metrics_endpoint():
+    if not metrics.enabled:
+        abort(404)
+    return Response(metrics.expose(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/v1/cache')
+def api_cache_stats():
+    return jsonify(response_cache.stats())
+
+# ---------------------------------
+# Batch JSON API
+# ---------------------------------
+@app.route('/api/v1/calculators')
+def api_calculators():
+    return jsonify({name: calc.describe() for name, calc in CALCULATORS.items()})
+
+@app.route('/api/v1/constants')
+def api_constants():
+    group = request.args.get('group') or None
+    if group is not None and group not in constants.GROUPS:
+        return jsonify({'error': f"group must be one of {', '.join(constants.GROUPS)}"}), 400
+    found = constants.search(request.args.get('q', ''), group)
+    response = jsonify({'constants': [constants.as_dict(c) for c in found]})
+    # The registry never changes while the app runs: clients revalidate with
+    # If-None-Match and get an empty 304 back.
+    response.add_etag()
+    response.headers['Cache-Control'] = 'public, no-cache'
+    return response.make_conditional(request)
+
+@app.route('/api/v1/convert')
+def api_units():
+    return jsonify({group: {'dimension': units.dimension(symbols[0]), 'units': list(symbols)}
+                    for group, symbols in units.GROUPS.items()})
+
+@app.route('/api/v1/convert', methods=['POST'])
+def api_convert():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+
+    budget = [app.config['BATCH_MAX_ROWS']]
+
+    def one(item):
+        if not isinstance(item, dict):
+            raise TypeError('each conversion must be an object')
+        values = item['values'] if 'values' in item else item['value']
+        budget[0] -= np.size(values)
+        if budget[0] < 0:
+            raise ValueError(f"at most {app.config['BATCH_MAX_ROWS']} values per request")
+        converted = units.convert(np.asarray(values, dtype=float), item['from'], item['to'])
+        return {'from': item['from'], 'to': item['to'],
+                'dimension': units.dimension(item['from']),
+                ('values' if 'values' in item else 'value'): _json_array(np.asarray(converted))}
+
+    try:
+        if 'conversions' not in payload:
+            return jsonify(one(payload))
+        conversions = payload['conversions']
+        if not isinstance(conversions, list):
+            raise TypeError("'conversions' must be a list")
+        return jsonify({'conversions': [one(item) for item in conversions]})
+    except KeyError as e:
+        metrics.count_error(e)
+        return jsonify({'error': f'Missing field {e}'}), 400
+    except (TypeError, ValueError) as e:
+        metrics.count_error(e)
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/v1/<calculator>/batch', methods=['POST'])
+def api_batch(calculator):
+    calc = CALCULATORS.get(calculator)
+    if calc is None:
+        return jsonify({'error': f"Unknown calculator '{calculator}'"}), 404
+
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Expected a JSON object with rows or columns'}), 400
+
+    try:
+        return jsonify(evaluate_batch(calc, payload, app.config['BATCH_MAX_ROWS']))
+    except BatchError as e:
+        metrics.count_error(e)
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/v1/projectile/trajectories', methods=['POST'])
+def api_trajectories():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+
+    try:
+        samples = int(payload.get('samples', 100))
+        launches = np.broadcast(*(np.asarray(payload.get(key, 0.0), dtype=float) for key in
+                                  ('speed', 'angle', 'height', 'gravity', 'drag_coefficient'))).size
+        if launches * samples > app.config['BATCH_MAX_ROWS'] * 10:
+            return jsonify({'error': 'Too many launches or samples in one request'}), 400
+        paths = trajectories(
+            payload['speed'], payload['angle'],
+            height=payload.get('height', 0.0),
+            gravity=payload.get('gravity', 9.80665),
+            drag=payload.get('drag', 'none'),
+            drag_coefficient=payload.get('drag_coefficient', 0.0),
+            samples=samples,
+        )
+        response = _curves(paths, payload, 'x', 'y')
+    except KeyError as e:
+        metrics.count_error(e)
+        return jsonify({'error': f'Missing field {e}'}), 400
+    except (TypeError, ValueError) as e:
+        metrics.count_error(e)
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify(response)
+
+@app.route('/api/v1/shm/simulate', methods=['POST'])
+def api_shm_simulate():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+
+    try:
+        samples = int(payload.get('samples', 500))
+        params = [np.asarray(payload.get(key, 0.0), dtype=float) for key in
+                  ('mass', 'k', 'amplitude', 'damping', 'force', 'drive_frequency')]
+        if np.broadcast(*params).size * samples > app.config['BATCH_MAX_ROWS'] * 10:
+            return jsonify({'error': 'Too many systems or samples in one request'}), 400
+        sim = simulate_oscillator(
+            payload['mass'], payload['k'], payload.get('amplitude', 0.0),
+            damping=payload.get('damping', 0.0),
+            force=payload.get('force', 0.0),
+            drive_frequency=payload.get('drive_frequency', 0.0),
+            duration=payload.get('duration'),
+            samples=samples,
+        )
+        response = _curves(sim, payload, 't', 'x')
+    except KeyError as e:
+        metrics.count_error(e)
+        return jsonify({'error': f'Missing field {e}'}), 400
+    except (TypeError, ValueError, RuntimeError) as e:
+        metrics.count_error(e)
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify(response)
+
+@app.route('/api/v1/thermo/process/stream', methods=['POST'])
+def api_process_stream():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+
+    try:
+        process = payload['process']
+        params = {key: float(payload.get(key, default)) for key, default in
+                  (('P1', 0.0), ('V1', 0.0), ('V2', 0.0), ('gamma', 1.4), ('P', 0.0))}
+        resolution = int(payload.get('resolution', 1000))
+        chunk_size = int(payload.get('chunk_size', 65536))
+        fmt = payload.get('format', 'ndjson')
+        if resolution > app.config['STREAM_MAX_POINTS']:
+            return jsonify({'error': 'Too many points in one request'}), 400
+        if not 1 <= chunk_size <= 1_000_000:
+            raise ValueError('chunk_size must be between 1 and 1000000')
+        if fmt not in ('ndjson', 'binary'):
+            raise ValueError("format must be 'ndjson' or 'binary'")
+        chunks = iter_process_chunks(process, resolution=resolution, chunk_size=chunk_size,
+                                     **params)
+        W, P2 = process_work(process, **params)
+    except KeyError as e:
+        metrics.count_error(e)
+        return jsonify({'error': f'Missing field {e}'}), 400
+    except (TypeError, ValueError, ArithmeticError) as e:
+        metrics.count_error(e)
+        return jsonify({'error': str(e)}), 400
+
+    headers = {'X-Process-Points': str(resolution), 'X-Process-Work': repr(W)}
+    if P2 is not None:
+        headers['X-Process-P2'] = repr(P2)
+
+    # Binary: per chunk a little-endian uint32 point count, then that many
+    # float64 volumes, then as many float64 pressures.
+    if fmt == 'binary':
+        def frames():
+            for V, P in chunks:
+                yield np.array([len(V)], dtype='<u4').tobytes()
+                yield V.astype('<f8').tobytes()
+                yield P.astype('<f8').tobytes()
+        return Response(frames(), mimetype='application/octet-stream', headers=headers)
+
+    # NDJSON: a header line, then one {"V": [...], "P": [...]} line per chunk.
+    def lines():
+        yield json.dumps({'process': process, 'points': resolution, 'W': W, 'P2': P2}) + '\n'
+        for V, P in chunks:
+            yield f'{{"V":[{",".join(map(repr, V.tolist()))}],"P":[{",".join(map(repr, P.tolist()))}]}}\n'
+    return Response(lines(), mimetype='application/x-ndjson', headers=headers)
+
+def _json_array(values):
+    """``tolist()`` with NaN (cycles that do not close) and overflowed ±inf as null."""
+    if values.dtype.kind != 'f':
+        return values.tolist()
+    out = values.astype(object)
+    out[~np.isfinite(values)] = None
+    return out.tolist()
+
+def _curves(series, payload, x, y):
+    """``series`` for ``jsonify``: cut to the request's ``max_points`` by its
+    ``decimation`` ('lttb' or 'minmax') and, with ``encoding`` 'f4' (float32)
+    or 'f8', float arrays packed as base64 typed arrays that Plotly reads as is."""
+    encoding = payload.get('encoding', 'json')
+    if encoding != 'json' and encoding not in plotdata.DTYPES:
+        raise ValueError(f"encoding must be one of json, {', '.join(plotdata.DTYPES)}")
+    budget = payload.get('max_points')
+    series = plotdata.decimate(series, None if budget is None else int(budget), x, y,
+                               payload.get('decimation', 'lttb'))
+    response = {}
+    for key, value in series.items():
+        value = np.asarray(value)
+        if encoding != 'json' and value.ndim and value.dtype.kind == 'f':
+            response[key] = plotdata.encode(value, encoding)
+        else:
+            response[key] = _json_array(value)
+    return response
+
+@app.route('/api/v1/thermo/cycle', methods=['POST'])
+def api_thermo_cycle():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+
+    try:
+        cycle = payload['cycle']
+        points = int(payload.get('points', 50))
+        params = {key: np.asarray(payload.get(key, default), dtype=float) for key, default in
+                  (('P1', 101325.0), ('V1', 1e-3), ('T1', 300.0), ('T_max', 1500.0))}
+        r = np.asarray(payload['compression_ratio'], dtype=float)
+        gamma = np.asarray(payload.get('gamma', 1.4), dtype=float)
+        grid = bool(payload.get('grid', False))
+        shape = (r.size, gamma.size) if grid else np.broadcast_shapes(r.shape, gamma.shape)
+        size = math.prod(np.broadcast_shapes(shape, *(p.shape for p in params.values())))
+        if size * max(points, 1) * len(CYCLES.get(cycle, ())) > app.config['BATCH_MAX_ROWS'] * 10:
+            return jsonify({'error': 'Too many cycles or points in one request'}), 400
+        regenerator = bool(payload.get('regenerator', True))
+        if grid:
+            sim = cycle_sweep(cycle, r, gamma, points=points, regenerator=regenerator, **params)
+        else:
+            sim = simulate_cycle(cycle, compression_ratio=r, gamma=gamma, points=points,
+                                 regenerator=regenerator, **params)
+    except KeyError as e:
+        metrics.count_error(e)
+        return jsonify({'error': f'Missing field {e}'}), 400
+    except (TypeError, ValueError) as e:
+        metrics.count_error(e)
+        return jsonify({'error': str(e)}), 400
+
+    response = {key: _json_array(value) for key, value in sim.items()}
+    response['legs'] = CYCLES[cycle]
+    return jsonify(response)
+
+@app.route('/api/v1/thermo/eos', methods=['POST'])
+def api_thermo_eos():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+
+    try:
+        given = [key for key in ('P', 'V', 'T') if key in payload]
+        state = {key: np.asarray(payload[key], dtype=float) for key in given}
+        if payload.get('grid') and len(given) == 2:
+            # Every value of the first given variable with every value of the second.
+            first, second = given
+            state[first], state[second] = np.meshgrid(state[first].ravel(),
+                                                      state[second].ravel(), indexing='ij')
+        fluid = {key: payload[key] for key in ('gas', 'Tc', 'Pc', 'omega', 'a', 'b')
+                 if key in payload}
+        size = math.prod(np.broadcast_shapes(*(v.shape for v in state.values())))
+        if size > app.config['BATCH_MAX_ROWS'] * 10:
+            return jsonify({'error': 'Too many states in one request'}), 400
+        result = eos.solve(payload.get('eos', 'pr'), n=payload.get('n', 1.0),
+                           phase=payload.get('phase', 'stable'), **fluid, **state)
+    except (TypeError, ValueError) as e:
+        metrics.count_error(e)
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({key: _json_array(np.asarray(value)) for key, value in result.items()})
+
+@app.route('/api/v1/thermo/tables')
+def api_thermo_tables():
+    try:
+        return jsonify(property_tables.index)
+    except TableError as e:
+        metrics.count_error(e)
+        return jsonify({'error': str(e)}), 404
+
+@app.route('/api/v1/thermo/tables/<kind>', methods=['POST'])
+def api_thermo_table_lookup(kind):
+    if kind not in ('isotherms', 'saturation'):
+        abort(404)
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+
+    try:
+        fluid = {key: payload[key] for key in ('gas', 'Tc', 'Pc', 'a', 'b') if key in payload}
+        T = np.asarray(payload['T'], dtype=float)
+        if kind == 'isotherms':
+            V = np.asarray(payload['V'], dtype=float)
+            if payload.get('grid'):
+                T, V = np.meshgrid(T.ravel(), V.ravel(), indexing='ij')
+            if np.broadcast(T, V).size > app.config['BATCH_MAX_ROWS'] * 10:
+                return jsonify({'error': 'Too many states in one request'}), 400
+            result = property_tables.isotherms(payload.get('eos', 'vdw'), T, V,
+                                               n=float(payload.get('n', 1.0)), **fluid)
+        else:
+            if T.size > app.config['BATCH_MAX_ROWS'] * 10:
+                return jsonify({'error': 'Too many states in one request'}), 400
+            result = property_tables.saturation(payload.get('eos', 'vdw'), T, **fluid)
+    except KeyError as e:
+        metrics.count_error(e)
+        return jsonify({'error': f'Missing field {e}'}), 400
+    except (TypeError, ValueError) as e:
+        metrics.count_error(e)
+        return jsonify({'error': str(e)}), 400
+    except TableError as e:
+        metrics.count_error(e)
+        return jsonify({'error': str(e)}), 404
+
+    return jsonify({key: _json_array(np.asarray(value)) for key, value in result.items()})
+
+@app.route('/api/v1/thermo/partition', methods=['POST'])
+def api_thermo_partition():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+
+    try:
+        E = np.asarray(payload['E'], dtype=float)
+        g = payload.get('g')
+        g = None if g is None else np.asarray(g, dtype=float)
+        T = np.asarray(payload['T'], dtype=float)
+        if payload.get('grid') and E.ndim:
+            # Every spectrum at every temperature: spectra axes first, then T.
+            E = E.reshape(E.shape[:-1] + (1,) * T.ndim + E.shape[-1:])
+            if g is not None and g.ndim:
+                g = g.reshape(g.shape[:-1] + (1,) * T.ndim + g.shape[-1:])
+        size = math.prod(np.broadcast_shapes(E.shape[:-1], T.shape))
+        if size * max(E.shape[-1:] or (1,)) > app.config['BATCH_MAX_ROWS'] * 1000:
+            return jsonify({'error': 'Too many levels or temperatures in one request'}), 400
+        result = partition_thermodynamics(E, T, g)
+    except KeyError as e:
+        metrics.count_error(e)
+        return jsonify({'error': f'Missing field {e}'}), 400
+    except (TypeError, ValueError) as e:
+        metrics.count_error(e)
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({key: _json_array(value) for key, value in result.items()})
+
+@app.route('/api/v1/plasma/saha', methods=['POST'])
+def api_plasma_saha():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+
+    try:
+        T = np.asarray(payload['T'], dtype=float)
+        n = np.asarray(payload['n'], dtype=float)
+        grid = bool(payload.get('grid', False))
+        size = T.size * n.size if grid else np.broadcast(T, n).size
+        if size > app.config['BATCH_MAX_ROWS'] * 10:
+            return jsonify({'error': 'Too many grid cells in one request'}), 400
+        solve = saha.ionization_map if grid else saha.ionize
+        state = solve(T, n, payload.get('elements', 'H'), payload.get('chi'), payload.get('g'))
+    except KeyError as e:
+        metrics.count_error(e)
+        return jsonify({'error': f'Missing field {e}'}), 400
+    except (TypeError, ValueError) as e:
+        metrics.count_error(e)
+        return jsonify({'error': str(e)}), 400
+
+    response = {key: _json_array(state[key]) for key in ('n_e', 'mean_charge', 'neutral_fraction')}
+    response['fractions'] = {name: _json_array(f) for name, f in state['fractions'].items()}
+    return jsonify(response)
+
+@app.route('/api/v1/thermo/fluids')
+def api_thermo_fluids():
+    return jsonify(fluids.default_tables().index)
+
+@app.route('/api/v1/thermo/fluids/<fluid>/state', methods=['POST'])
+def api_thermo_fluid_state(fluid):
+    if fluid not in fluids.FLUIDS:
+        abort(404)
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+
+    try:
+        P = np.asarray(payload['P'], dtype=float)
+        if ('T' in payload) == ('s' in payload):
+            return jsonify({'error': 'Give exactly one of T and s with P'}), 400
+        other = 'T' if 'T' in payload else 's'
+        value = np.asarray(payload[other], dtype=float)
+        if np.broadcast(P, value).size > app.config['BATCH_MAX_ROWS'] * 10:
+            return jsonify({'error': 'Too many states in one request'}), 400
+        tables = fluids.default_tables()
+        state = tables.state_pt(fluid, P, value) if other == 'T' else tables.state_ps(fluid, P, value)
+    except KeyError as e:
+        metrics.count_error(e)
+        return jsonify({'error': f'Missing field {e}'}), 400
+    except (TypeError, ValueError) as e:
+        metrics.count_error(e)
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({key: _json_array(np.asarray(value)) for key, value in state.items()})
+
+@app.route('/api/v1/thermo/jarzynski', methods=['POST'])
+def api_thermo_jarzynski():
+    payload = request.form if request.files else request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Expected a JSON object or uploaded work files'}), 400
+
+    try:
+        forward = _uploaded_numbers(payload, 'W')
+        if forward is None:
+            raise KeyError('W')
+        result = jarzynski.estimate(forward, _uploaded_numbers(payload, 'W_reverse'),
+                                    **_work_options(payload))
+    except KeyError as e:
+        metrics.count_error(e)
+        return jsonify({'error': f'Missing field {e}'}), 400
+    except (TypeError, ValueError) as e:
+        metrics.count_error(e)
+        return jsonify({'error': str(e)}), 400
+
+    for key in ('forward', 'reverse', 'bar'):
+        if key in result:
+            result[key] = {name: _json_array(np.asarray(value)) for name, value in result[key].items()}
+    return jsonify(result)
+
+@app.route('/api/v1/thermo/information', methods=['POST'])
+def api_thermo_information():
+    payload = request.form if request.files else request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Expected a JSON object or uploaded distributions'}), 400
+
+    given = set(payload) | set(request.files)
+    try:
+        if 'joint' in given:
+            result = _information(payload, ('joint',), information.mutual_information)
+        elif 'q' in given:
+            result = _information(payload, ('p', 'q'), information.divergence)
+        else:
+            result = _information(payload, ('p',), information.entropy)
+    except KeyError as e:
+        metrics.count_error(e)
+        return jsonify({'error': f'Missing field {e}'}), 400
+    except (TypeError, ValueError) as e:
+        metrics.count_error(e)
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({key: _json_array(np.asarray(value)) for key, value in result.items()})
+
+# ---------------------------------
+# Background jobs
+# ---------------------------------
+def _job_links(job_id):
+    return {'status': url_for('api_job', job_id=job_id),
+            'result': url_for('api_job_result', job_id=job_id),
+            'cancel': url_for('api_job_cancel', job_id=job_id)}
+
+@app.route('/api/v1/simulations/<method>', methods=['POST'])
+def api_submit_simulation(method):
+    if method not in SIMULATIONS:
+        return jsonify({'error': f"Unknown simulation '{method}'"}), 404
+    if 'username' not in session:
+        return jsonify({'error': 'Log in to run simulations'}), 401
+
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+
+    try:
+        job_id = simulation_jobs.submit(method, payload, session['username'])
+    except JobLimitError as e:
+        metrics.count_error(e)
+        return jsonify({'error': str(e)}), 429
+    except JobUnavailableError as e:
+        metrics.count_error(e)
+        return jsonify({'error': str(e)}), 503
+    except JobError as e:
+        metrics.count_error(e)
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({'id': job_id, **_job_links(job_id)}), 202
+
+@app.route('/api/v1/jobs')
+def api_jobs():
+    if 'username' not in session:
+        return jsonify({'error': 'Log in to list your jobs'}), 401
+    return jsonify(simulation_jobs.jobs(session['username']))
+
+@app.route('/api/v1/jobs/<job_id>')
+def api_job(job_id):
+    try:
+        job = simulation_jobs.status(job_id, session.get('username'))
+    except JobError:
+        abort(404)
+    job.update(_job_links(job_id))
+    return jsonify(job)
+
+@app.route('/api/v1/jobs/<job_id>/result')
+def api_job_result(job_id):
+    try:
+        job = simulation_jobs.status(job_id, session.get('username'))
+        result = simulation_jobs.result(job_id, session.get('username'))
+    except JobError:
+        abort(404)
+    if result is None:
+        return jsonify({'error': f"Job is {job['state']}", 'state': job['state']}), 409
+    return jsonify({key: _json_array(np.asarray(value)) for key, value in result.items()})
+
+@app.route('/api/v1/jobs/<job_id>/cancel', methods=['POST'])
+def api_job_cancel(job_id):
+    try:
+        cancelled = simulation_jobs.cancel(job_id, session.get('username'))
+    except JobError:
+        abort(404)
+    return jsonify({'id': job_id, 'cancelled': cancelled})
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,230 @@
+"""Templates and static files, prepared once when the app starts.
+
+* Every template is compiled up front, so no request pays for parsing one,
+  and the compiled code goes to a Jinja bytecode cache on disk, so the next
+  worker or restart skips the compilation as well.
+* ``static_url('css/physis.css')`` in a template adds a hash of the file's
+  content to its URL.  Such versioned URLs never change content, so they
+  are served with a year-long, immutable cache lifetime.
+* Plotly is self-hosted: a bundle pinned to ``PLOTLY_VERSION`` holding only
+  the trace types the pages draw, built once with
+
+      python assets.py path/to/plotly.js      # a checkout, after `npm ci`
+      python assets.py plotly-2.35.2.min.js   # or a built bundle, as is
+
+  into ``static/vendor`` under a content-hashed file name, next to gzip and
+  brotli (if the ``brotli`` package is installed) copies that are sent to
+  browsers accepting them.  ``manifest.json`` there maps the logical name
+  ``vendor/plotly.min.js`` to the built file.  Until it is built, pages
+  fall back to the same pinned version on the Plotly CDN.
+
+Pages that plot set ``plots`` (``{% set plots = true %}``), which adds
+``static/js/plots.js``: a stand-in ``Plotly`` that fetches the bundle the
+first time the page draws a plot, so forms without results never load it.
+
+``TEMPLATE_CACHE_DIR`` picks the bytecode cache directory (default: a
+per-user directory in the system temp dir) or turns it ``off``.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import subprocess
+
+from flask import request, send_from_directory, url_for
+from jinja2 import FileSystemBytecodeCache
+from jinja2.utils import LRUCache
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+VENDOR = 'vendor'
+
+PLOTLY_VERSION = '2.35.2'
+# Every trace type the templates draw; the self-hosted bundle has only these.
+PLOTLY_TRACES = ('scatter', 'bar', 'histogram')
+PLOTLY_CDN = f'https://cdn.plot.ly/plotly-{PLOTLY_VERSION}.min.js'
+
+# Content-Encoding -> suffix of the precompressed copy, in order of preference
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+
+def static_versions(folder):
+    """``{path relative to folder: short content hash}`` of every static file
+    outside ``vendor``, whose names already carry their hash."""
+    versions = {}
+    for root, dirs, files in os.walk(folder):
+        if root == folder:
+            dirs[:] = [d for d in dirs if d != VENDOR]
+        for name in files:
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()[:12]
+            versions[os.path.relpath(path, folder).replace(os.sep, '/')] = digest
+    return versions
+
+
+def load_manifest(folder):
+    """``{logical name: entry}`` of the built vendor files, ``{}`` before a build."""
+    try:
+        with open(os.path.join(folder, VENDOR, 'manifest.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def precompile_templates(env):
+    """Load every template into ``env``'s cache; returns how many there are."""
+    names = env.list_templates(extensions=('html',))
+    if env.cache is not None and env.cache.capacity < len(names):
+        env.cache = LRUCache(2 * len(names))
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+def init_app(app, cache_dir=None):
+    folder = app.static_folder
+    versions = static_versions(folder) if os.path.isdir(folder) else {}
+    manifest = load_manifest(folder)
+    # built file -> manifest entry; the file name is the version
+    hashed = {entry['file']: entry for entry in manifest.values()}
+
+    # Built once here rather than with url_for on every render, which would
+    # cost more than rendering the rest of a small page.
+    root = app.config.get('APPLICATION_ROOT', '/').rstrip('/')
+    urls = {name: f'{root}{app.static_url_path}/{name}?v={version}'
+            for name, version in versions.items()}
+    urls.update((name, f'{root}{app.static_url_path}/{entry["file"]}')
+                for name, entry in manifest.items())
+
+    def static_url(filename):
+        return urls.get(filename) or url_for('static', filename=filename)
+
+    @app.before_request
+    def send_precompressed():
+        if request.endpoint != 'static':
+            return None
+        filename = request.view_args.get('filename')
+        for encoding in hashed[filename]['encodings'] if filename in hashed else ():
+            if request.accept_encodings[encoding]:
+                response = send_from_directory(folder, filename + ENCODINGS[encoding],
+                                               mimetype=mimetypes.guess_type(filename)[0])
+                response.headers['Content-Encoding'] = encoding
+                return response
+        return None
+
+    @app.after_request
+    def cache_versioned(response):
+        if request.endpoint != 'static' or response.status_code != 200:
+            return response
+        filename = request.view_args.get('filename')
+        version = request.args.get('v')
+        if filename in hashed:
+            response.headers['Cache-Control'] = IMMUTABLE
+            if hashed[filename]['encodings']:
+                response.vary.add('Accept-Encoding')
+        elif version and version == versions.get(filename):
+            response.headers['Cache-Control'] = IMMUTABLE
+        return response
+
+    env = app.jinja_env
+    env.globals['static_url'] = static_url
+    env.globals['plotly_url'] = urls.get(f'{VENDOR}/plotly.min.js', PLOTLY_CDN)
+    if cache_dir != 'off':
+        env.bytecode_cache = FileSystemBytecodeCache(cache_dir or None)
+    precompile_templates(env)
+    return versions
+
+
+def assets_from_env(app):
+    return init_app(app, os.getenv('TEMPLATE_CACHE_DIR'))
+
+
+# ---------------- Build ----------------
+
+def _check_version(version, source):
+    if version != PLOTLY_VERSION:
+        raise SystemExit(f'{source} is plotly.js {version or "of unknown version"}, '
+                         f'expected {PLOTLY_VERSION} (PLOTLY_VERSION)')
+
+
+def plotly_bundle(source, traces=PLOTLY_TRACES):
+    """``(path, traces)`` of the minified bundle to ship.
+
+    ``source`` is a plotly.js checkout with its npm dependencies installed,
+    from which a custom bundle of ``traces`` is built, or a built bundle
+    file, used as is (its traces are then unknown: None)."""
+    if os.path.isdir(source):
+        with open(os.path.join(source, 'package.json'), encoding='utf-8') as f:
+            _check_version(json.load(f).get('version'), source)
+        subprocess.run(['npm', 'run', 'custom-bundle', '--', '--out', 'physis',
+                        '--traces', ','.join(traces)], cwd=source, check=True)
+        return os.path.join(source, 'dist', 'plotly-physis.min.js'), list(traces)
+    with open(source, 'rb') as f:
+        header = f.read(512).decode('utf-8', 'replace')
+    # '* plotly.js v2.35.2' or, for partial bundles, '* plotly.js (basic - minified) v2.35.2'
+    match = re.search(r'plotly\.js(?: \([^)]*\))? v(\d[\w.-]*)', header)
+    _check_version(match and match.group(1), source)
+    return source, None
+
+
+def _compressed(data):
+    """``{encoding: bytes}`` at the highest compression levels."""
+    variants = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        print('brotli is not installed: no .br copy')
+    else:
+        variants['br'] = brotli.compress(data, quality=11)
+    return variants
+
+
+def build(source, static_folder=STATIC_DIR):
+    """Write the Plotly bundle, its compressed copies and the manifest."""
+    path, traces = plotly_bundle(source)
+    with open(path, 'rb') as f:
+        data = f.read()
+    name = f'plotly-{PLOTLY_VERSION}.{hashlib.sha256(data).hexdigest()[:12]}.min.js'
+    directory = os.path.join(static_folder, VENDOR)
+    os.makedirs(directory, exist_ok=True)
+    for old in os.listdir(directory):
+        if old.startswith('plotly-') and not old.startswith(name):
+            os.remove(os.path.join(directory, old))
+
+    variants = _compressed(data)
+    with open(os.path.join(directory, name), 'wb') as f:
+        f.write(data)
+    for encoding, compressed in variants.items():
+        with open(os.path.join(directory, name + ENCODINGS[encoding]), 'wb') as f:
+            f.write(compressed)
+
+    entry = {
+        'file': f'{VENDOR}/{name}', 'version': PLOTLY_VERSION, 'traces': traces,
+        'encodings': [e for e in ENCODINGS if e in variants],
+        'bytes': {'identity': len(data), **{e: len(v) for e, v in variants.items()}},
+    }
+    manifest = load_manifest(static_folder)
+    manifest[f'{VENDOR}/plotly.min.js'] = entry
+    with open(os.path.join(directory, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    sizes = '  '.join(f'{e} {n / 1024:.0f} KiB' for e, n in entry['bytes'].items())
+    print(f'{entry["file"]}  {sizes}')
+    return entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the self-hosted Plotly bundle.')
+    parser.add_argument('source', help=f'plotly.js {PLOTLY_VERSION} checkout (needs npm) '
+                                       'or built bundle file')
+    parser.add_argument('--out', default=STATIC_DIR, help='static folder')
+    args = parser.parse_args()
+    build(args.source, args.out)
+
+
+if __name__ == '__main__':
+    main()
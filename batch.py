@@ -0,0 +1,171 @@
+"""Batch evaluation of registered calculators over JSON payloads.
+
+A payload is either row oriented::
+
+    {"rows": [{"mass": 2, "velocity": 3}, {"mass": 1, "velocity": 4}]}
+
+or columnar, where a scalar is broadcast to every row::
+
+    {"columns": {"mass": [2, 1], "velocity": 3}}
+
+Inputs may be sent, and outputs returned, in units other than the declared
+ones as long as the dimension matches (see ``/api/v1/calculators``)::
+
+    {"columns": {"mass": [2000, 1000], "velocity": 3},
+     "units": {"mass": "g"}, "output_units": {"ke": "kJ"}}
+
+The response mirrors the input layout.  Rows that cannot be evaluated come
+back as ``null`` and are listed in ``errors`` with their index, instead of
+failing the whole request.
+"""
+import numpy as np
+
+import units
+
+
+class BatchError(ValueError):
+    """Raised for payloads that cannot be evaluated at all."""
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _float_column(values):
+    try:
+        column = np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        column = None
+    if column is None or column.ndim != 1:  # non-numeric or nested values
+        column = np.array([_to_float(v) for v in values], dtype=float)
+    return column
+
+
+def _read_rows(calc, rows):
+    if not isinstance(rows, list):
+        raise BatchError("'rows' must be a list of objects")
+    missing = object()
+    columns = {}
+    for name in calc.inputs:
+        default = calc.defaults.get(name, missing)
+        columns[name] = [
+            row.get(name, default) if isinstance(row, dict) else missing
+            for row in rows
+        ]
+    return columns, len(rows), missing
+
+
+def _read_columns(calc, columns):
+    if not isinstance(columns, dict):
+        raise BatchError("'columns' must be an object of field -> list")
+    for name, value in columns.items():
+        values = value if isinstance(value, list) else [value]
+        if any(isinstance(v, (list, dict)) for v in values):
+            raise BatchError(f"column '{name}' must be a scalar or a list of scalars")
+    lengths = {len(v) for v in columns.values() if isinstance(v, list)}
+    if len(lengths) > 1:
+        raise BatchError('all list columns must have the same length')
+    n = lengths.pop() if lengths else 1
+    missing = object()
+    out = {}
+    for name in calc.inputs:
+        value = columns.get(name, calc.defaults.get(name, missing))
+        out[name] = value if isinstance(value, list) else [value] * n
+    return out, n, missing
+
+
+def _unit_map(payload, key, declared):
+    """Validated ``{field: unit}`` from ``payload[key]``; each conversion is
+    checked (and cached) here, once, before any row is touched."""
+    mapping = payload.get(key, {})
+    if not isinstance(mapping, dict):
+        raise BatchError(f"'{key}' must be an object of field -> unit")
+    for name, unit in mapping.items():
+        if name not in declared:
+            raise BatchError(f"'{key}' names unknown numeric field '{name}'")
+        try:
+            units.converter(unit, declared[name])
+        except units.UnitError as e:
+            raise BatchError(f"'{name}': {e}") from None
+    return mapping
+
+
+def evaluate_batch(calc, payload, max_rows):
+    if 'columns' in payload:
+        layout = 'columns'
+        raw, n, missing = _read_columns(calc, payload['columns'])
+    elif 'rows' in payload:
+        layout = 'rows'
+        raw, n, missing = _read_rows(calc, payload['rows'])
+    else:
+        raise BatchError("payload must contain 'rows' or 'columns'")
+    if n > max_rows:
+        raise BatchError(f'batch too large ({n} rows, limit {max_rows})')
+    input_units = _unit_map(payload, 'units', {name: unit for name, unit in calc.units.items()
+                                               if name not in calc.choices})
+    output_units = _unit_map(payload, 'output_units', calc.outputs)
+
+    ok = np.ones(n, dtype=bool)
+    messages = [None] * n
+
+    def reject(bad, message):
+        for i in np.flatnonzero(bad & ok):
+            messages[i] = message
+        ok[bad] = False
+
+    inputs = {}
+    for name in calc.inputs:
+        values = raw[name]
+        reject(np.fromiter((v is missing for v in values), bool, n), f"missing field '{name}'")
+        if name in calc.choices:
+            column = np.array([v if isinstance(v, str) else '' for v in values])
+            allowed = calc.choices[name]
+            reject(~np.isin(column, allowed), f"'{name}' must be one of {', '.join(allowed)}")
+        else:
+            column = _float_column([None if v is missing else v for v in values])
+            reject(~np.isfinite(column), f"'{name}' must be a finite number")
+            if name in input_units:
+                column = units.convert(column, input_units[name], calc.units[name])
+        inputs[name] = column
+
+    with np.errstate(all='ignore'):
+        for message, predicate in calc.checks:
+            reject(~np.asarray(predicate(**inputs), dtype=bool), message)
+        outputs = {
+            key: np.broadcast_to(np.asarray(value), (n,))
+            for key, value in calc(**inputs).items()
+        }
+
+    for key, unit in output_units.items():
+        if key in outputs and outputs[key].dtype.kind in 'fiu':
+            outputs[key] = units.convert(outputs[key], calc.outputs[key], unit)
+
+    for key, value in outputs.items():
+        if value.dtype.kind in 'fc':
+            reject(~np.isfinite(value), f"'{key}' is not finite (division by zero or out of domain)")
+
+    bad = np.flatnonzero(~ok)
+    columns = {}
+    for key, value in outputs.items():
+        column = value.tolist()
+        for i in bad:
+            column[i] = None
+        columns[key] = column
+
+    response = {
+        'calculator': calc.name,
+        'count': n,
+        'errors': [{'row': int(i), 'error': messages[i]} for i in bad],
+    }
+    if layout == 'columns':
+        response['columns'] = columns
+    else:
+        keys = list(columns)
+        response['rows'] = [
+            dict(zip(keys, values)) if good else None
+            for good, values in zip(ok.tolist(), zip(*columns.values()))
+        ]
+    return response
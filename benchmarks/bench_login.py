@@ -0,0 +1,69 @@
+"""Logins per second: pooled connections vs. a fresh connect per request.
+
+Both variants run the same login flow through Flask's test client against a
+throw-away database.  Benchmark users are hashed with a cheap PBKDF2 setting
+so the database path, not password hashing, dominates the measurement.
+
+    python benchmarks/bench_login.py --logins 5000
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logins', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=200)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    os.environ['DATABASE_PATH'] = os.path.join(tmpdir, 'bench_users.db')
+
+    from flask import redirect, request, session, url_for
+    from werkzeug.security import check_password_hash, generate_password_hash
+
+    from app import app
+    import db
+
+    path = app.config['DATABASE']
+    hashed = generate_password_hash('secret', method='pbkdf2:sha256:1')
+    with sqlite3.connect(path) as conn:
+        conn.executemany(db.INSERT_USER,
+                         [(f'user{i}', hashed) for i in range(args.users)])
+
+    # The login handler as it was before the pool: connect, query, close.
+    def legacy_login():
+        conn = sqlite3.connect(path)
+        c = conn.cursor()
+        c.execute("SELECT * FROM users WHERE username=?", (request.form['username'],))
+        user = c.fetchone()
+        conn.close()
+        if user and check_password_hash(user[2], request.form['password']):
+            session['username'] = request.form['username']
+            return redirect(url_for('dashboard'))
+        return 'Invalid Credentials'
+
+    app.add_url_rule('/_bench/legacy-login', 'legacy_login', legacy_login, methods=['POST'])
+    client = app.test_client()
+
+    for label, url in (('per-request connect', '/_bench/legacy-login'),
+                       ('pooled', '/login')):
+        for i in range(50):  # warm-up
+            client.post(url, data={'username': f'user{i % args.users}', 'password': 'secret'})
+        start = time.perf_counter()
+        for i in range(args.logins):
+            resp = client.post(url, data={'username': f'user{i % args.users}', 'password': 'secret'})
+            assert resp.status_code == 302, resp.status_code
+        elapsed = time.perf_counter() - start
+        print(f'{label:>20}: {args.logins / elapsed:8.0f} logins/s '
+              f'({elapsed / args.logins * 1e6:.0f} µs/login)')
+
+
+if __name__ == '__main__':
+    main()
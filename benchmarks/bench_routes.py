@@ -0,0 +1,358 @@
+"""Latency, throughput and allocations for every route of the app.
+
+Each case is one request (GET of a page, or POST of a calculator form with
+inputs that pass its checks).  Every case is driven twice:
+
+* through Flask's test client, timing the whole request and, inside it, the
+  view function and the Jinja render (via the ``before_render_template`` /
+  ``template_rendered`` signals); compute is view time minus render time
+* by calling the view function directly in a request context, without the
+  WSGI round trip
+
+plus the bare registry formula for calculator forms, and a tracemalloc pass
+for the peak memory allocated per request.  The response cache is off unless
+``--cache`` is given, and the table lookups are skipped (and listed as
+such) until ``python tables.py`` has built the tables.  Results are written
+as JSON so runs on different commits can be diffed, or compared directly
+with ``--baseline``:
+
+    python benchmarks/bench_routes.py --requests 200 --output before.json
+    python benchmarks/bench_routes.py --baseline before.json --output after.json
+    python benchmarks/bench_routes.py --only thermodynamics
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from importlib import metadata
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+
+# Routes whose mode selector is not called ``law``.
+MODE_FIELDS = {
+    'advanced_cycles': 'cycle',
+    'advanced_efficiency': 'calc',
+    'legendre': 'transform',
+    'molecular_simulation': 'method',
+}
+
+# Inputs that need more than the generic sample value to pass their checks.
+SAMPLE_VALUES = {'Q1': 1000.0, 'Q2': 400.0, 'Th': 500.0, 'Tc': 300.0,
+                 'P_high': 8000.0, 'P_low': 10.0, 'T_high': 480.0}
+
+# Forms for pages that are not plain registry calculators.
+EXTRA_FORMS = {
+    'currency_conversion': {'amount': '100', 'from_currency': 'USD', 'to_currency': 'EUR'},
+    'thermo_process': {'process': 'adiabatic', 'P1': '100000', 'V1': '1', 'V2': '2', 'gamma': '1.4'},
+    'maxwell': {'relation': '3'},
+}
+
+# JSON API payloads, posted as ``json=``.
+JSON_BODIES = {
+    'api_trajectories': {'speed': [10, 20, 30], 'angle': [30, 45, 60], 'drag': 'linear',
+                         'drag_coefficient': 0.1},
+    'api_shm_simulate': {'mass': 1, 'k': 4, 'amplitude': 0.1, 'damping': [0.1, 0.5],
+                         'force': 1, 'drive_frequency': 2, 'samples': 200},
+    'api_process_stream': {'process': 'adiabatic', 'P1': 100000, 'V1': 1, 'V2': 2,
+                           'resolution': 10000},
+    'api_thermo_cycle': {'cycle': 'otto', 'compression_ratio': [4, 6, 8, 10, 12],
+                         'gamma': [1.3, 1.4, 1.67], 'grid': True},
+    'api_thermo_eos': {'eos': 'pr', 'gas': 'CO2', 'V': list(np.geomspace(6e-5, 1e-2, 200)),
+                       'T': list(np.linspace(250, 400, 50)), 'grid': True},
+    'api_thermo_partition': {'E': list(1.380649e-21 * (np.arange(2000) + 0.5)),
+                             'T': list(np.linspace(5, 1000, 200))},
+    'api_plasma_saha': {'T': list(np.geomspace(2000, 1e5, 100)),
+                        'n': list(np.geomspace(1e6, 1e30, 100)), 'elements': 'solar', 'grid': True},
+    'api_thermo_jarzynski': {'W': list(np.random.default_rng(0).normal(3.0, 1.5, 10000)),
+                             'W_reverse': list(np.random.default_rng(1).normal(-1.0, 1.5, 10000)),
+                             'units': 'kT'},
+    'api_thermo_information': {'joint': np.random.default_rng(2).integers(0, 50, (200, 100)).tolist(),
+                               'T': 300},
+    'api_convert': {'conversions': [{'values': list(range(1000)), 'from': 'km/h', 'to': 'm/s'},
+                                    {'values': list(range(1000)), 'from': '°F', 'to': 'K'}]},
+}
+BATCH_ROWS = 1000
+
+SKIP_POST = {'login', 'register'}
+
+# Endpoints that only answer 404 until ``python tables.py`` has built the tables.
+TABLE_ENDPOINTS = {'api_thermo_tables', 'api_thermo_table_lookup'}
+
+
+def sample_inputs(calc):
+    values = {}
+    for name in calc.inputs:
+        if name in calc.defaults:
+            values[name] = calc.defaults[name]
+        elif name in calc.choices:
+            values[name] = calc.choices[name][0]
+        else:
+            values[name] = SAMPLE_VALUES.get(name, 2.0)
+    return values
+
+
+def build_cases(app, calculators):
+    rules = {}
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint != 'static' and not rule.arguments:
+            rules.setdefault(rule.endpoint, rule)
+
+    cases = []
+    for endpoint, rule in sorted(rules.items()):
+        if 'GET' in rule.methods:
+            cases.append({'id': f'GET {rule.rule}', 'endpoint': endpoint, 'method': 'GET',
+                          'url': rule.rule, 'form': None, 'calculator': None})
+
+    for name, calc in calculators.items():
+        endpoint, _, mode = name.partition('.')
+        values = sample_inputs(calc)
+        calc.evaluate(**values)  # fail early if the sample inputs are invalid
+        form = {key: str(value) for key, value in values.items()}
+        if mode:
+            form[MODE_FIELDS.get(endpoint, 'law')] = mode
+        rule = rules[endpoint]
+        label = f' [{mode}]' if mode else ''
+        cases.append({'id': f'POST {rule.rule}{label}', 'endpoint': endpoint, 'method': 'POST',
+                      'url': rule.rule, 'form': form, 'calculator': name, 'inputs': values})
+
+    posted = {case['endpoint'] for case in cases if case['method'] == 'POST'}
+    for endpoint, rule in sorted(rules.items()):
+        if 'POST' in rule.methods and endpoint not in posted and endpoint not in SKIP_POST:
+            cases.append({'id': f'POST {rule.rule}', 'endpoint': endpoint, 'method': 'POST',
+                          'url': rule.rule, 'form': EXTRA_FORMS.get(endpoint),
+                          'json': JSON_BODIES.get(endpoint), 'calculator': None})
+
+    # One columnar batch through the JSON API.
+    values = sample_inputs(calculators['projectile'])
+    columns = {key: [value] * BATCH_ROWS for key, value in values.items()}
+    cases.append({'id': f'POST /api/v1/projectile/batch [{BATCH_ROWS} rows]',
+                  'endpoint': 'api_batch', 'method': 'POST', 'url': '/api/v1/projectile/batch',
+                  'form': None, 'json': {'columns': columns}, 'calculator': None,
+                  'view_args': {'calculator': 'projectile'}})
+
+    # Table lookups, dropped in main() if the tables were not built.
+    saturation = {'eos': 'pr', 'gas': 'CO2', 'T': list(np.linspace(220, 300, 200))}
+    for kind, body in (('isotherms', JSON_BODIES['api_thermo_eos']), ('saturation', saturation)):
+        url = f'/api/v1/thermo/tables/{kind}'
+        cases.append({'id': f'POST {url}', 'endpoint': 'api_thermo_table_lookup', 'method': 'POST',
+                      'url': url, 'form': None, 'json': body, 'calculator': None,
+                      'view_args': {'kind': kind}})
+
+    url = '/api/v1/thermo/fluids/water/state'
+    body = {'P': list(np.geomspace(1e4, 1e7, 200)), 's': list(np.linspace(1000, 8000, 200))}
+    cases.append({'id': f'POST {url}', 'endpoint': 'api_thermo_fluid_state', 'method': 'POST',
+                  'url': url, 'form': None, 'json': body, 'calculator': None,
+                  'view_args': {'fluid': 'water'}})
+    return cases
+
+
+def summarize(seconds):
+    us = np.asarray(seconds) * 1e6
+    return {
+        'mean_us': round(float(us.mean()), 2),
+        'p50_us': round(float(np.percentile(us, 50)), 2),
+        'p90_us': round(float(np.percentile(us, 90)), 2),
+        'p99_us': round(float(np.percentile(us, 99)), 2),
+    }
+
+
+class Probe:
+    """Times view functions and template renders inside client requests."""
+
+    def __init__(self, app):
+        from flask import before_render_template, template_rendered
+
+        self.view = 0.0
+        self.render = 0.0
+        self._render_start = None
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+        for endpoint, func in list(app.view_functions.items()):
+            app.view_functions[endpoint] = self._timed(func)
+
+    def reset(self):
+        self.view = self.render = 0.0
+
+    def _before_render(self, sender, **extra):
+        self._render_start = time.perf_counter()
+
+    def _after_render(self, sender, **extra):
+        self.render += time.perf_counter() - self._render_start
+
+    def _timed(self, func):
+        def view(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.view += time.perf_counter() - start
+        view.__wrapped__ = func
+        return view
+
+
+def run_case(app, client, probe, calculators, case, n, warmup, alloc_requests):
+    def send():
+        if case['method'] == 'GET':
+            return client.get(case['url'])
+        return client.post(case['url'], data=case['form'], json=case.get('json'))
+
+    # The first request also pays for compiling templates not loaded yet.
+    probe.reset()
+    first = send()
+    status, first_render, size = first.status_code, probe.render, len(first.data)
+    for _ in range(warmup):
+        send()
+
+    total, view, render = [], [], []
+    for _ in range(n):
+        probe.reset()
+        start = time.perf_counter()
+        send()
+        total.append(time.perf_counter() - start)
+        view.append(probe.view)
+        render.append(probe.render)
+    view, render = np.array(view), np.array(render)
+
+    # Direct call of the (undecorated by the probe) view function.
+    func = app.view_functions[case['endpoint']].__wrapped__
+    direct = []
+    for _ in range(n):
+        with app.test_request_context(case['url'], method=case['method'],
+                                      data=case['form'], json=case.get('json')):
+            start = time.perf_counter()
+            func(**case.get('view_args', {}))
+            direct.append(time.perf_counter() - start)
+
+    peaks = []
+    tracemalloc.start()
+    for _ in range(alloc_requests):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        send()
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+
+    result = {
+        'method': case['method'],
+        'url': case['url'],
+        'status': status,
+        'bytes': size,
+        'requests': n,
+        'rps': round(n / sum(total), 1),
+        'client': summarize(total),
+        'view': summarize(view),
+        'render': summarize(render),
+        'first_render_us': round(first_render * 1e6, 2),
+        'compute': summarize(view - render),
+        'direct': summarize(direct),
+        'alloc_peak_kib': round(float(np.median(peaks)) / 1024, 1) if peaks else None,
+    }
+    if case['calculator']:
+        calc = calculators[case['calculator']]
+        formula = []
+        for _ in range(n):
+            start = time.perf_counter()
+            calc.evaluate(**case['inputs'])
+            formula.append(time.perf_counter() - start)
+        result['formula'] = summarize(formula)
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results, baseline=None):
+    header = f"{'case':<62} {'rps':>8} {'p50':>8} {'p99':>8} {'render':>8} {'compute':>8} {'KiB':>7} {'bytes':>8}"
+    if baseline:
+        header += f" {'Δp50':>7}"
+    print(header)
+    for case_id, r in results.items():
+        line = (f"{case_id[:62]:<62} {r['rps']:>8.0f} {r['client']['p50_us']:>8.0f} "
+                f"{r['client']['p99_us']:>8.0f} {r['render']['p50_us']:>8.0f} "
+                f"{r['compute']['p50_us']:>8.0f} {r['alloc_peak_kib'] or 0:>7.1f} {r['bytes']:>8}")
+        old = (baseline or {}).get(case_id)
+        if old:
+            change = r['client']['p50_us'] / old['client']['p50_us'] - 1
+            line += f" {change:>+7.0%}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=100, help='timed requests per case')
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--alloc-requests', type=int, default=10,
+                        help='requests per case traced for allocations (0 to skip)')
+    parser.add_argument('--only', help='substring filter on the case id')
+    parser.add_argument('--cache', action='store_true', help='keep the response cache on')
+    parser.add_argument('--output', default='bench_routes.json')
+    parser.add_argument('--baseline', help='earlier output file to compare against')
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    os.environ['DATABASE_PATH'] = os.path.join(tmpdir, 'bench_users.db')
+    os.environ.setdefault('RATES_FILE', os.path.join(ROOT, 'data', 'exchange_rates.json'))
+
+    import app as webapp
+    from calculators import CALCULATORS
+
+    app = webapp.app
+    webapp.response_cache.enabled = args.cache
+    cases = build_cases(app, CALCULATORS)
+    if args.only:
+        cases = [case for case in cases if args.only in case['id']]
+    skipped = {}
+    try:
+        webapp.property_tables.index
+    except webapp.TableError as e:
+        skipped = {case['id']: str(e) for case in cases if case['endpoint'] in TABLE_ENDPOINTS}
+        cases = [case for case in cases if case['id'] not in skipped]
+    probe = Probe(app)
+    client = app.test_client()
+
+    results = {}
+    for case in cases:
+        results[case['id']] = run_case(app, client, probe, CALCULATORS, case,
+                                       args.requests, args.warmup, args.alloc_requests)
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'flask': metadata.version('flask'),
+            'numpy': np.__version__,
+            'requests_per_case': args.requests,
+            'response_cache': args.cache,
+        },
+        'results': results,
+        'skipped': skipped,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1, sort_keys=True)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+    print_table(results, baseline)
+    print(f'\n{len(results)} cases written to {args.output}')
+    for case_id, reason in skipped.items():
+        print(f'skipped {case_id}: {reason}')
+
+
+if __name__ == '__main__':
+    main()
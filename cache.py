@@ -0,0 +1,262 @@
+"""Response cache for the calculator pages.
+
+Every calculator is a pure function of its form fields, so a POST with the
+same normalized inputs always renders the same page.  ``ResponseCache``
+memoizes those pages in a bounded in-process LRU with per-entry TTL, and can
+sit in front of a shared backend (SQLite file or cache directory) so that all
+gunicorn workers reuse each other's results.
+
+Views opt in with ``@response_cache.memoize()``; routes that depend on
+outside services pass their own, shorter ``ttl``.  Only the fields that
+``float_fields(endpoint)`` names are read as floats, so only their spellings
+('50', '50.0', '5e1') share a key; every other field is keyed as typed,
+since a view may read it with ``int()`` or as text.
+"""
+import functools
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask import make_response, request
+
+
+class MemoryBackend:
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()   # key -> (expires, value)
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, expires):
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteBackend:
+    """Cache table in a SQLite file shared by every worker on the host."""
+
+    def __init__(self, path, maxsize=10000):
+        self.path = path
+        self.maxsize = maxsize
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._conn()
+        conn.execute('''CREATE TABLE IF NOT EXISTS response_cache (
+                            key TEXT PRIMARY KEY,
+                            value BLOB NOT NULL,
+                            expires REAL NOT NULL)''')
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute(
+            "SELECT value FROM response_cache WHERE key=? AND expires>?",
+            (key, time.time())).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, value, expires):
+        conn = self._conn()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO response_cache VALUES (?, ?, ?)",
+                         (key, value, expires))
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self.prune()
+
+    def prune(self):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM response_cache WHERE expires<=?", (time.time(),))
+            conn.execute('''DELETE FROM response_cache WHERE key IN (
+                                SELECT key FROM response_cache ORDER BY expires DESC
+                                LIMIT -1 OFFSET ?)''', (self.maxsize,))
+
+    def clear(self):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM response_cache")
+
+
+class FileBackend:
+    """One file per entry in a directory shared by every worker on the host."""
+
+    def __init__(self, directory, maxsize=10000):
+        self.directory = directory
+        self.maxsize = maxsize
+        self._writes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.cache')
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                expires, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        return value if expires > time.time() else None
+
+    def set(self, key, value, expires):
+        path = self._path(key)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump((expires, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)  # atomic, so readers never see half a file
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self.prune()
+
+    def prune(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.cache'):
+                entries.append((entry.stat().st_mtime, entry.path))
+        entries.sort(reverse=True)
+        for _, path in entries[self.maxsize:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.cache'):
+                os.remove(entry.path)
+
+
+def _normalize(value):
+    value = value.strip()
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    return repr(number) if number == number else value
+
+
+class ResponseCache:
+    def __init__(self, maxsize=1024, ttl=3600, shared=None, enabled=True, float_fields=None):
+        self.local = MemoryBackend(maxsize)
+        self.shared = shared
+        self.ttl = ttl
+        self.enabled = enabled
+        # endpoint -> names of the form fields its view parses with float()
+        self.float_fields = float_fields or (lambda endpoint: ())
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def key(self, endpoint, form):
+        floats = self.float_fields(endpoint)
+        items = sorted((name, _normalize(value) if name in floats else value)
+                       for name, value in form.items(multi=True))
+        raw = repr((endpoint, items)).encode('utf-8')
+        return hashlib.sha256(raw).hexdigest()
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is not None:
+            self.hits += 1
+            return value[1]
+        if self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.shared_hits += 1
+                expires, body = pickle.loads(value)
+                self.local.set(key, (expires, body), expires)
+                return body
+        self.misses += 1
+        return None
+
+    def set(self, key, body, ttl=None):
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        self.local.set(key, (expires, body), expires)
+        if self.shared is not None:
+            self.shared.set(key, pickle.dumps((expires, body)), expires)
+
+    def clear(self):
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+            'evictions': self.local.evictions,
+            'size': len(self.local),
+            'maxsize': self.local.maxsize,
+        }
+
+    def memoize(self, ttl=None):
+        """Cache the rendered POST response of a view for ``ttl`` seconds."""
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                # Uploaded files are not part of the key.
+                if not self.enabled or request.method != 'POST' or request.files:
+                    return view(*args, **kwargs)
+
+                key = self.key(request.endpoint, request.form)
+                body = self.get(key)
+                if body is not None:
+                    response = make_response(body)
+                    response.headers['X-Cache'] = 'HIT'
+                    return response
+
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200 and not response.direct_passthrough:
+                    self.set(key, response.get_data(), ttl)
+                response.headers['X-Cache'] = 'MISS'
+                return response
+            return wrapper
+        return decorator
+
+
+def cache_from_env():
+    spec = os.getenv('RESPONSE_CACHE', 'memory')
+    maxsize = int(os.getenv('RESPONSE_CACHE_SIZE', 1024))
+    ttl = float(os.getenv('RESPONSE_CACHE_TTL', 3600))
+    if spec == 'off':
+        return ResponseCache(maxsize, ttl, enabled=False)
+    kind, _, location = spec.partition(':')
+    if kind == 'sqlite':
+        return ResponseCache(maxsize, ttl, shared=SQLiteBackend(location or 'response_cache.db'))
+    if kind == 'file':
+        return ResponseCache(maxsize, ttl, shared=FileBackend(location or 'response_cache'))
+    return ResponseCache(maxsize, ttl)
@@ -0,0 +1,975 @@
+"""Registry of every calculator formula as a pure, vectorized function.
+
+Each formula takes NumPy arrays (plain floats work too) and returns a dict
+of outputs, so the same function serves a single form post, a batch sweep or
+an offline script.  Registration declares the inputs with their units, the
+outputs with theirs, optional defaults and choice lists, and the domain
+checks that reject a row.  Units are parsed by ``units`` when the calculator
+is registered, so a typo fails at import and every declared unit has a
+known dimension; callers may send an input in any unit of that dimension
+as ``<field>_unit``.
+
+Input names match the HTML form fields of the matching route.  Calculators
+with a mode selector (``law``, ``calc``, ``cycle``, ...) are registered once
+per mode as ``<route>.<mode>``.
+
+    >>> evaluate('kinetic_energy', mass=2, velocity=3)
+    {'ke': 9.0}
+"""
+import functools
+
+import numpy as np
+
+from constants import FARADAY, KB, PLANCK_LENGTH, R, WIEN
+from eos import EOS, GASES, solve as solve_eos
+from fluids import FLUIDS, default_tables as fluid_tables, rankine
+from partition import thermodynamics as partition_thermodynamics
+from saha import ELEMENTS, MIXTURES, ionize, thermal_density
+import units
+
+CALCULATORS = {}
+
+
+class CalculationError(ValueError):
+    """Inputs outside a calculator's domain."""
+
+
+class Calculator:
+    def __init__(self, name, title, func, inputs, outputs, defaults=None,
+                 choices=None, checks=()):
+        self.name = name
+        self.title = title
+        self.func = func
+        self.units = dict(inputs)
+        self.inputs = tuple(self.units)
+        self.outputs = dict(outputs)
+        self.dimensions = {name: units.dimension(unit)
+                           for name, unit in {**self.units, **self.outputs}.items()}
+        self.defaults = defaults or {}
+        self.choices = choices or {}
+        self.checks = tuple(checks)
+
+    def __call__(self, **values):
+        return self.func(**values)
+
+    def input_type(self, name):
+        return str if name in self.choices else float
+
+    def to_declared(self, name, values, unit):
+        """``values`` of input ``name`` given in ``unit``, in the declared unit."""
+        if name not in self.units or name in self.choices:
+            raise units.UnitError(f"'{name}' is not a numeric input of {self.name}")
+        return units.convert(values, unit, self.units[name])
+
+    def parse(self, form):
+        """Read typed inputs from a mapping of strings (e.g. ``request.form``).
+
+        A number may come with ``<name>_unit``, and is then converted to the
+        declared unit.
+        """
+        values = {}
+        for name in self.inputs:
+            raw = form.get(name)
+            if raw is None or raw == '':
+                if name not in self.defaults:
+                    raise KeyError(name)
+                values[name] = self.defaults[name]
+            elif name in self.choices:
+                if raw not in self.choices[name]:
+                    raise CalculationError(f"'{name}' must be one of {', '.join(self.choices[name])}")
+                values[name] = raw
+            else:
+                values[name] = float(raw)
+                unit = form.get(f'{name}_unit')
+                if unit:
+                    values[name] = self.to_declared(name, values[name], unit)
+        return values
+
+    def evaluate(self, **values):
+        """Evaluate one set of scalar inputs and return plain Python values."""
+        values = {k: v if isinstance(v, str) else np.float64(v) for k, v in values.items()}
+        with np.errstate(all='ignore'):
+            for message, predicate in self.checks:
+                if not np.all(predicate(**values)):
+                    raise CalculationError(message)
+            outputs = self.func(**values)
+        result = {}
+        for key, value in outputs.items():
+            value = np.asarray(value).item()
+            if isinstance(value, float) and not np.isfinite(value):
+                raise CalculationError(f"'{key}' is not finite")
+            result[key] = value
+        return result
+
+    def describe(self):
+        return {
+            'title': self.title,
+            'inputs': {name: {'unit': unit, 'dimension': self.dimensions[name],
+                              'type': self.input_type(name).__name__}
+                       for name, unit in self.units.items()},
+            'outputs': self.outputs,
+            'dimensions': {name: self.dimensions[name] for name in self.outputs},
+            'defaults': self.defaults,
+            'choices': self.choices,
+        }
+
+
+def calculator(name, title, inputs, outputs, defaults=None, choices=None, checks=()):
+    """Register ``func`` under ``name``.
+
+    ``inputs`` and ``outputs`` map field names to their units.  ``checks`` is
+    a sequence of ``(message, predicate)`` pairs; the predicate receives the
+    same keyword arguments as the formula and returns a boolean mask that is
+    False for inputs that must be rejected with ``message``.
+    """
+    def register(func):
+        CALCULATORS[name] = Calculator(name, title, func, inputs, outputs,
+                                       defaults, choices, checks)
+        return func
+    return register
+
+
+def evaluate(name, **values):
+    return CALCULATORS[name].evaluate(**values)
+
+
+@functools.lru_cache(maxsize=None)
+def float_fields(route):
+    """Names of the numeric inputs of ``route``'s calculators, in every mode;
+    ``parse()`` reads each of them with ``float()``."""
+    return frozenset(name for key, calc in CALCULATORS.items()
+                     if key.partition('.')[0] == route
+                     for name in calc.inputs if name not in calc.choices)
+
+
+# ---------------- Basic physics ----------------
+
+@calculator('projectile', 'Projectile Motion',
+            inputs={'velocity': 'm/s', 'angle': 'deg', 'height': 'm', 'gravity': 'm/s²'},
+            outputs={'range': 'm', 'height': 'm', 'time': 's'},
+            defaults={'height': 0.0, 'gravity': 9.8},
+            checks=[('Height must be >= 0 and gravity > 0',
+                     lambda velocity, angle, height, gravity: (height >= 0) & (gravity > 0))])
+def projectile(velocity, angle, height, gravity):
+    theta = np.radians(angle)
+    vx, vy = velocity * np.cos(theta), velocity * np.sin(theta)
+    T = (vy + np.sqrt(vy ** 2 + 2 * gravity * height)) / gravity
+    return {
+        'range': vx * T,
+        'height': height + np.maximum(vy, 0) ** 2 / (2 * gravity),
+        'time': T,
+    }
+
+
+@calculator('kinetic_energy', 'Kinetic Energy',
+            inputs={'mass': 'kg', 'velocity': 'm/s'},
+            outputs={'ke': 'J'})
+def kinetic_energy(mass, velocity):
+    return {'ke': 0.5 * mass * velocity ** 2}
+
+
+@calculator('specific_heat_capacity', 'Specific Heat Capacity',
+            inputs={'mass': 'kg', 'specific_heat': 'J/kg·K', 'change_temp': 'K'},
+            outputs={'heat': 'J'})
+def specific_heat_capacity(mass, specific_heat, change_temp):
+    return {'heat': mass * specific_heat * change_temp}
+
+
+@calculator('frequency_wavelength', 'Frequency & Wavelength',
+            inputs={'speed': 'm/s', 'frequency': 'Hz'},
+            outputs={'wavelength': 'm'})
+def frequency_wavelength(speed, frequency):
+    return {'wavelength': speed / frequency}
+
+
+@calculator('energy_conversion', 'Energy Conversion',
+            inputs={'joules': 'J'},
+            outputs={'ev': 'eV'})
+def energy_conversion(joules):
+    return {'ev': units.convert(joules, 'J', 'eV')}
+
+
+@calculator('ohms_law', "Ohm's Law",
+            inputs={'voltage': 'V', 'current': 'A'},
+            outputs={'resistance': 'Ω'})
+def ohms_law(voltage, current):
+    return {'resistance': voltage / current}
+
+
+@calculator('shm', 'Simple Harmonic Motion',
+            inputs={'mass': 'kg', 'k': 'N/m', 'amplitude': 'm'},
+            outputs={'omega': 'rad/s', 'time_period': 's', 'frequency': 'Hz', 'vmax': 'm/s'},
+            checks=[('Values must be positive',
+                     lambda mass, k, amplitude: (mass > 0) & (k > 0) & (amplitude > 0))])
+def shm(mass, k, amplitude):
+    omega = np.sqrt(k / mass)
+    T = 2 * np.pi / omega
+    return {
+        'omega': omega,
+        'time_period': T,
+        'frequency': 1 / T,
+        'vmax': amplitude * omega,
+    }
+
+
+@calculator('doppler', 'Doppler Effect',
+            inputs={'source_freq': 'Hz', 'observer_velocity': 'm/s',
+                    'source_velocity': 'm/s', 'direction': '', 'sound_speed': 'm/s'},
+            outputs={'observed_freq': 'Hz'},
+            defaults={'sound_speed': 343.0},  # in air at 20 °C
+            choices={'direction': ('approaching', 'receding')},
+            checks=[('Speed of sound must be > 0',
+                     lambda source_freq, observer_velocity, source_velocity, direction,
+                     sound_speed: sound_speed > 0)])
+def doppler(source_freq, observer_velocity, source_velocity, direction, sound_speed):
+    v = sound_speed
+    approaching = direction == 'approaching'
+    f_observed = np.where(
+        approaching,
+        source_freq * (v + observer_velocity) / (v - source_velocity),
+        source_freq * (v - observer_velocity) / (v + source_velocity),
+    )
+    return {'observed_freq': f_observed}
+
+
+@calculator('heat_transfer', 'Heat Transfer',
+            inputs={'mass': 'kg', 'specific_heat': 'J/kg·K', 'initial_temp': '°C', 'final_temp': '°C'},
+            outputs={'heat': 'J'})
+def heat_transfer(mass, specific_heat, initial_temp, final_temp):
+    return {'heat': mass * specific_heat * (final_temp - initial_temp)}
+
+
+@calculator('circular_motion', 'Circular Motion',
+            inputs={'radius': 'm', 'angular_velocity': 'rad/s'},
+            outputs={'v': 'm/s', 'a': 'm/s²'})
+def circular_motion(radius, angular_velocity):
+    return {
+        'v': radius * angular_velocity,
+        'a': radius * angular_velocity ** 2,
+    }
+
+
+# ---------------- Fundamental thermodynamics ----------------
+
+@calculator('first_law', 'First Law of Thermodynamics',
+            inputs={'heat': 'J', 'work': 'J'},
+            outputs={'deltaU': 'J'})
+def first_law(heat, work):
+    return {'deltaU': heat - work}
+
+
+@calculator('ideal_gas', 'Ideal Gas Equation',
+            inputs={'moles': 'mol', 'temperature': 'K', 'volume': 'm³'},
+            outputs={'P': 'Pa'})
+def ideal_gas(moles, temperature, volume):
+    return {'P': moles * R * temperature / volume}
+
+
+@calculator('work_done', 'Work Done',
+            inputs={'pressure': 'Pa', 'v1': 'm³', 'v2': 'm³'},
+            outputs={'deltaV': 'm³', 'W': 'J'})
+def work_done(pressure, v1, v2):
+    deltaV = v2 - v1
+    return {'deltaV': deltaV, 'W': pressure * deltaV}
+
+
+@calculator('cp_cv', 'Cp & Cv',
+            inputs={'R': 'J/mol·K', 'gamma': ''},
+            outputs={'Cv': 'J/mol·K', 'Cp': 'J/mol·K'})
+def cp_cv(R, gamma):
+    Cv = R / (gamma - 1)
+    return {'Cv': Cv, 'Cp': gamma * Cv}
+
+
+@calculator('heat_engine', 'Heat Engine Efficiency',
+            inputs={'Q1': 'J', 'Q2': 'J'},
+            outputs={'work': 'J', 'efficiency': '%'},
+            checks=[('Q₂ must be less than Q₁', lambda Q1, Q2: Q2 < Q1)])
+def heat_engine(Q1, Q2):
+    work = Q1 - Q2
+    return {'work': work, 'efficiency': work / Q1 * 100}
+
+
+@calculator('carnot_engine', 'Carnot Engine',
+            inputs={'Th': 'K', 'Tc': 'K'},
+            outputs={'efficiency': '%'},
+            checks=[('Ensure Th > Tc and both in Kelvin',
+                     lambda Th, Tc: (Th > 0) & (Tc > 0) & (Tc < Th))])
+def carnot_engine(Th, Tc):
+    return {'efficiency': (1 - Tc / Th) * 100}
+
+
+@calculator('entropy', 'Entropy Change',
+            inputs={'heat': 'J', 'temperature': 'K'},
+            outputs={'entropy': 'J/K'},
+            checks=[('Temperature must be > 0 Kelvin', lambda heat, temperature: temperature > 0)])
+def entropy(heat, temperature):
+    return {'entropy': heat / temperature}
+
+
+@calculator('refrigerator', 'Refrigerator COP',
+            inputs={'qc': 'J', 'work': 'J'},
+            outputs={'cop': ''},
+            checks=[('Work must be > 0', lambda qc, work: work > 0)])
+def refrigerator(qc, work):
+    return {'cop': qc / work}
+
+
+@calculator('thermo_process.isothermal', 'Isothermal Process',
+            inputs={'P1': 'Pa', 'V1': 'm³', 'V2': 'm³'},
+            outputs={'W': 'J'})
+def thermo_process_isothermal(P1, V1, V2):
+    return {'W': P1 * V1 * np.log(V2 / V1)}
+
+
+@calculator('thermo_process.adiabatic', 'Adiabatic Process',
+            inputs={'P1': 'Pa', 'V1': 'm³', 'V2': 'm³', 'gamma': ''},
+            outputs={'P2': 'Pa', 'W': 'J'},
+            defaults={'gamma': 1.4})
+def thermo_process_adiabatic(P1, V1, V2, gamma):
+    P2 = P1 * V1 ** gamma / V2 ** gamma
+    return {'P2': P2, 'W': (P1 * V1 - P2 * V2) / (gamma - 1)}
+
+
+@calculator('thermo_process.isobaric', 'Isobaric Process',
+            inputs={'P': 'Pa', 'V1': 'm³', 'V2': 'm³'},
+            outputs={'W': 'J'})
+def thermo_process_isobaric(P, V1, V2):
+    return {'W': P * (V2 - V1)}
+
+
+@calculator('thermo_process.isochoric', 'Isochoric Process',
+            inputs={'V1': 'm³'},
+            outputs={'W': 'J'})
+def thermo_process_isochoric(V1):
+    return {'W': np.zeros_like(V1, dtype=float)}
+
+
+@calculator('zeroth_law', 'Zeroth Law',
+            inputs={'T1': 'K', 'T2': 'K'},
+            outputs={'equilibrium': ''})
+def zeroth_law(T1, T2):
+    return {'equilibrium': np.where(T1 == T2, 'YES', 'NO')}
+
+
+@calculator('internal_energy', 'Internal Energy',
+            inputs={'f': '', 'n': 'mol', 'T': 'K'},
+            outputs={'U': 'J'})
+def internal_energy(f, n, T):
+    return {'U': f / 2 * n * R * T}
+
+
+@calculator('gibbs_free_energy', 'Gibbs Free Energy',
+            inputs={'H': 'J', 'T': 'K', 'S': 'J/K'},
+            outputs={'G': 'J'})
+def gibbs_free_energy(H, T, S):
+    return {'G': H - T * S}
+
+
+@calculator('enthalpy', 'Enthalpy Change',
+            inputs={'mass': 'kg', 'cp': 'J/kg·K', 'deltaT': 'K'},
+            outputs={'deltaH': 'J'})
+def enthalpy(mass, cp, deltaT):
+    return {'deltaH': mass * cp * deltaT}
+
+
+@calculator('hess', "Hess's Law",
+            inputs={'H1': 'J', 'H2': 'J', 'H3': 'J'},
+            outputs={'deltaH': 'J'},
+            defaults={'H3': 0.0})
+def hess(H1, H2, H3):
+    return {'deltaH': H1 + H2 + H3}
+
+
+@calculator('helmholtz', 'Helmholtz Free Energy',
+            inputs={'U': 'J', 'T': 'K', 'S': 'J/K'},
+            outputs={'A': 'J'})
+def helmholtz(U, T, S):
+    return {'A': U - T * S}
+
+
+@calculator('phase', 'Phase Transition',
+            inputs={'mass': 'kg', 'latent_heat': 'J/kg', 'T1': 'K', 'T2': 'K', 'H_vap': 'J/mol'},
+            outputs={'Q': 'J', 'lnP_ratio': ''})
+def phase(mass, latent_heat, T1, T2, H_vap):
+    return {
+        'Q': mass * latent_heat,
+        'lnP_ratio': H_vap / R * (1 / T1 - 1 / T2),
+    }
+
+
+@calculator('real_gas', 'Real Gas (van der Waals)',
+            inputs={'P': 'Pa', 'V': 'm³', 'n': 'mol', 'a': 'Pa·m⁶/mol²', 'b': 'm³/mol'},
+            outputs={'T': 'K'})
+def real_gas(P, V, n, a, b):
+    return {'T': (P + a * n * n / (V * V)) * (V - n * b) / (n * R)}
+
+
+@calculator('statistical', 'Statistical Mechanics',
+            inputs={'omega': '', 'f': '', 'n': 'mol', 'T': 'K'},
+            outputs={'entropy': 'J/K', 'internal_energy': 'J'})
+def statistical(omega, f, n, T):
+    return {
+        'entropy': KB * np.log(omega),
+        'internal_energy': f / 2 * n * R * T,
+    }
+
+
+@calculator('heat_transfer_adv', 'Advanced Heat Transfer',
+            inputs={'k': 'W/m·K', 'A': 'm²', 'dT': 'K', 'dx': 'm',
+                    'L0': 'm', 'alpha': '1/K', 'T': 'K'},
+            outputs={'heat_rate': 'W', 'expanded_length': 'm', 'lambda_max': 'm'})
+def heat_transfer_adv(k, A, dT, dx, L0, alpha, T):
+    return {
+        'heat_rate': k * A * dT / dx,
+        'expanded_length': L0 * (1 + alpha * dT),
+        'lambda_max': WIEN / T,
+    }
+
+
+@calculator('stability', 'Thermodynamic Stability',
+            inputs={'T': 'K', 'dSdT': 'J/K²', 'V': 'm³', 'dVdP': 'm³/Pa', 'dmu': 'J/mol²'},
+            outputs={'Cv': 'J/K', 'kappa_T': '1/Pa', 'thermal': '', 'mechanical': '',
+                     'diffusional': ''})
+def stability(T, dSdT, V, dVdP, dmu):
+    Cv = T * dSdT
+    kappa_T = -(1 / V) * dVdP
+    return {
+        'Cv': Cv,
+        'kappa_T': kappa_T,
+        'thermal': np.where(Cv > 0, 'Stable', 'Unstable'),
+        'mechanical': np.where(kappa_T > 0, 'Stable', 'Unstable'),
+        'diffusional': np.where(dmu > 0, 'Stable', 'Unstable'),
+    }
+
+
+# ---------------- Cycles & efficiencies ----------------
+
+@calculator('advanced_cycles.brayton', 'Brayton Cycle',
+            inputs={'gamma': '', 'rp': ''},
+            outputs={'eta': ''})
+def advanced_cycles_brayton(gamma, rp):
+    return {'eta': 1 - rp ** ((1 - gamma) / gamma)}
+
+
+@calculator('advanced_cycles.rankine', 'Rankine Cycle',
+            inputs={'h1': 'kJ/kg', 'h2': 'kJ/kg', 'h3': 'kJ/kg', 'h4': 'kJ/kg'},
+            outputs={'W_net': 'kJ/kg'})
+def advanced_cycles_rankine(h1, h2, h3, h4):
+    return {'W_net': (h1 - h2) - (h4 - h3)}
+
+
+def _boiler_superheated(fluid, P_high, P_low, T_high):
+    fluid, P_high, T_high = np.broadcast_arrays(fluid, P_high, T_high)
+    ok = np.zeros(P_high.shape, dtype=bool)
+    for name in set(fluid.ravel().tolist()) & set(FLUIDS):
+        rows = fluid == name
+        T_sat = fluid_tables().saturation(name, P_high[rows] * 1e3)['T_sat']
+        ok[rows] = T_high[rows] + 273.15 >= T_sat
+    return ok
+
+
+@calculator('advanced_cycles.rankine_steam', 'Rankine Cycle (Property Tables)',
+            inputs={'fluid': '', 'P_high': 'kPa', 'P_low': 'kPa', 'T_high': '°C'},
+            outputs={'h1': 'kJ/kg', 'h2': 'kJ/kg', 'h3': 'kJ/kg', 'h4': 'kJ/kg',
+                     'W_net': 'kJ/kg', 'q_in': 'kJ/kg', 'eta': ''},
+            choices={'fluid': tuple(FLUIDS)},
+            checks=[('Pressures must be > 0 with P_high > P_low',
+                     lambda fluid, P_high, P_low, T_high: (P_low > 0) & (P_high > P_low)),
+                    ('Boiler pressure must be within the property tables and the turbine '
+                     'inlet at or above its saturation temperature',
+                     _boiler_superheated)])
+def advanced_cycles_rankine_steam(fluid, P_high, P_low, T_high):
+    fluid, P_high, P_low, T_high = np.broadcast_arrays(fluid, P_high, P_low, T_high)
+    out = {key: np.full(P_high.shape, np.nan)
+           for key in ('h1', 'h2', 'h3', 'h4', 'W_net', 'q_in', 'eta')}
+    # One vectorized table lookup per fluid in the batch.
+    for name in set(fluid.ravel().tolist()) & set(FLUIDS):
+        rows = fluid == name
+        cycle = rankine(name, P_high[rows] * 1e3, P_low[rows] * 1e3, T_high[rows] + 273.15,
+                        tables=fluid_tables())
+        for key in out:
+            out[key][rows] = cycle[key] if key == 'eta' else cycle[key] / 1e3
+    return out
+
+
+@calculator('advanced_cycles.otto', 'Otto / Diesel Cycle',
+            inputs={'gamma': '', 'r': ''},
+            outputs={'eta': ''})
+def advanced_cycles_otto(gamma, r):
+    return {'eta': 1 - r ** (1 - gamma)}
+
+
+@calculator('advanced_efficiency.diesel', 'Diesel Cycle Efficiency',
+            inputs={'gamma': '', 'r': '', 'beta': ''},
+            outputs={'eta': ''})
+def advanced_efficiency_diesel(gamma, r, beta):
+    return {'eta': 1 - (1 / gamma) * ((beta ** gamma - 1) / (r ** (gamma - 1) * (beta - 1)))}
+
+
+@calculator('advanced_efficiency.cop_r', 'Refrigerator COP',
+            inputs={'QL': 'J', 'W': 'J'},
+            outputs={'cop': ''})
+def advanced_efficiency_cop_r(QL, W):
+    return {'cop': QL / W}
+
+
+@calculator('advanced_efficiency.cop_hp', 'Heat Pump COP',
+            inputs={'QH': 'J', 'W': 'J'},
+            outputs={'cop': ''})
+def advanced_efficiency_cop_hp(QH, W):
+    return {'cop': QH / W}
+
+
+@calculator('exergy', 'Exergy Analysis',
+            inputs={'U1': 'J', 'V1': 'm³', 'S1': 'J/K', 'U0': 'J', 'V0': 'm³', 'S0': 'J/K',
+                    'P0': 'Pa', 'T0': 'K'},
+            outputs={'delta_psi': 'J'})
+def exergy(U1, V1, S1, U0, V0, S0, P0, T0):
+    return {'delta_psi': (U1 - U0) + P0 * (V1 - V0) - T0 * (S1 - S0)}
+
+
+# ---------------- Chemical & solution thermodynamics ----------------
+
+@calculator('chem_phase_eq.chemical_potential', 'Chemical Potential',
+            inputs={'G': 'J', 'n': 'mol'},
+            outputs={'mu': 'J/mol'})
+def chem_phase_eq_chemical_potential(G, n):
+    return {'mu': G / n}
+
+
+@calculator('chem_phase_eq.gibbs_phase', 'Gibbs Phase Rule',
+            inputs={'C': '', 'P': ''},
+            outputs={'F': ''},
+            checks=[('C and P must be whole numbers',
+                     lambda C, P: (C == np.trunc(C)) & (P == np.trunc(P)))])
+def chem_phase_eq_gibbs_phase(C, P):
+    return {'F': np.asarray(C - P + 2).astype(int)}
+
+
+@calculator('chem_phase_eq.vdw', 'Van der Waals Differential',
+            inputs={'dv': 'm³/mol', 'ds': 'J/mol·K', 'dP': 'Pa', 'dT': 'K',
+                    'd2gdx2': 'J/mol', 'dx': ''},
+            outputs={'lhs': 'J/mol', 'rhs': 'J/mol', 'equilibrium': ''})
+def chem_phase_eq_vdw(dv, ds, dP, dT, d2gdx2, dx):
+    lhs = dv * dP
+    rhs = ds * dT + d2gdx2 * dx
+    return {
+        'lhs': lhs,
+        'rhs': rhs,
+        'equilibrium': np.where(np.abs(lhs - rhs) < 1e-3, 'Satisfied', 'Not satisfied'),
+    }
+
+
+@calculator('thermochemistry.kirchhoff', 'Kirchhoff’s Law',
+            inputs={'H1': 'J/mol', 'Cp': 'J/mol·K', 'T1': 'K', 'T2': 'K'},
+            outputs={'H2': 'J/mol'})
+def thermochemistry_kirchhoff(H1, Cp, T1, T2):
+    return {'H2': H1 + Cp * (T2 - T1)}
+
+
+@calculator('thermochemistry.partial_molar', 'Partial Molar Properties',
+            inputs={'n1': 'mol', 'n2': 'mol', 'V1': 'm³/mol', 'V2': 'm³/mol'},
+            outputs={'V_total': 'm³'})
+def thermochemistry_partial_molar(n1, n2, V1, V2):
+    return {'V_total': n1 * V1 + n2 * V2}
+
+
+@calculator('fugacity_activity.fugacity', 'Fugacity',
+            inputs={'phi': '', 'P': 'Pa'},
+            outputs={'f': 'Pa'})
+def fugacity_activity_fugacity(phi, P):
+    return {'f': phi * P}
+
+
+@calculator('fugacity_activity.fugacity_coeff', 'Fugacity Coefficient',
+            inputs={'GR': 'J/mol', 'T': 'K'},
+            outputs={'ln_phi': '', 'phi': ''})
+def fugacity_activity_fugacity_coeff(GR, T):
+    ln_phi = GR / (R * T)
+    return {'ln_phi': ln_phi, 'phi': np.exp(ln_phi)}
+
+
+@calculator('fugacity_activity.eos', 'Fugacity from a Cubic Equation of State',
+            inputs={'eos': '', 'gas': '', 'temperature': 'K', 'pressure': 'Pa'},
+            outputs={'Z': '', 'ln_phi': '', 'phi': '', 'f': 'Pa'},
+            choices={'eos': tuple(EOS), 'gas': tuple(GASES)},
+            checks=[('Temperature and pressure must be > 0',
+                     lambda eos, gas, temperature, pressure: (temperature > 0) & (pressure > 0))])
+def fugacity_activity_eos(eos, gas, temperature, pressure):
+    eos, gas, T, P = np.broadcast_arrays(eos, gas, temperature, pressure)
+    ok = np.isfinite(T) & np.isfinite(P) & (T > 0) & (P > 0)
+    out = {key: np.full(T.shape, np.nan) for key in ('Z', 'ln_phi', 'phi', 'f')}
+    # One vectorized solve per (eos, gas) pair in the batch, on the valid rows only.
+    for model, fluid in set(zip(eos.ravel().tolist(), gas.ravel().tolist())):
+        if model not in EOS or fluid not in GASES:
+            continue
+        rows = (eos == model) & (gas == fluid) & ok
+        if not rows.any():
+            continue
+        state = solve_eos(model, P=P[rows], T=T[rows], gas=fluid)
+        for key in out:
+            out[key][rows] = state[key]
+    return out
+
+
+@calculator('fugacity_activity.activity', 'Activity',
+            inputs={'gamma': '', 'x': ''},
+            outputs={'a': ''})
+def fugacity_activity_activity(gamma, x):
+    return {'a': gamma * x}
+
+
+@calculator('legendre.helmholtz', 'Internal Energy → Helmholtz Free Energy',
+            inputs={'U': 'J', 'T': 'K', 'S': 'J/K'},
+            outputs={'value': 'J'})
+def legendre_helmholtz(U, T, S):
+    return {'value': U - T * S}
+
+
+@calculator('legendre.enthalpy', 'Internal Energy → Enthalpy',
+            inputs={'U': 'J', 'P': 'Pa', 'V': 'm³'},
+            outputs={'value': 'J'})
+def legendre_enthalpy(U, P, V):
+    return {'value': U + P * V}
+
+
+@calculator('legendre.gibbs', 'Internal Energy → Gibbs Free Energy',
+            inputs={'U': 'J', 'T': 'K', 'S': 'J/K', 'P': 'Pa', 'V': 'm³'},
+            outputs={'value': 'J'})
+def legendre_gibbs(U, T, S, P, V):
+    return {'value': U - T * S + P * V}
+
+
+@calculator('non_ideal_mixture.residual', 'Residual Property',
+            inputs={'G_real': 'J/mol', 'G_ideal': 'J/mol'},
+            outputs={'GR': 'J/mol'})
+def non_ideal_mixture_residual(G_real, G_ideal):
+    return {'GR': G_real - G_ideal}
+
+
+@calculator('non_ideal_mixture.activity_coeff', 'Activity Coefficient',
+            inputs={'gamma': '', 'x': ''},
+            outputs={'a': ''})
+def non_ideal_mixture_activity_coeff(gamma, x):
+    return {'a': gamma * x}
+
+
+@calculator('non_ideal_mixture.poynting', 'Poynting Correction',
+            inputs={'V': 'm³/mol', 'P': 'Pa', 'P0': 'Pa', 'T': 'K'},
+            outputs={'correction': ''})
+def non_ideal_mixture_poynting(V, P, P0, T):
+    return {'correction': V * (P - P0) / (R * T)}
+
+
+@calculator('non_ideal_mixture.dalton', 'Dalton’s Law',
+            inputs={'P1': 'Pa', 'P2': 'Pa', 'P3': 'Pa'},
+            outputs={'P_total': 'Pa'})
+def non_ideal_mixture_dalton(P1, P2, P3):
+    return {'P_total': P1 + P2 + P3}
+
+
+@calculator('multi_component_eq.raoult', "Raoult's Law",
+            inputs={'xi': '', 'P_star': 'Pa'},
+            outputs={'Pi': 'Pa'})
+def multi_component_eq_raoult(xi, P_star):
+    return {'Pi': xi * P_star}
+
+
+@calculator('multi_component_eq.nernst', 'Nernst / Electrochemical Relation',
+            inputs={'n': '', 'E': 'V'},
+            outputs={'deltaG': 'J/mol'})
+def multi_component_eq_nernst(n, E):
+    return {'deltaG': -n * FARADAY * E}
+
+
+@calculator('multi_component_eq.duhem', 'Duhem–Margules Equation',
+            inputs={'x1': '', 'dlnP1': ''},
+            outputs={'x2': '', 'dlnP2': ''})
+def multi_component_eq_duhem(x1, dlnP1):
+    x2 = 1 - x1
+    return {'x2': x2, 'dlnP2': -(x1 / x2) * dlnP1}
+
+
+@calculator('bio_chem_thermo.nernst_membrane', 'Nernst Equation (Membrane Potential)',
+            inputs={'T': 'K', 'z': '', 'Cout': 'mol/L', 'Cin': 'mol/L'},
+            outputs={'E': 'V'})
+def bio_chem_thermo_nernst_membrane(T, z, Cout, Cin):
+    return {'E': R * T / (z * FARADAY) * np.log(Cout / Cin)}
+
+
+@calculator('bio_chem_thermo.coupled', 'Coupled Biochemical Reactions',
+            inputs={'dG1': 'J/mol', 'dG2': 'J/mol'},
+            outputs={'dG_total': 'J/mol', 'feasible': ''})
+def bio_chem_thermo_coupled(dG1, dG2):
+    dG_total = dG1 + dG2
+    return {
+        'dG_total': dG_total,
+        'feasible': np.where(dG_total < 0, 'Spontaneous', 'Non-spontaneous'),
+    }
+
+
+@calculator('bio_chem_thermo.chemical_potential', 'Chemical Potential (Biological Systems)',
+            inputs={'mu0': 'J/mol', 'a': '', 'T': 'K'},
+            outputs={'mu': 'J/mol'})
+def bio_chem_thermo_chemical_potential(mu0, a, T):
+    return {'mu': mu0 + R * T * np.log(a)}
+
+
+# ---------------- Transport, surfaces & materials ----------------
+
+@calculator('non_equilibrium.entropy_prod', 'Entropy Production Rate',
+            inputs={'J': '', 'X': ''},
+            outputs={'sigma': 'W/K·m³', 'validity': ''})
+def non_equilibrium_entropy_prod(J, X):
+    sigma = J * X
+    return {
+        'sigma': sigma,
+        'validity': np.where(sigma >= 0, 'Irreversible (σ ≥ 0)', 'Violates Second Law'),
+    }
+
+
+@calculator('non_equilibrium.onsager', 'Onsager Reciprocal Relations',
+            inputs={'L12': '', 'L21': ''},
+            outputs={'relation': ''})
+def non_equilibrium_onsager(L12, L21):
+    return {
+        'relation': np.where(np.abs(L12 - L21) < 1e-3, 'Satisfied (L₁₂ = L₂₁)', 'Not Satisfied'),
+    }
+
+
+@calculator('non_equilibrium.thermal_diffusion', 'Thermal Diffusion',
+            inputs={'kT': 'W/m·K', 'gradT': 'K/m'},
+            outputs={'Jq': 'W/m²'})
+def non_equilibrium_thermal_diffusion(kT, gradT):
+    return {'Jq': -kT * gradT}
+
+
+@calculator('molecular_simulation.thermo_integration', 'Thermodynamic Integration',
+            inputs={'avg_dU': 'J/mol', 'delta_lambda': ''},
+            outputs={'deltaF': 'J/mol'})
+def molecular_simulation_thermo_integration(avg_dU, delta_lambda):
+    return {'deltaF': avg_dU * delta_lambda}
+
+
+@calculator('molecular_simulation.widom', 'Widom Particle Insertion',
+            inputs={'deltaU': 'J/mol', 'T': 'K'},
+            outputs={'mu': 'J/mol'})
+def molecular_simulation_widom(deltaU, T):
+    # One insertion: μ_ex = −RT ln⟨exp(−ΔU/RT)⟩ reduces to ΔU.  Averages over
+    # many insertions need a simulation (molsim.monte_carlo).
+    return {'mu': deltaU}
+
+
+@calculator('molecular_simulation.langevin', 'Langevin Dynamics',
+            inputs={'gamma': 'kg/s', 'v': 'm/s'},
+            outputs={'force': 'N'})
+def molecular_simulation_langevin(gamma, v):
+    return {'force': -gamma * v}
+
+
+@calculator('surface_interface.surface_tension', 'Surface Tension',
+            inputs={'dG': 'J', 'dA': 'm²'},
+            outputs={'gamma': 'N/m'})
+def surface_interface_surface_tension(dG, dA):
+    return {'gamma': dG / dA}
+
+
+@calculator('surface_interface.gibbs_adsorption', 'Gibbs Adsorption Isotherm',
+            inputs={'Gamma': 'mol/m²', 'dmu': 'J/mol'},
+            outputs={'dgamma': 'N/m'})
+def surface_interface_gibbs_adsorption(Gamma, dmu):
+    return {'dgamma': -Gamma * dmu}
+
+
+@calculator('surface_interface.laplace', 'Laplace Equation',
+            inputs={'gamma': 'N/m', 'R1': 'm', 'R2': 'm'},
+            outputs={'deltaP': 'Pa'})
+def surface_interface_laplace(gamma, R1, R2):
+    return {'deltaP': gamma * (1 / R1 + 1 / R2)}
+
+
+@calculator('surface_interface.kelvin', 'Kelvin Equation',
+            inputs={'gamma': 'N/m', 'Vm': 'm³/mol', 'r': 'm', 'T': 'K'},
+            outputs={'ln_ratio': ''})
+def surface_interface_kelvin(gamma, Vm, r, T):
+    return {'ln_ratio': 2 * gamma * Vm / (r * R * T)}
+
+
+@calculator('surface_interface.young', 'Young Equation',
+            inputs={'gamma_sv': 'N/m', 'gamma_sl': 'N/m', 'gamma_lv': 'N/m'},
+            outputs={'cos_theta': ''})
+def surface_interface_young(gamma_sv, gamma_sl, gamma_lv):
+    return {'cos_theta': (gamma_sv - gamma_sl) / gamma_lv}
+
+
+@calculator('fluctuation_noise.einstein', 'Einstein Relation (Diffusion)',
+            inputs={'mu': 'm²/V·s', 'T': 'K'},
+            outputs={'D': 'J·m²/V·s'})
+def fluctuation_noise_einstein(mu, T):
+    return {'D': mu * KB * T}
+
+
+@calculator('fluctuation_noise.johnson', 'Johnson–Nyquist Noise',
+            inputs={'T': 'K', 'R': 'Ω', 'df': 'Hz'},
+            outputs={'V2': 'V²'})
+def fluctuation_noise_johnson(T, R, df):
+    return {'V2': 4 * KB * T * R * df}
+
+
+@calculator('fluctuation_noise.fdt', 'Fluctuation–Dissipation Theorem',
+            inputs={'chi': 'm²/J', 'T': 'K'},
+            outputs={'fluct': 'm²'})
+def fluctuation_noise_fdt(chi, T):
+    return {'fluct': KB * T * chi}
+
+
+@calculator('turbulence_thermo.spectral', 'Spectral Energy Balance',
+            inputs={'P': 'W/kg', 'eps': 'W/kg', 'dJdk': 'W/kg'},
+            outputs={'dEdt': 'W/kg'})
+def turbulence_thermo_spectral(P, eps, dJdk):
+    return {'dEdt': P - eps - dJdk}
+
+
+@calculator('turbulence_thermo.entropy_prod', 'Turbulent Entropy Production',
+            inputs={'eps': 'W/kg', 'T': 'K'},
+            outputs={'Sigma': 'W/kg·K'})
+def turbulence_thermo_entropy_prod(eps, T):
+    return {'Sigma': eps / T}
+
+
+@calculator('advanced_properties.compressibility', 'Isothermal Compressibility',
+            inputs={'V': 'm³', 'dVdP': 'm³/Pa'},
+            outputs={'kT': '1/Pa'})
+def advanced_properties_compressibility(V, dVdP):
+    return {'kT': -(1 / V) * dVdP}
+
+
+@calculator('advanced_properties.expansion', 'Thermal Expansion Coefficient',
+            inputs={'V': 'm³', 'dVdT': 'm³/K'},
+            outputs={'alpha': '1/K'})
+def advanced_properties_expansion(V, dVdT):
+    return {'alpha': (1 / V) * dVdT}
+
+
+@calculator('advanced_properties.joule_thomson', 'Joule–Thomson Coefficient',
+            inputs={'dTdP': 'K/Pa'},
+            outputs={'muJT': 'K/Pa'})
+def advanced_properties_joule_thomson(dTdP):
+    return {'muJT': dTdP * 1.0}
+
+
+@calculator('advanced_materials.roeser_huber', 'Roeser–Huber Formalism',
+            inputs={'K': 'K', 'a': 'm', 'd': 'm'},
+            outputs={'Tc': 'K'})
+def advanced_materials_roeser_huber(K, a, d):
+    return {'Tc': K * (a / d) ** 2}
+
+
+@calculator('advanced_materials.specific_heat', 'Low-Temperature Specific Heat of Metals',
+            inputs={'gamma': 'J/mol·K²', 'A': 'J/mol·K⁴', 'T': 'K'},
+            outputs={'Cv': 'J/mol·K', 'Ce': 'J/mol·K', 'Cl': 'J/mol·K'})
+def advanced_materials_specific_heat(gamma, A, T):
+    Ce = gamma * T
+    Cl = A * T ** 3
+    return {'Cv': Ce + Cl, 'Ce': Ce, 'Cl': Cl}
+
+
+@calculator('superconductivity.critical_field', 'Critical Magnetic Field',
+            inputs={'H0': 'A/m', 'T': 'K', 'Tc': 'K'},
+            outputs={'Hc': 'A/m'})
+def superconductivity_critical_field(H0, T, Tc):
+    return {'Hc': H0 * (1 - (T / Tc) ** 2)}
+
+
+@calculator('superconductivity.london', 'London Penetration Depth',
+            inputs={'H0': 'A/m', 'x': 'm', 'lam': 'm'},
+            outputs={'Hx': 'A/m'})
+def superconductivity_london(H0, x, lam):
+    return {'Hx': H0 * np.exp(-x / lam)}
+
+
+@calculator('superconductivity.gibbs_transition', 'Gibbs Free Energy of Transition',
+            inputs={'Gn': 'J', 'Gs': 'J'},
+            outputs={'deltaG': 'J'})
+def superconductivity_gibbs_transition(Gn, Gs):
+    return {'deltaG': Gn - Gs}
+
+
+# ---------------- Modern & frontier thermodynamics ----------------
+
+@calculator('relativistic_quantum.relativistic_first', 'Relativistic First Law',
+            inputs={'dTheta': 'J', 'P': 'Pa', 'dV': 'm³'},
+            outputs={'dXi': 'J'})
+def relativistic_quantum_relativistic_first(dTheta, P, dV):
+    return {'dXi': dTheta - P * dV}
+
+
+@calculator('relativistic_quantum.black_hole', 'Black Hole Entropy',
+            inputs={'A': 'm²'},
+            outputs={'S': 'J/K'})
+def relativistic_quantum_black_hole(A):
+    return {'S': KB * A / (4 * PLANCK_LENGTH ** 2)}
+
+
+@calculator('relativistic_quantum.quantum_master', 'Quantum Master Equation',
+            inputs={'gamma': '1/s', 'rho': '', 'rho_eq': ''},
+            outputs={'drho_dt': '1/s'})
+def relativistic_quantum_quantum_master(gamma, rho, rho_eq):
+    return {'drho_dt': -gamma * (rho - rho_eq)}
+
+
+@calculator('info_thermo.landauer', "Landauer’s Principle",
+            inputs={'T': 'K'},
+            outputs={'Qmin': 'J'})
+def info_thermo_landauer(T):
+    return {'Qmin': KB * T * np.log(2)}
+
+
+@calculator('plasma_astro.saha', 'Saha Ionization Equation',
+            inputs={'T': 'K', 'chi': 'J'},
+            outputs={'ratio': '1/m³'})
+def plasma_astro_saha(T, chi):
+    return {'ratio': thermal_density(T) * np.exp(-chi / (KB * T))}
+
+
+@calculator('plasma_astro.ionization', 'Saha Ionization Equilibrium',
+            inputs={'element': '', 'T': 'K', 'n': '1/m³'},
+            outputs={'n_e': '1/m³', 'mean_charge': '', 'neutral_fraction': ''},
+            choices={'element': tuple(ELEMENTS) + tuple(MIXTURES)},
+            checks=[('Temperature and density must be > 0',
+                     lambda element, T, n: (T > 0) & (n > 0))])
+def plasma_astro_ionization(element, T, n):
+    element, T, n = np.broadcast_arrays(element, T, n)
+    ok = np.isfinite(T) & np.isfinite(n) & (T > 0) & (n > 0)
+    out = {key: np.full(T.shape, np.nan) for key in ('n_e', 'mean_charge', 'neutral_fraction')}
+    # One self-consistent solve per gas in the batch.
+    for name in set(element.ravel().tolist()) & (set(ELEMENTS) | set(MIXTURES)):
+        rows = (element == name) & ok
+        state = ionize(T[rows], n[rows], name)
+        for key in out:
+            out[key][rows] = state[key]
+    return out
+
+
+@calculator('plasma_astro.partition', 'Internal Partition Function',
+            inputs={'g1': '', 'E1': 'J', 'g2': '', 'E2': 'J', 'T': 'K'},
+            outputs={'Z': '', 'U': 'J', 'S': 'J/K', 'F': 'J', 'Cv': 'J/K'},
+            checks=[('Degeneracies must be >= 0 (one > 0) and T > 0',
+                     lambda g1, E1, g2, E2, T: (g1 >= 0) & (g2 >= 0) & (g1 + g2 > 0) & (T > 0))])
+def plasma_astro_partition(g1, E1, g2, E2, T):
+    E1, E2, g1, g2, T = np.broadcast_arrays(E1, E2, g1, g2, T)
+    # Rows a batch has already rejected still reach the formula: give them a
+    # harmless stand-in so the engine's own validation passes, then blank them.
+    ok = np.isfinite(E1 + E2 + g1 + g2 + T) & (g1 >= 0) & (g2 >= 0) & (g1 + g2 > 0) & (T > 0)
+    E = np.where(ok[..., None], np.stack((E1, E2), axis=-1), 0.0)
+    g = np.where(ok[..., None], np.stack((g1, g2), axis=-1), 1.0)
+    result = partition_thermodynamics(E, np.where(ok, T, 1.0), g)
+    return {key: np.where(ok, result[key], np.nan) for key in ('Z', 'U', 'S', 'F', 'Cv')}
+
+
+@calculator('plasma_astro.hydrostatic', 'Hydrostatic Equilibrium',
+            inputs={'P0': 'Pa', 'm': 'kg', 'g': 'm/s²', 'z': 'm', 'T': 'K'},
+            outputs={'Pz': 'Pa'})
+def plasma_astro_hydrostatic(P0, m, g, z, T):
+    return {'Pz': P0 * np.exp(-(m * g * z) / (KB * T))}
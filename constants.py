@@ -0,0 +1,104 @@
+"""Physical constants (CODATA 2018 / SI 2019), the single source for every module.
+
+Each constant is registered once with its name, symbol, unit and group;
+formulas import the module-level names (``KB``, ``R``, ``H``, ...), and the
+Physics Constants page and ``/api/v1/constants`` are rendered from
+``CONSTANTS``, so the numbers shown are the numbers computed with.
+Constants that follow from the exact defining ones (ħ, R, F, σ, k_e) are
+computed from them rather than typed in.
+"""
+import math
+from collections import namedtuple
+
+Constant = namedtuple('Constant', 'key name symbol value unit exact group digits')
+
+# group -> heading on the Physics Constants page, in page order
+GROUPS = {
+    'defining': 'Defining (Exact) SI Constants',
+    'universal': 'Universal & Gravitational Constants',
+    'electromagnetic': 'Electromagnetic Constants',
+    'thermodynamic': 'Thermodynamic & Radiation Constants',
+    'atomic': 'Atomic & Particle Constants',
+    'mathematical': 'Dimensionless & Mathematical Constants',
+}
+
+CONSTANTS = {}
+
+
+def _register(key, name, symbol, value, unit, group, exact=False, digits=None):
+    CONSTANTS[key] = Constant(key, name, symbol, value, unit, exact, group, digits)
+    return value
+
+
+# Defining constants of the SI: exact by definition.
+C = _register('c', 'Speed of Light', 'c', 299792458.0, 'm/s', 'defining', exact=True)
+H = _register('h', 'Planck Constant', 'h', 6.62607015e-34, 'J·s', 'defining', exact=True)
+E = _register('e', 'Elementary Charge', 'e', 1.602176634e-19, 'C', 'defining', exact=True)
+KB = _register('k', 'Boltzmann Constant', 'k', 1.380649e-23, 'J/K', 'defining', exact=True)
+NA = _register('N_A', 'Avogadro Constant', 'Nₐ', 6.02214076e23, '1/mol', 'defining', exact=True)
+
+G = _register('G', 'Gravitational Constant', 'G', 6.67430e-11, 'N·m²/kg²', 'universal')
+HBAR = _register('hbar', 'Reduced Planck Constant', 'ħ', H / (2 * math.pi), 'J·s', 'universal',
+                 exact=True, digits=10)
+PLANCK_LENGTH = _register('l_P', 'Planck Length', 'lₚ', math.sqrt(HBAR * G / C ** 3), 'm',
+                          'universal', digits=7)
+G0 = _register('g_n', 'Standard Gravity', 'g', 9.80665, 'm/s²', 'universal', exact=True)
+
+EPS0 = _register('epsilon_0', 'Permittivity of Free Space', 'ε₀', 8.8541878128e-12, 'F/m',
+                 'electromagnetic')
+MU0 = _register('mu_0', 'Permeability of Free Space', 'μ₀', 1.25663706212e-6, 'T·m/A',
+                'electromagnetic')
+KE = _register('k_e', 'Coulomb Constant', 'kₑ', 1 / (4 * math.pi * EPS0), 'N·m²/C²',
+               'electromagnetic', digits=11)
+
+R = _register('R', 'Gas Constant', 'R', NA * KB, 'J/mol·K', 'thermodynamic', exact=True, digits=10)
+SIGMA = _register('sigma', 'Stefan–Boltzmann Constant', 'σ',
+                  2 * math.pi ** 5 * KB ** 4 / (15 * H ** 3 * C ** 2), 'W/m²·K⁴', 'thermodynamic',
+                  exact=True, digits=10)
+WIEN = _register('b', 'Wien Displacement Constant', 'b', 2.897771955e-3, 'm·K', 'thermodynamic',
+                 exact=True)
+FARADAY = _register('F', 'Faraday Constant', 'F', NA * E, 'C/mol', 'thermodynamic', exact=True,
+                    digits=10)
+
+ME = _register('m_e', 'Electron Mass', 'mₑ', 9.1093837015e-31, 'kg', 'atomic')
+MP = _register('m_p', 'Proton Mass', 'mₚ', 1.67262192369e-27, 'kg', 'atomic')
+MN = _register('m_n', 'Neutron Mass', 'mₙ', 1.67492749804e-27, 'kg', 'atomic')
+AMU = _register('u', 'Atomic Mass Constant', 'u', 1.66053906660e-27, 'kg', 'atomic')
+EV = _register('eV', 'Electronvolt', 'eV', E, 'J', 'atomic', exact=True)
+
+ALPHA = _register('alpha', 'Fine-Structure Constant', 'α', 7.2973525693e-3, '', 'mathematical')
+_register('pi', 'Pi', 'π', math.pi, '', 'mathematical', exact=True, digits=10)
+_register('euler', 'Euler’s Number', 'e', math.e, '', 'mathematical', exact=True, digits=10)
+_register('phi', 'Golden Ratio', 'φ', (1 + math.sqrt(5)) / 2, '', 'mathematical', exact=True,
+          digits=10)
+
+_SUPERSCRIPTS = str.maketrans('0123456789-', '⁰¹²³⁴⁵⁶⁷⁸⁹⁻')
+
+
+def display(constant):
+    """The value as the page prints it: '6.62607015×10⁻³⁴', '299,792,458'."""
+    value = constant.value
+    if value == int(value) and abs(value) < 1e15:
+        return f'{int(value):,}'
+    # Shortest digits that give the value back, unless the constant has a precision.
+    digits = constant.digits or next(d for d in range(1, 18) if float(f'{value:.{d}g}') == value)
+    if 1e-1 <= abs(value) < 1e6:
+        return f'{value:.{digits}g}'
+    mantissa, _, exponent = f'{value:.{digits - 1}e}'.partition('e')
+    return f'{mantissa}×10{str(int(exponent)).translate(_SUPERSCRIPTS)}'
+
+
+def as_dict(constant):
+    return {'key': constant.key, 'name': constant.name, 'symbol': constant.symbol,
+            'value': constant.value, 'unit': constant.unit, 'exact': constant.exact,
+            'group': constant.group, 'display': display(constant)}
+
+
+def search(query='', group=None):
+    """Constants whose key, name or symbol contains ``query`` (any case), in
+    registry order, optionally only those of ``group``."""
+    query = query.strip().lower()
+    return [c for c in CONSTANTS.values()
+            if (group is None or c.group == group)
+            and (not query or query in c.key.lower() or query in c.name.lower()
+                 or query in c.symbol.lower())]
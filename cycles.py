@@ -0,0 +1,179 @@
+"""Closed ideal-gas cycles built from the four processes in ``processes.py``.
+
+``simulate_cycle()`` chains isothermal / adiabatic / isobaric / isochoric
+legs into one of the textbook cycles and returns the state points, the work
+and heat of every leg, net work, efficiency and the full P–V and T–S loops.
+Every cycle is fixed by the same inputs:
+
+* ``P1``, ``V1``, ``T1`` – state 1, at the largest volume and lowest temperature
+* ``compression_ratio``  – V_max / V_min of the compression leg(s)
+* ``gamma``              – Cp / Cv
+* ``T_max``              – temperature reached by the heat addition
+
+All inputs broadcast against each other, so a whole parameter sweep is one
+call; ``cycle_sweep()`` builds the grid of every compression ratio with
+every γ.  Combinations that do not close a cycle come back as NaN with
+``valid`` False instead of raising.
+
+Entropy is measured from state 1.
+"""
+import numpy as np
+
+from processes import process_points
+
+# Per cycle: the process of each leg, leaving from state i to state i + 1.
+CYCLES = {
+    'carnot': ('isothermal', 'adiabatic', 'isothermal', 'adiabatic'),
+    'otto': ('adiabatic', 'isochoric', 'adiabatic', 'isochoric'),
+    'diesel': ('adiabatic', 'isobaric', 'adiabatic', 'isochoric'),
+    'brayton': ('adiabatic', 'isobaric', 'adiabatic', 'isobaric'),
+    'stirling': ('isothermal', 'isochoric', 'isothermal', 'isochoric'),
+}
+
+
+def _states(cycle, V1, T1, r, gamma, T_max):
+    """Volumes and temperatures of the four state points, and a validity mask."""
+    k = gamma - 1
+    V_min = V1 / r
+    if cycle == 'carnot':
+        # 1→2 isothermal compression at T1, 2→3 adiabatic compression to T_max.
+        V2 = V_min * (T_max / T1) ** (1 / k)
+        V = (V1, V2, V_min, V1 * (T1 / T_max) ** (1 / k))
+        T = (T1, T1, T_max, T_max)
+        valid = V2 < V1
+    elif cycle == 'stirling':
+        V = (V1, V_min, V_min, V1)
+        T = (T1, T1, T_max, T_max)
+        valid = True
+    else:
+        T2 = T1 * r ** k
+        if cycle == 'otto':
+            V = (V1, V_min, V_min, V1)
+            T = (T1, T2, T_max, T_max / r ** k)
+            valid = True
+        elif cycle == 'diesel':
+            V3 = V_min * T_max / T2  # cut-off ratio T_max / T2
+            T = (T1, T2, T_max, T_max * (V3 / V1) ** k)
+            V = (V1, V_min, V3, V1)
+            valid = V3 < V1
+        else:
+            # Brayton: expansion back down to P1 over the same pressure ratio.
+            T4 = T_max / r ** k
+            V = (V1, V_min, V_min * T_max / T2, V1 * T4 / T1)
+            T = (T1, T2, T_max, T4)
+            valid = True
+        valid = valid & (T_max > T2)
+    return np.stack(V, axis=-1), np.stack(T, axis=-1), valid & (T_max > T1)
+
+
+def _leg_energy(process, Pa, Va, Pb, Vb, gamma):
+    """Work done by the gas and heat absorbed on one leg."""
+    if process == 'isothermal':
+        W = Pa * Va * np.log(Vb / Va)
+        return W, W
+    if process == 'adiabatic':
+        return (Pa * Va - Pb * Vb) / (gamma - 1), np.zeros_like(Pa)
+    if process == 'isobaric':
+        W = Pa * (Vb - Va)
+        return W, gamma / (gamma - 1) * W
+    return np.zeros_like(Pa), (Pb * Vb - Pa * Va) / (gamma - 1)
+
+
+def simulate_cycle(cycle, P1, V1, T1, compression_ratio, gamma=1.4, T_max=1500.0,
+                   points=50, regenerator=True):
+    """Simulate a batch of ``cycle``s.
+
+    Returns a dict of arrays shaped like the broadcast inputs (``batch``):
+    ``valid``, ``W_net``, ``Q_in``, ``Q_out``, ``efficiency`` and
+    ``carnot_efficiency``; per state point (``batch + (4,)``) ``P_state``,
+    ``V_state``, ``T_state``, ``S_state``; per leg (``batch + (4,)``) ``W``
+    and ``Q``; and with ``points`` > 0 the loops ``P``, ``V``, ``T``, ``S`` of
+    shape ``batch + (4 * points,)``, each leg sampled from its start to its
+    end state.  With ``regenerator`` the Stirling isochoric heat is exchanged
+    internally and does not count towards ``Q_in``.
+    """
+    if cycle not in CYCLES:
+        raise ValueError(f"cycle must be one of {', '.join(CYCLES)}")
+    if points and points < 2:
+        raise ValueError('points must be at least 2')
+
+    arrays = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in
+                                   (P1, V1, T1, compression_ratio, gamma, T_max)))
+    shape = arrays[0].shape
+    P1, V1, T1, r, gamma, T_max = (a.ravel() for a in arrays)
+    if not all(np.isfinite(a).all() for a in (P1, V1, T1, r, gamma, T_max)):
+        raise ValueError('inputs must be finite')
+    if (P1 <= 0).any() or (V1 <= 0).any() or (T1 <= 0).any():
+        raise ValueError('P₁, V₁ and T₁ must be positive')
+
+    with np.errstate(all='ignore'):
+        V, T, valid = _states(cycle, V1, T1, r, gamma, T_max)
+        valid = valid & (r > 1) & (gamma > 1)
+        V = np.where(valid[:, None], V, np.nan)
+        T = np.where(valid[:, None], T, np.nan)
+        nR = (P1 * V1 / T1)[:, None]
+        g = gamma[:, None]
+        P = nR * T / V
+
+        def entropy(P_, V_):
+            return nR * (np.log(P_ * V_ / (nR * T1[:, None])) / (g - 1) + np.log(V_ / V1[:, None]))
+
+        legs = CYCLES[cycle]
+        W = np.empty_like(P)
+        Q = np.empty_like(P)
+        for i, process in enumerate(legs):
+            j = (i + 1) % len(legs)
+            W[:, i], Q[:, i] = _leg_energy(process, P[:, i], V[:, i], P[:, j], V[:, j], gamma)
+
+        heating = np.array([not (cycle == 'stirling' and regenerator and p == 'isochoric')
+                            for p in legs])
+        W_net = W.sum(axis=1)
+        Q_in = np.where(heating & (Q > 0), Q, 0).sum(axis=1)
+        result = {
+            'valid': valid,
+            'W_net': W_net,
+            'Q_in': Q_in,
+            'Q_out': -np.where(heating & (Q < 0), Q, 0).sum(axis=1),
+            'efficiency': W_net / Q_in,
+            'carnot_efficiency': np.where(valid, 1 - T1 / T_max, np.nan),
+            'P_state': P,
+            'V_state': V,
+            'T_state': T,
+            'S_state': entropy(P, V),
+            'W': W,
+            'Q': Q,
+        }
+
+        if points:
+            frac = np.linspace(0.0, 1.0, points)
+            V_loop, P_loop = [], []
+            for i, process in enumerate(legs):
+                j = (i + 1) % len(legs)
+                swept = P if process == 'isochoric' else V
+                x = swept[:, i:i + 1] + (swept[:, j:j + 1] - swept[:, i:i + 1]) * frac
+                Vi, Pi = process_points(process, P[:, i:i + 1], V[:, i:i + 1], g,
+                                        P[:, i:i + 1], x)
+                V_loop.append(Vi)
+                P_loop.append(Pi)
+            V_loop = np.concatenate(V_loop, axis=1)
+            P_loop = np.concatenate(P_loop, axis=1)
+            result.update({
+                'P': P_loop,
+                'V': V_loop,
+                'T': P_loop * V_loop / nR,
+                'S': entropy(P_loop, V_loop),
+            })
+
+    return {key: value.reshape(shape + value.shape[1:]) for key, value in result.items()}
+
+
+def cycle_sweep(cycle, compression_ratio, gamma, P1=101325.0, V1=1e-3, T1=300.0,
+                T_max=1500.0, points=0, regenerator=True):
+    """Simulate every ``compression_ratio`` with every ``gamma``.
+
+    Outputs have shape ``(len(compression_ratio), len(gamma))`` plus the
+    per-state, per-leg or loop axis.  Loops are skipped unless ``points``
+    is given.
+    """
+    r, g = np.meshgrid(np.ravel(compression_ratio), np.ravel(gamma), indexing='ij')
+    return simulate_cycle(cycle, P1, V1, T1, r, g, T_max, points, regenerator)
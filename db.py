@@ -0,0 +1,100 @@
+"""SQLite access for the auth routes.
+
+Each worker process keeps a small pool of open connections instead of
+connecting on every request.  A request borrows one connection for the
+lifetime of its app context and hands it back on teardown, so the statement
+cache of that connection (SQLite's prepared statements) survives between
+requests.  The database path comes from ``app.config['DATABASE']``.
+"""
+import os
+import queue
+import sqlite3
+
+from flask import current_app, g
+
+SCHEMA = '''CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL UNIQUE,
+                password TEXT NOT NULL)'''
+
+FIND_USER = "SELECT * FROM users WHERE username=?"
+INSERT_USER = "INSERT INTO users (username, password) VALUES (?, ?)"
+
+
+def connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False, cached_statements=64)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA busy_timeout=5000')
+    return conn
+
+
+class ConnectionPool:
+    def __init__(self, path, size=4):
+        self.path = path
+        self.size = size
+        self._reset()
+
+    def _reset(self):
+        # Connections must never cross a fork (gunicorn --preload), so a
+        # child process starts with an empty pool of its own.
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue(maxsize=self.size)
+
+    def acquire(self):
+        if self._pid != os.getpid():
+            self._reset()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return connect(self.path)
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        if self._pid != os.getpid():
+            conn.close()
+            return
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def init_db(path):
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute(SCHEMA)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def init_app(app):
+    # Relative paths are taken from the app root, not the working directory.
+    app.config['DATABASE'] = os.path.join(app.root_path,
+                                          app.config.get('DATABASE', 'users.db'))
+    app.config.setdefault('DATABASE_POOL_SIZE', 4)
+    init_db(app.config['DATABASE'])
+    app.extensions['db_pool'] = ConnectionPool(
+        app.config['DATABASE'], app.config['DATABASE_POOL_SIZE'])
+    app.teardown_appcontext(_release_db)
+
+
+def get_db():
+    if 'db' not in g:
+        g.db = current_app.extensions['db_pool'].acquire()
+    return g.db
+
+
+def _release_db(exc):
+    conn = g.pop('db', None)
+    if conn is not None:
+        current_app.extensions['db_pool'].release(conn)
@@ -0,0 +1,225 @@
+"""Cubic equations of state for pure gases, vectorized over arrays of states.
+
+Every model is written in the generic two-parameter cubic form
+
+    P = RT / (v − b) − a·α(T) / (v² + u·b·v + w·b²)
+
+with the molar volume ``v = V / n``:
+
+=========  ==========================  ===  ===  =========================
+``eos``    model                       u    w    α(T)
+=========  ==========================  ===  ===  =========================
+``vdw``    van der Waals               0    0    1
+``rk``     Redlich–Kwong               1    0    Tr^−½
+``srk``    Soave–Redlich–Kwong         1    0    (1 + m(1 − √Tr))²
+``pr``     Peng–Robinson               2    −1   (1 + m(1 − √Tr))²
+=========  ==========================  ===  ===  =========================
+
+``a`` and ``b`` follow from the critical point (``Tc``, ``Pc``) and, for
+Soave and Peng–Robinson, the acentric factor ω; ``GASES`` lists them for
+common gases.  van der Waals can also take ``a`` and ``b`` directly.
+
+``solve()`` takes any two of P, V and T and returns the third together with
+the compressibility factor Z and the fugacity coefficient φ.  Volumes come
+from the cubic in Z, solved in closed form for every state at once; where
+it has three roots ``phase`` picks the vapour, the liquid or the stable one
+(lowest fugacity).  States without a physical solution are NaN.
+"""
+import numpy as np
+
+from constants import R
+
+# Tc [K], Pc [Pa], acentric factor ω
+GASES = {
+    'N2': (126.2, 3.3958e6, 0.0372),
+    'O2': (154.58, 5.043e6, 0.0222),
+    'Ar': (150.86, 4.898e6, 0.0),
+    'CO2': (304.13, 7.3773e6, 0.2239),
+    'CH4': (190.56, 4.599e6, 0.0115),
+    'H2O': (647.1, 22.064e6, 0.3443),
+    'NH3': (405.4, 11.333e6, 0.2526),
+    'C3H8': (369.83, 4.248e6, 0.1523),
+    'H2': (33.19, 1.313e6, -0.216),
+    'He': (5.195, 0.2275e6, -0.390),
+}
+
+PHASES = ('stable', 'vapor', 'liquid')
+
+
+class CubicEOS:
+    def __init__(self, name, title, u, w, omega_a, omega_b, alpha):
+        self.name = name
+        self.title = title
+        self.u = u
+        self.w = w
+        self.omega_a = omega_a
+        self.omega_b = omega_b
+        self.alpha = alpha
+
+    def constants(self, Tc, Pc):
+        """``a`` [Pa·m⁶/mol²] and ``b`` [m³/mol] at the critical point."""
+        return self.omega_a * (R * Tc) ** 2 / Pc, self.omega_b * R * Tc / Pc
+
+    def pressure(self, T, v, a, b, alpha):
+        return R * T / (v - b) - a * alpha / (v * v + self.u * b * v + self.w * b * b)
+
+    def ln_phi(self, Z, A, B):
+        """ln φ of a pure component at compressibility ``Z``."""
+        if self.u == 0 and self.w == 0:
+            return Z - 1 - np.log(Z - B) - A / Z
+        s = np.sqrt(self.u ** 2 - 4 * self.w)
+        return (Z - 1 - np.log(Z - B)
+                - A / (B * s) * np.log((2 * Z + B * (self.u + s)) / (2 * Z + B * (self.u - s))))
+
+
+def _soave(m):
+    def alpha(Tr, omega):
+        return (1 + m(omega) * (1 - np.sqrt(Tr))) ** 2
+    return alpha
+
+
+EOS = {eos.name: eos for eos in (
+    CubicEOS('vdw', 'van der Waals', 0, 0, 27 / 64, 1 / 8,
+             lambda Tr, omega: np.ones_like(Tr)),
+    CubicEOS('rk', 'Redlich–Kwong', 1, 0, 0.42748, 0.08664,
+             lambda Tr, omega: 1 / np.sqrt(Tr)),
+    CubicEOS('srk', 'Soave–Redlich–Kwong', 1, 0, 0.42748, 0.08664,
+             _soave(lambda omega: 0.480 + 1.574 * omega - 0.176 * omega ** 2)),
+    CubicEOS('pr', 'Peng–Robinson', 2, -1, 0.45724, 0.07780,
+             _soave(lambda omega: 0.37464 + 1.54226 * omega - 0.26992 * omega ** 2)),
+)}
+
+
+def cubic_roots(c2, c1, c0):
+    """Real roots of ``z³ + c2·z² + c1·z + c0`` as an ``(..., 3)`` array,
+    ascending, NaN-padded where there is only one."""
+    shift = c2 / 3
+    p = c1 - c2 * shift
+    q = 2 * shift ** 3 - c1 * shift + c0
+    disc = (q / 2) ** 2 + (p / 3) ** 3
+
+    # One real root (Cardano) ...
+    sq = np.sqrt(np.maximum(disc, 0))
+    single = np.cbrt(-q / 2 + sq) + np.cbrt(-q / 2 - sq)
+    # ... or three (trigonometric form).
+    m = 2 * np.sqrt(np.maximum(-p / 3, 0))
+    cos3 = np.clip(3 * q / np.where(p * m == 0, 1, p * m), -1, 1)
+    theta = np.arccos(cos3)[..., None] / 3 - 2 * np.pi / 3 * np.arange(3)
+    three = m[..., None] * np.cos(theta)
+
+    nan = np.full_like(single, np.nan)
+    roots = np.where((disc > 0)[..., None],
+                     np.stack((single, nan, nan), axis=-1), three) - shift[..., None]
+    # One Newton step cleans up cancellation in the closed forms.
+    f = ((roots + c2[..., None]) * roots + c1[..., None]) * roots + c0[..., None]
+    df = (3 * roots + 2 * c2[..., None]) * roots + c1[..., None]
+    roots = np.where(df != 0, roots - f / np.where(df != 0, df, 1), roots)
+    return np.sort(roots, axis=-1)
+
+
+def _temperature(eos, P, v, a, b, Tc, omega):
+    """T at which the EOS gives ``P`` at molar volume ``v`` (bisection)."""
+    if eos.name == 'vdw':
+        return np.where(v > b, (P + a / (v * v)) * (v - b) / R, np.nan)
+
+    def excess(T):
+        return eos.pressure(T, v, a, b, eos.alpha(T / Tc, omega)) - P
+
+    # P rises with T at fixed v, so bracket from near 0 K upwards.
+    lo = np.full_like(v, 1e-6) * Tc
+    hi = np.maximum(P * v / R, Tc)
+    for _ in range(64):
+        low = excess(hi) < 0
+        if not low.any():
+            break
+        hi = np.where(low, 2 * hi, hi)
+    solvable = (excess(lo) < 0) & (v > b)
+    for _ in range(64):
+        mid = 0.5 * (lo + hi)
+        below = excess(mid) < 0
+        lo = np.where(below, mid, lo)
+        hi = np.where(below, hi, mid)
+    return np.where(solvable, 0.5 * (lo + hi), np.nan)
+
+
+def solve(eos, P=None, V=None, T=None, n=1.0, gas=None, Tc=None, Pc=None, omega=0.0,
+          a=None, b=None, phase='stable'):
+    """Solve ``eos`` for whichever of ``P``, ``V`` and ``T`` is not given.
+
+    The fluid is a ``gas`` from ``GASES``, or ``Tc``/``Pc``/``omega``, or
+    (van der Waals only) explicit ``a`` and ``b``.  ``V`` is the total volume
+    of ``n`` moles.  All arguments broadcast; returns a dict of arrays ``P``,
+    ``V``, ``T``, ``Z``, ``ln_phi``, ``phi`` and the fugacity ``f``.
+    """
+    model = EOS.get(eos)
+    if model is None:
+        raise ValueError(f"eos must be one of {', '.join(EOS)}")
+    if phase not in PHASES:
+        raise ValueError(f"phase must be one of {', '.join(PHASES)}")
+    unknown = [name for name, value in (('P', P), ('V', V), ('T', T)) if value is None]
+    if len(unknown) != 1:
+        raise ValueError('give exactly two of P, V and T')
+
+    if gas is not None:
+        if gas not in GASES:
+            raise ValueError(f"gas must be one of {', '.join(GASES)}")
+        Tc, Pc, omega = GASES[gas]
+    if a is not None and b is not None:
+        if eos != 'vdw':
+            raise ValueError('a and b can only be given for van der Waals; use Tc and Pc')
+        Tc = 1.0  # unused: α is 1
+    elif Tc is None or Pc is None:
+        raise ValueError('give a gas, or Tc and Pc')
+
+    known = [np.asarray(x, dtype=float) for x in
+             (0.0 if P is None else P, 1.0 if V is None else V, 1.0 if T is None else T,
+              n, Tc, 1.0 if Pc is None else Pc, omega)]
+    P, V, T, n, Tc, Pc, omega = np.broadcast_arrays(*known)
+    if not all(np.isfinite(x).all() for x in known):
+        raise ValueError('inputs must be finite')
+    if (n <= 0).any() or (Tc <= 0).any() or (Pc <= 0).any():
+        raise ValueError('n, Tc and Pc must be positive')
+    if a is None:
+        a, b = model.constants(Tc, Pc)
+    else:
+        a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float),
+                                   P)[:2]
+
+    with np.errstate(all='ignore'):
+        if unknown == ['P']:
+            v = np.where(V > 0, V / n, np.nan)
+            T = np.where(T > 0, T, np.nan)
+            P = model.pressure(T, v, a, b, model.alpha(T / Tc, omega))
+            P = np.where(v > b, P, np.nan)
+        elif unknown == ['T']:
+            v = np.where((V > 0) & (P > 0), V / n, np.nan)
+            T = _temperature(model, P, v, a, b, Tc, omega)
+        else:
+            T = np.where((T > 0) & (P > 0), T, np.nan)
+            v = None
+
+        aa = a * model.alpha(T / Tc, omega)
+        A = aa * P / (R * T) ** 2
+        B = b * P / (R * T)
+        if v is None:
+            u, w = model.u, model.w
+            roots = cubic_roots(-(1 + B - u * B),
+                                A + w * B * B - u * B - u * B * B,
+                                -(A * B + w * B * B + w * B ** 3))
+            roots = np.where(roots > B[..., None], roots, np.nan)
+            if phase == 'vapor':
+                Z = np.fmax.reduce(roots, axis=-1)
+            elif phase == 'liquid':
+                Z = np.fmin.reduce(roots, axis=-1)
+            else:
+                ln_phis = model.ln_phi(roots, A[..., None], B[..., None])
+                best = np.argmin(np.where(np.isnan(ln_phis), np.inf, ln_phis), axis=-1)
+                Z = np.take_along_axis(roots, best[..., None], axis=-1)[..., 0]
+            V = Z * R * T / P * n
+        else:
+            Z = P * v / (R * T)
+            V = v * n
+        ln_phi = model.ln_phi(Z, A, B)
+        phi = np.exp(ln_phi)
+
+    return {'P': P, 'V': V, 'T': T, 'Z': Z, 'ln_phi': ln_phi, 'phi': phi, 'f': phi * P}
@@ -0,0 +1,311 @@
+"""Steam and refrigerant properties from compact precomputed tables.
+
+``data/fluids`` holds, per fluid, three ``.npy`` tables built once from
+CoolProp (only needed for the build):
+
+    python fluids.py
+
+* saturation – T_sat, h_f, h_g, s_f, s_g, v_f, v_g on a grid uniform in ln P
+* vapor      – h, s, v over (ln P, √superheat), superheat = T − T_sat,
+  from the saturated vapour line up
+* liquid     – h, s, v over (ln P, √subcooling), subcooling = T_sat − T,
+  from the saturated liquid line down
+
+Measuring temperature from the saturation line keeps every interpolation
+cell inside one phase, so bilinear interpolation never smears across the
+boiling point; the square root packs grid lines close to it, where the
+properties bend most.  Pressures stop at 0.95 Pc.  Values are stored as
+float32 (≈0.2 J/kg resolution on h), which keeps both fluids near 1 MB.
+Tables are opened lazily with ``np.load(mmap_mode='r')`` on first use:
+startup reads nothing and gunicorn workers share the pages.
+
+Units are SI throughout: Pa, K, J/kg, J/kg·K, m³/kg.  States outside the
+tables (supercritical pressures, temperatures past the grid) are NaN.
+``index.json`` records, per table and property, the largest error found
+at the cell midpoints against CoolProp: absolute (J/kg, J/kg·K) for h and
+s, relative for T_sat and v.
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+from tables import locate
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'fluids')
+
+# CoolProp name, lowest pressure [Pa], superheat and subcooling spans [K]
+FLUIDS = {
+    'water': ('Water', 1e3, 900.0, 370.0),
+    'R134a': ('R134a', 1e3, 250.0, 200.0),
+}
+
+# Highest tabulated pressure, as a fraction of the critical pressure.
+P_MAX = 0.95
+
+SATURATION = ('T_sat', 'h_f', 'h_g', 's_f', 's_g', 'v_f', 'v_g')
+PROPERTIES = ('h', 's', 'v')
+
+
+class FluidTables:
+    """Lazily memory-mapped property tables of every fluid under ``directory``."""
+
+    def __init__(self, directory=DATA_DIR):
+        self.directory = directory
+        self._index = None
+        self._arrays = {}
+
+    @property
+    def index(self):
+        if self._index is None:
+            with open(os.path.join(self.directory, 'index.json'), encoding='utf-8') as f:
+                self._index = json.load(f)
+        return self._index
+
+    def table(self, fluid, kind):
+        if fluid not in FLUIDS:
+            raise ValueError(f"fluid must be one of {', '.join(FLUIDS)}")
+        if (fluid, kind) not in self._arrays:
+            path = os.path.join(self.directory, f'{fluid}.{kind}.npy')
+            self._arrays[fluid, kind] = np.load(path, mmap_mode='r')
+        return self.index[fluid][kind], self._arrays[fluid, kind]
+
+    def saturation(self, fluid, P):
+        """Saturation properties at pressures ``P``."""
+        entry, table = self.table(fluid, 'saturation')
+        i, s = locate(np.log(P), entry['lnP'])
+        row = (1 - s)[..., None] * table[i] + s[..., None] * table[i + 1]
+        return dict(zip(SATURATION, np.moveaxis(row, -1, 0)))
+
+    def _single_phase(self, fluid, kind, P, offset):
+        entry, table = self.table(fluid, kind)
+        i, s = locate(np.log(P), entry['lnP'])
+        j, t = locate(np.sqrt(offset), entry['root_offset'])
+        s, t = s[..., None], t[..., None]
+        values = ((1 - s) * ((1 - t) * table[i, j] + t * table[i, j + 1])
+                  + s * ((1 - t) * table[i + 1, j] + t * table[i + 1, j + 1]))
+        return dict(zip(PROPERTIES, np.moveaxis(values, -1, 0)))
+
+    def state_pt(self, fluid, P, T):
+        """h, s, v of the single-phase state at pressure ``P`` and temperature ``T``."""
+        P, T = np.broadcast_arrays(np.asarray(P, dtype=float), np.asarray(T, dtype=float))
+        with np.errstate(all='ignore'):
+            superheat = T - self.saturation(fluid, P)['T_sat']
+            vapor = self._single_phase(fluid, 'vapor', P, superheat)
+            liquid = self._single_phase(fluid, 'liquid', P, -superheat)
+        state = {key: np.where(superheat >= 0, vapor[key], liquid[key]) for key in PROPERTIES}
+        state.update(T=T, x=np.where(superheat >= 0, np.where(superheat == 0, 1.0, np.nan), 0.0))
+        return state
+
+    def _invert_s(self, fluid, kind, P, s_target):
+        """Offset from the saturation line at which the entropy is ``s_target``."""
+        entry, table = self.table(fluid, kind)
+        i, f = locate(np.log(P), entry['lnP'])
+        f = f[..., None]
+        profile = (1 - f) * table[i, :, 1] + f * table[i + 1, :, 1]
+        if kind == 'liquid':
+            profile = -profile  # entropy falls with subcooling
+            s_target = -s_target
+        # Entropy is monotonic along each row: find the bracketing cell.
+        above = profile >= s_target[..., None]
+        j = np.clip(np.argmax(above, axis=-1) - 1, 0, profile.shape[-1] - 2)
+        lo = np.take_along_axis(profile, j[..., None], axis=-1)[..., 0]
+        hi = np.take_along_axis(profile, j[..., None] + 1, axis=-1)[..., 0]
+        found = above.any(axis=-1) & (profile[..., 0] <= s_target)
+        axis = entry['root_offset']
+        step = (axis['stop'] - axis['start']) / (axis['count'] - 1)
+        root_offset = axis['start'] + (j + (s_target - lo) / (hi - lo)) * step
+        return np.where(found, root_offset ** 2, np.nan)
+
+    def state_ps(self, fluid, P, s):
+        """State at pressure ``P`` and entropy ``s``: wet, superheated or subcooled."""
+        P, s = np.broadcast_arrays(np.asarray(P, dtype=float), np.asarray(s, dtype=float))
+        with np.errstate(all='ignore'):
+            sat = self.saturation(fluid, P)
+            x = (s - sat['s_f']) / (sat['s_g'] - sat['s_f'])
+            wet = {key: sat[f'{key}_f'] + x * (sat[f'{key}_g'] - sat[f'{key}_f'])
+                   for key in ('h', 'v')}
+            superheat = self._invert_s(fluid, 'vapor', P, s)
+            subcooling = self._invert_s(fluid, 'liquid', P, s)
+            vapor = self._single_phase(fluid, 'vapor', P, superheat)
+            liquid = self._single_phase(fluid, 'liquid', P, subcooling)
+        state = {
+            'h': np.select([x > 1, x < 0], [vapor['h'], liquid['h']], wet['h']),
+            'v': np.select([x > 1, x < 0], [vapor['v'], liquid['v']], wet['v']),
+            's': s,
+            'T': np.select([x > 1, x < 0], [sat['T_sat'] + superheat, sat['T_sat'] - subcooling],
+                           sat['T_sat']),
+            'x': np.select([x > 1, x < 0], [np.nan, 0.0], x),
+        }
+        return state
+
+
+def rankine(fluid, P_high, P_low, T_high=None, eta_turbine=1.0, eta_pump=1.0, tables=None):
+    """Simple Rankine cycle between boiler pressure ``P_high`` and condenser
+    pressure ``P_low``.
+
+    The turbine takes steam at ``T_high`` (saturated vapour if None) and the
+    condenser leaves saturated liquid.  States are numbered like the
+    ``advanced_cycles.rankine`` calculator: 1 turbine inlet, 2 turbine exit,
+    3 pump inlet, 4 pump exit.  Returns specific enthalpies [J/kg], the
+    turbine exit quality ``x2``, works, heat input and efficiency.
+    """
+    tables = tables or default_tables()
+    P_high, P_low = np.asarray(P_high, dtype=float), np.asarray(P_low, dtype=float)
+    with np.errstate(all='ignore'):
+        boiler = tables.saturation(fluid, P_high)
+        if T_high is None:
+            h1, s1 = boiler['h_g'], boiler['s_g']
+        else:
+            inlet = tables.state_pt(fluid, P_high, T_high)
+            dry = np.asarray(T_high) >= boiler['T_sat']
+            h1, s1 = np.where(dry, inlet['h'], np.nan), np.where(dry, inlet['s'], np.nan)
+
+        exit_ = tables.state_ps(fluid, P_low, s1)
+        h2 = h1 - eta_turbine * (h1 - exit_['h'])
+        condenser = tables.saturation(fluid, P_low)
+        h3 = condenser['h_f']
+        h4 = h3 + condenser['v_f'] * (P_high - P_low) / eta_pump
+        x2 = (h2 - condenser['h_f']) / (condenser['h_g'] - condenser['h_f'])
+
+        W_turbine = h1 - h2
+        W_pump = h4 - h3
+        q_in = h1 - h4
+        valid = (P_high > P_low) & np.isfinite(h1) & np.isfinite(h2)
+    return {
+        'h1': h1, 'h2': h2, 'h3': h3, 'h4': h4,
+        'x2': np.where(x2 <= 1, x2, np.nan),
+        'W_turbine': W_turbine, 'W_pump': W_pump,
+        'W_net': W_turbine - W_pump, 'q_in': q_in,
+        'eta': np.where(valid, (W_turbine - W_pump) / q_in, np.nan),
+    }
+
+
+_default = None
+
+
+def default_tables():
+    global _default
+    if _default is None:
+        _default = FluidTables()
+    return _default
+
+
+# ---------------- Build ----------------
+
+def _axis(lo, hi, n):
+    return {'start': float(lo), 'stop': float(hi), 'count': int(n)}
+
+
+def _grid(axis):
+    return np.linspace(axis['start'], axis['stop'], axis['count'])
+
+
+def _midpoints(values):
+    return 0.5 * (values[1:] + values[:-1])
+
+
+def _error(key, guess, exact):
+    """Absolute error for h and s (their zero is an arbitrary reference state),
+    relative error for T and v."""
+    error = guess - exact
+    if not key.startswith(('h', 's')):
+        error = error / exact
+    return float(np.nanmax(np.abs(error)))
+
+
+class _CoolPropFluid:
+    def __init__(self, name):
+        from CoolProp.CoolProp import PropsSI
+
+        self.name = name
+        self.PropsSI = PropsSI
+
+    def props(self, *inputs):
+        """h, s, v stacked on the last axis; NaN where CoolProp has no state."""
+        h, s, rho = (self.PropsSI(key, *inputs, self.name) for key in ('H', 'S', 'D'))
+        out = np.stack((h, s, 1 / rho), axis=-1)
+        return np.where(np.isfinite(out) & np.isfinite(rho)[..., None], out, np.nan)
+
+    def saturation(self, lnP):
+        P = np.exp(lnP)
+        liquid, vapor = (self.props('P', P, 'Q', q) for q in (0, 1))
+        T = self.PropsSI('T', 'P', P, 'Q', 0, self.name)
+        return np.column_stack((T, liquid[:, 0], vapor[:, 0], liquid[:, 1], vapor[:, 1],
+                                liquid[:, 2], vapor[:, 2]))
+
+    def single_phase(self, kind, lnP, root_offset):
+        """h, s, v on the (ln P, √offset) grid, the first column on the saturation line."""
+        sat = self.saturation(lnP)
+        offset = root_offset ** 2
+        T = sat[:, :1] + (offset if kind == 'vapor' else -offset)[None, :]
+        P = np.broadcast_to(np.exp(lnP)[:, None], T.shape)
+        out = self.props('P', P.ravel(), 'T', T.ravel()).reshape(T.shape + (3,))
+        on_line = sat[:, [2, 4, 6]] if kind == 'vapor' else sat[:, [1, 3, 5]]
+        out[:, offset == 0] = on_line[:, None]
+        return out
+
+
+def _build_fluid(fluid, pressures, offsets, saturation_points):
+    name, P_min, superheat, subcooling = FLUIDS[fluid]
+    source = _CoolPropFluid(name)
+    P_max = P_MAX * source.PropsSI('pcrit', name)
+    entries = {'saturation': {'lnP': _axis(np.log(P_min), np.log(P_max), saturation_points)}}
+    arrays = {'saturation': source.saturation(_grid(entries['saturation']['lnP']))}
+    for kind, span in (('vapor', superheat), ('liquid', subcooling)):
+        entries[kind] = {'lnP': _axis(np.log(P_min), np.log(P_max), pressures),
+                         'root_offset': _axis(0.0, np.sqrt(span), offsets[kind])}
+        arrays[kind] = source.single_phase(kind, _grid(entries[kind]['lnP']),
+                                           _grid(entries[kind]['root_offset']))
+
+    # Worst error at the cell midpoints, per property.
+    tables = FluidTables(None)
+    tables._index = {fluid: entries}
+    tables._arrays = {(fluid, kind): array.astype(np.float32) for kind, array in arrays.items()}
+    lnP = _midpoints(_grid(entries['saturation']['lnP']))
+    exact = source.saturation(lnP)
+    guess = tables.saturation(fluid, np.exp(lnP))
+    entries['saturation']['error_bound'] = {
+        key: _error(key, guess[key], exact[:, k]) for k, key in enumerate(SATURATION)
+    }
+    for kind in ('vapor', 'liquid'):
+        lnP = _midpoints(_grid(entries[kind]['lnP']))
+        root_offset = _midpoints(_grid(entries[kind]['root_offset']))
+        exact = source.single_phase(kind, lnP, root_offset)
+        P, offset = np.meshgrid(np.exp(lnP), root_offset ** 2, indexing='ij')
+        guess = tables._single_phase(fluid, kind, P, offset)
+        entries[kind]['error_bound'] = {
+            key: _error(key, guess[key], exact[..., k]) for k, key in enumerate(PROPERTIES)
+        }
+    return entries, arrays
+
+
+def build(directory=DATA_DIR, pressures=256, saturation_points=1000, offsets=None):
+    offsets = offsets or {'vapor': 121, 'liquid': 61}
+    os.makedirs(directory, exist_ok=True)
+    index = {}
+    for fluid in FLUIDS:
+        with np.errstate(all='ignore'):
+            index[fluid], arrays = _build_fluid(fluid, pressures, offsets, saturation_points)
+        for kind, array in arrays.items():
+            np.save(os.path.join(directory, f'{fluid}.{kind}.npy'), array.astype(np.float32))
+        for kind, entry in index[fluid].items():
+            bounds = '  '.join(f'{key} ±{error:.1e}' for key, error in entry['error_bound'].items())
+            print(f'{fluid:<6} {kind:<10} {bounds}')
+    with open(os.path.join(directory, 'index.json'), 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=1)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the fluid property tables (needs CoolProp).')
+    parser.add_argument('--out', default=DATA_DIR)
+    parser.add_argument('--pressures', type=int, default=256, help='ln P grid points')
+    parser.add_argument('--saturation-points', type=int, default=1000)
+    args = parser.parse_args()
+    build(args.out, args.pressures, args.saturation_points)
+
+
+if __name__ == '__main__':
+    main()
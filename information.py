@@ -0,0 +1,149 @@
+"""Shannon information measures of distributions of any size, and their thermodynamic cost.
+
+* ``entropy()``            – H(p) = −Σ p ln p, with the Landauer bound kT·H on
+  the heat needed to erase it
+* ``divergence()``         – Kullback–Leibler D(p‖q) and the cross entropy;
+  kT·D is the free energy a system in p holds over equilibrium q
+* ``mutual_information()`` – I(X;Y) of a joint histogram, with the marginal
+  and conditional entropies; kT·I bounds the work extractable by feedback
+
+Distributions are counts or probabilities (normalized here) given as an
+array-like, or as a callable returning an iterable of chunks, e.g.
+``uploads.read_chunks`` over a file.  Every measure is a sum over bins,
+rearranged so it needs no normalization up front:
+
+    H = ln S − Σ c ln c / S,    S = Σ c
+
+so one pass over the chunks accumulates two numbers (plus a column-sum
+vector for a joint histogram) and a distribution with any number of bins is
+reduced in bounded memory.  Entropies are in nats with ``_bits`` copies.
+"""
+import math
+
+import numpy as np
+
+from constants import KB
+
+
+def _chunks(source):
+    if callable(source):
+        return source()
+    return (np.asarray(source, dtype=float),)
+
+
+def _checked(c):
+    c = np.asarray(c, dtype=float)
+    if not np.isfinite(c).all() or (c < 0).any():
+        raise ValueError('probabilities and counts must be finite and >= 0')
+    return c
+
+
+def _xlogx(c):
+    return c * np.log(np.where(c > 0, c, 1))
+
+
+def _entropy(total, xlogx):
+    if not total > 0:
+        raise ValueError('a distribution needs at least one positive entry')
+    return math.log(total) - xlogx / total
+
+
+def _with_bits(result, *keys):
+    for key in keys:
+        result[f'{key}_bits'] = result[key] / math.log(2)
+    return result
+
+
+def _landauer(result, T, key, name):
+    if T is not None:
+        if not T > 0:
+            raise ValueError('temperature must be > 0')
+        result[name] = KB * T * result[key]
+    return result
+
+
+def entropy(p, T=None):
+    """Entropy of the distribution ``p``; with ``T`` [K] also the Landauer
+    heat [J] to erase it.  Returns ``H``, ``bins``, ``support`` (nonzero
+    bins) and ``perplexity`` e^H, the effective number of states."""
+    total = xlogx = 0.0
+    bins = support = 0
+    for c in _chunks(p):
+        c = _checked(c).ravel()
+        total += float(c.sum())
+        xlogx += float(_xlogx(c).sum())
+        bins += c.size
+        support += int(np.count_nonzero(c))
+    H = _entropy(total, xlogx)
+    result = {'H': H, 'bins': bins, 'support': support, 'perplexity': math.exp(H)}
+    return _landauer(_with_bits(result, 'H'), T, 'H', 'landauer_heat')
+
+
+def _aligned(p, q):
+    """Equal-length chunk pairs of two sources whose chunks need not line up."""
+    left, right = iter(_chunks(p)), iter(_chunks(q))
+    a = b = np.empty(0)
+    while True:
+        if not a.size:
+            a = next((np.ravel(c) for c in left), None)
+        if not b.size:
+            b = next((np.ravel(c) for c in right), None)
+        if a is None or b is None:
+            if a is not None or b is not None:
+                raise ValueError('p and q must have the same number of bins')
+            return
+        n = min(a.size, b.size)
+        yield a[:n], b[:n]
+        a, b = a[n:], b[n:]
+
+
+def divergence(p, q, T=None):
+    """Kullback–Leibler divergence D(p‖q) (infinite where q = 0 < p), the
+    entropy ``H`` of p and the cross entropy H(p, q) = H + D; with ``T`` also
+    ``free_energy`` kT·D [J]."""
+    totals = np.zeros(2)
+    xlogx = cross = 0.0
+    for a, b in _aligned(p, q):
+        a, b = _checked(a), _checked(b)
+        totals += a.sum(), b.sum()
+        xlogx += float(_xlogx(a).sum())
+        with np.errstate(divide='ignore'):
+            cross += float(np.where(a > 0, a * np.log(b), 0).sum())
+    H = _entropy(totals[0], xlogx)
+    if not totals[1] > 0:
+        raise ValueError('a distribution needs at least one positive entry')
+    # Σ p ln(p/q) with p = a/S_p, q = b/S_q.
+    D = max((xlogx - cross) / totals[0] - math.log(totals[0]) + math.log(totals[1]), 0.0)
+    result = {'KL': D, 'H': H, 'cross_entropy': H + D}
+    return _landauer(_with_bits(result, 'KL', 'H', 'cross_entropy'), T, 'KL', 'free_energy')
+
+
+def mutual_information(joint, T=None):
+    """Mutual information of the joint histogram ``joint`` (rows: values of
+    X, columns: values of Y), with ``H_X``, ``H_Y``, ``H_XY`` and the
+    conditional entropies; with ``T`` also ``max_work`` kT·I [J].  A source
+    of chunks must yield 2-D blocks of whole rows."""
+    total = xlogx = row_xlogx = 0.0
+    columns = None
+    for c in _chunks(joint):
+        c = _checked(c)
+        if c.ndim != 2:
+            raise ValueError('the joint distribution must be a 2-D table')
+        if columns is None:
+            columns = np.zeros(c.shape[1])
+        elif c.shape[1] != columns.size:
+            raise ValueError('every row of the joint distribution needs the same length')
+        rows = c.sum(axis=1)
+        total += float(rows.sum())
+        xlogx += float(_xlogx(c).sum())
+        row_xlogx += float(_xlogx(rows).sum())
+        columns += c.sum(axis=0)
+    if columns is None:
+        raise ValueError('the joint distribution is empty')
+    H_XY = _entropy(total, xlogx)
+    H_X = _entropy(total, row_xlogx)
+    H_Y = _entropy(total, float(_xlogx(columns).sum()))
+    result = {'I': max(H_X + H_Y - H_XY, 0.0), 'H_X': H_X, 'H_Y': H_Y, 'H_XY': H_XY,
+              'H_X_given_Y': H_XY - H_Y, 'H_Y_given_X': H_XY - H_X}
+    _with_bits(result, 'I', 'H_X', 'H_Y', 'H_XY', 'H_X_given_Y', 'H_Y_given_X')
+    return _landauer(result, T, 'I', 'max_work')
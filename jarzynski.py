@@ -0,0 +1,271 @@
+"""Free energies from nonequilibrium work samples (Jarzynski, Crooks / BAR).
+
+Jarzynski's equality ⟨exp(−βW)⟩ = exp(−βΔF) turns the work W done in many
+repetitions of a driven process into the equilibrium free-energy difference
+ΔF.  ``WorkAccumulator`` evaluates it over any number of samples fed in
+chunks, keeping only O(1) state:
+
+* the exponential average as a log-mean-exp, shifted by the largest −βW
+  seen so far (and rescaled whenever that grows), so nothing overflows
+* the mean and variance of W (pairwise-combined per chunk)
+* ``BOOTSTRAP`` Poisson-bootstrap replicates of the exponential sum, for a
+  percentile confidence interval without keeping the samples to resample:
+  each sample enters every replicate with an independent Poisson(1) weight
+  (in long streams, each run of consecutive samples; that assumes they
+  come in no particular order, and sorted files only widen the interval)
+* a uniform random subsample of at most ``SAMPLE`` works for plotting
+
+With work from the reverse process too, ``bar()`` solves Bennett's
+acceptance ratio, the maximum-likelihood estimate under the Crooks
+fluctuation theorem, with safeguarded Newton iterations.  Each iteration is
+one pass over the samples, which may be re-read from a file rather than held
+in memory (see ``uploads.read_chunks``).
+
+Works are in ``UNITS`` at temperature ``T`` [K]; 'kT' works are already
+reduced and need no temperature.
+"""
+import math
+
+import numpy as np
+
+from constants import KB, R
+
+UNITS = ('J', 'kJ/mol', 'kT')
+BOOTSTRAP = 200
+SAMPLE = 2000
+ITERATIONS = 64
+TOLERANCE = 1e-10   # on βΔF
+BLOCK = 8192         # bootstrap weights drawn at once, per replicate
+GROUP = 1 << 16      # samples resampled one by one
+
+# Poisson(1) weights by table lookup on 16 random bits, several times
+# faster than drawing them directly.
+_POISSON = np.searchsorted(
+    np.cumsum([math.exp(-1) / math.factorial(k) for k in range(12)]) * 65536,
+    np.arange(65536) + 0.5).astype(np.float32)
+
+
+def beta(T=None, units='J'):
+    """1 / (unit of work) for works in ``units`` at ``T``."""
+    if units not in UNITS:
+        raise ValueError(f"units must be one of {', '.join(UNITS)}")
+    if units == 'kT':
+        return 1.0
+    if T is None or not T > 0:
+        raise ValueError('temperature must be > 0')
+    return 1 / (KB * T) if units == 'J' else 1000 / (R * T)
+
+
+def _chunks(source):
+    """Arrays of samples from an array-like or a callable returning an iterable of them."""
+    if callable(source):
+        return source()
+    return (np.asarray(source, dtype=float).ravel(),)
+
+
+class WorkAccumulator:
+    """Streaming Jarzynski estimate of ΔF from work samples added in chunks."""
+
+    def __init__(self, beta, replicates=BOOTSTRAP, sample=SAMPLE, seed=None):
+        self.beta = beta
+        self.rng = np.random.default_rng(seed)
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0                        # Σ (W − mean)²
+        self.shift = -np.inf                 # largest −βW so far
+        self.total = 0.0                     # Σ exp(−βW − shift)
+        self.total2 = 0.0                    # Σ exp(−2βW − 2 shift)
+        self.boot_total = np.zeros(replicates)
+        self.boot_n = np.zeros(replicates)
+        self.sample_size = sample
+        self.sample = np.empty(0)
+        self._keys = np.empty(0)
+
+    def add(self, W):
+        W = np.asarray(W, dtype=float).ravel()
+        if not W.size:
+            return
+        if not np.isfinite(W).all():
+            raise ValueError('work samples must be finite')
+
+        n, mean = W.size, float(W.mean())
+        delta = mean - self.mean
+        total_n = self.n + n
+        self.m2 += float(((W - mean) ** 2).sum()) + delta * delta * self.n * n / total_n
+        self.mean += delta * n / total_n
+        self.n = total_n
+
+        x = -self.beta * W
+        top = float(x.max())
+        if top > self.shift:
+            scale = math.exp(self.shift - top) if self.n > n else 0.0
+            self.total *= scale
+            self.total2 *= scale * scale
+            self.boot_total *= scale
+            self.shift = top
+        e = np.exp(x - self.shift)
+        self.total += float(e.sum())
+        self.total2 += float((e * e).sum())
+        if self.boot_total.size:
+            # Past GROUP samples, runs of consecutive samples share one weight;
+            # the runs lengthen with the count, so the replicates cost
+            # O(GROUP log n) draws rather than O(n).
+            size = max(1, (self.n - n) // GROUP)
+            starts = np.arange(0, n, size)
+            sums = np.add.reduceat(e, starts).astype(np.float32)
+            counts = np.diff(np.append(starts, n)).astype(np.float32)
+            for start in range(0, starts.size, BLOCK):
+                u = self.rng.integers(0, 65536, (self.boot_total.size,
+                                                 min(BLOCK, starts.size - start)), dtype=np.uint16)
+                w = _POISSON[u]
+                self.boot_total += w @ sums[start:start + BLOCK]
+                self.boot_n += w @ counts[start:start + BLOCK]
+
+        # Keep the samples with the SAMPLE smallest random keys: a uniform subsample.
+        keys = np.concatenate((self._keys, self.rng.random(n)))
+        values = np.concatenate((self.sample, W))
+        if keys.size > self.sample_size:
+            keep = np.argpartition(keys, self.sample_size)[:self.sample_size]
+            keys, values = keys[keep], values[keep]
+        self._keys, self.sample = keys, values
+
+    def estimate(self, confidence=0.95):
+        """ΔF with its bootstrap confidence interval and the work statistics."""
+        if self.n < 2:
+            raise ValueError('need at least two work samples')
+        if not 0 < confidence < 1:
+            raise ValueError('confidence must be between 0 and 1')
+        delta_F = -(self.shift + math.log(self.total / self.n)) / self.beta
+        result = {
+            'n': self.n,
+            'delta_F': delta_F,
+            'mean_W': self.mean,
+            'std_W': math.sqrt(self.m2 / (self.n - 1)),
+            'dissipated_W': self.mean - delta_F,
+            # Kish effective sample size of the exponential weights; ΔF is
+            # unreliable when only a handful of samples dominate.
+            'effective_samples': self.total ** 2 / self.total2,
+            'ci_low': float('nan'), 'ci_high': float('nan'), 'error': float('nan'),
+        }
+        valid = (self.boot_total > 0) & (self.boot_n > 0)
+        if valid.sum() >= 2:
+            boot = -(self.shift + np.log(self.boot_total[valid] / self.boot_n[valid])) / self.beta
+            tail = 50 * (1 - confidence)
+            result['ci_low'], result['ci_high'] = np.percentile(boot, (tail, 100 - tail)).tolist()
+            result['error'] = float(boot.std(ddof=1))
+        return result
+
+
+def jarzynski(W, beta, confidence=0.95, replicates=BOOTSTRAP, seed=None):
+    """Jarzynski ΔF from the works ``W`` (array-like, or a callable returning
+    an iterable of chunks); see ``WorkAccumulator.estimate``."""
+    acc = WorkAccumulator(beta, replicates, seed=seed)
+    for chunk in _chunks(W):
+        acc.add(chunk)
+    return acc.estimate(confidence), acc
+
+
+def _fermi_sums(source, beta, offset):
+    """n, Σf, Σf² and Σf(1 − f) of f = 1 / (1 + exp(βW + offset)) over ``source``."""
+    n = s1 = s2 = d = 0.0
+    for W in _chunks(source):
+        f = np.exp(-np.logaddexp(0, beta * W + offset))
+        n += f.size
+        s1 += float(f.sum())
+        s2 += float((f * f).sum())
+        d += float((f * (1 - f)).sum())
+    return n, s1, s2, d
+
+
+def bar(forward, reverse, beta, n_forward, n_reverse, start=0.0, confidence=0.95):
+    """Bennett acceptance ratio ΔF from forward and reverse works.
+
+    Solves Σ_F f(M + βW_F − βΔF) = Σ_R f(−M + βW_R + βΔF) for ΔF, with
+    f(x) = 1 / (1 + eˣ) and M = ln(n_F / n_R), from ``start``.  The
+    left side rises and the right side falls with ΔF, so the root is unique;
+    it is bracketed by doubling, then found by Newton with bisection
+    fallback.  The error is the asymptotic standard error of BAR.
+    """
+    if n_forward < 1 or n_reverse < 1:
+        raise ValueError('BAR needs forward and reverse work samples')
+    M = math.log(n_forward / n_reverse)
+
+    def excess(x):
+        _, fs, _, fd = _fermi_sums(forward, beta, M - x)
+        _, rs, _, rd = _fermi_sums(reverse, beta, x - M)
+        return fs - rs, fd + rd
+
+    x = beta * start
+    lo = hi = None
+    step = 1.0
+    for _ in range(ITERATIONS):
+        F, dF = excess(x)
+        if F == 0:
+            lo = hi = x
+            break
+        if F < 0:
+            lo = x
+        else:
+            hi = x
+        if lo is not None and hi is not None:
+            guess = x - F / dF if dF > 0 else None
+            next_x = guess if guess is not None and lo < guess < hi else 0.5 * (lo + hi)
+            if abs(next_x - x) < TOLERANCE:
+                x = next_x
+                break
+            x = next_x
+        else:
+            x += step if F < 0 else -step
+            step *= 2
+    else:
+        raise ValueError('BAR did not converge')
+
+    nf, fs, fs2, _ = _fermi_sums(forward, beta, M - x)
+    nr, rs, rs2, _ = _fermi_sums(reverse, beta, x - M)
+    variance = (fs2 / nf) / (fs / nf) ** 2 / nf - 1 / nf + (rs2 / nr) / (rs / nr) ** 2 / nr - 1 / nr
+    error = math.sqrt(max(variance, 0.0)) / beta
+    z = math.sqrt(2) * _erfinv(confidence)
+    delta_F = x / beta
+    return {'delta_F': delta_F, 'error': error,
+            'ci_low': delta_F - z * error, 'ci_high': delta_F + z * error}
+
+
+def _erfinv(y):
+    """Inverse error function by Newton on ``math.erf`` (y in (0, 1))."""
+    x = 0.0
+    for _ in range(50):
+        step = (math.erf(x) - y) / (2 / math.sqrt(math.pi) * math.exp(-x * x))
+        x -= step
+        if abs(step) < 1e-14:
+            break
+    return x
+
+
+def estimate(forward, reverse=None, T=None, units='J', confidence=0.95,
+             replicates=BOOTSTRAP, seed=None):
+    """ΔF of the forward process from its works and, optionally, the reverse ones.
+
+    ``forward`` and ``reverse`` are array-likes, or callables returning an
+    iterable of chunks (for BAR they are iterated once per Newton step).
+    Returns ``forward`` Jarzynski statistics (and their work ``sample``),
+    and with reverse works also the reverse Jarzynski estimate of the same
+    ΔF and the ``bar`` estimate.  Energies are in ``units``.
+    """
+    b = beta(T, units)
+    rng = np.random.default_rng(seed)
+    result = {'units': units}
+    stats, acc = jarzynski(forward, b, confidence, replicates, rng)
+    stats['sample'] = acc.sample
+    result['forward'] = stats
+    if reverse is None:
+        return result
+
+    stats, acc = jarzynski(reverse, b, confidence, replicates, rng)
+    # The reverse process changes F by −ΔF.
+    stats['delta_F'] = -stats['delta_F']
+    stats['ci_low'], stats['ci_high'] = -stats['ci_high'], -stats['ci_low']
+    stats['sample'] = acc.sample
+    result['reverse'] = stats
+    start = 0.5 * (result['forward']['delta_F'] + stats['delta_F'])
+    result['bar'] = bar(forward, reverse, b, result['forward']['n'], stats['n'], start, confidence)
+    return result
@@ -0,0 +1,271 @@
+"""Background runs of the long simulations in ``molsim`` on a process pool.
+
+A request submits a run and gets a job id back at once; the simulation
+executes in a worker process and the client polls the job for its progress
+and, once done, fetches its result.  Jobs live in a ``jobs`` table next to
+the users in the app's SQLite database, so every web worker can answer for
+any job and results outlive the process that computed them.
+
+The worker process writes the job's progress to that row as it runs (at most
+every ``PROGRESS_STEP``), and the same write is where it notices that the job
+was cancelled: a cancelled row no longer matches, and the run stops at its
+next progress report.  Each user may have ``user_limit`` jobs queued or
+running at once; the check and the insert share one write transaction, so
+concurrent submissions from several web workers cannot overshoot it.  An
+active job older than ``timeout`` is failed, so a job whose worker vanished
+without a trace cannot hold a slot of that limit forever.
+"""
+import inspect
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import molsim
+
+SCHEMA = '''CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                method TEXT NOT NULL,
+                params TEXT NOT NULL,
+                state TEXT NOT NULL,
+                progress REAL NOT NULL DEFAULT 0,
+                error TEXT,
+                result TEXT,
+                host INTEGER NOT NULL,
+                submitted REAL NOT NULL,
+                finished REAL)'''
+OWNER_INDEX = 'CREATE INDEX IF NOT EXISTS jobs_owner ON jobs (owner, state)'
+
+ACTIVE = ('queued', 'running')
+STATUS_FIELDS = ('id', 'method', 'params', 'state', 'progress', 'error', 'submitted', 'finished')
+
+# Progress is only written when it moved by at least this fraction.
+PROGRESS_STEP = 0.01
+
+_worker_path = None  # database path, set in each worker process by _init_worker
+
+
+class JobError(Exception):
+    """Unknown simulation or parameters, or a submission over the user's limit."""
+
+
+class JobLimitError(JobError):
+    """The user already has as many active jobs as allowed."""
+
+
+class JobUnavailableError(JobError):
+    """The worker pool could not take the job."""
+
+
+class _Cancelled(Exception):
+    pass
+
+
+def connect(path):
+    conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA busy_timeout=5000')
+    return conn
+
+
+def _init_worker(path):
+    global _worker_path
+    _worker_path = path
+
+
+def _run(method, params, job_id):
+    conn = connect(_worker_path)
+    last = [-1.0]
+
+    def progress(fraction):
+        if fraction - last[0] < PROGRESS_STEP and fraction < 1:
+            return
+        last[0] = fraction
+        updated = conn.execute(
+            "UPDATE jobs SET state='running', progress=? WHERE id=? AND state IN ('queued', 'running')",
+            (fraction, job_id)).rowcount
+        if not updated:
+            raise _Cancelled
+
+    try:
+        progress(0.0)
+        result = molsim.SIMULATIONS[method](progress=progress, **params)
+        conn.execute("UPDATE jobs SET state='done', progress=1, result=?, finished=? "
+                     "WHERE id=? AND state='running'", (json.dumps(result), time.time(), job_id))
+    except _Cancelled:
+        pass
+    except Exception as e:
+        conn.execute("UPDATE jobs SET state='failed', error=?, finished=? "
+                     "WHERE id=? AND state IN ('queued', 'running')", (str(e), time.time(), job_id))
+    finally:
+        conn.close()
+
+
+def parameters(method):
+    """Keyword parameters accepted by the simulation ``method`` with their defaults."""
+    signature = inspect.signature(molsim.SIMULATIONS[method])
+    return {name: p.default for name, p in signature.parameters.items() if name != 'progress'}
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobQueue:
+    def __init__(self, path, workers=2, user_limit=2, ttl=7 * 86400, timeout=86400):
+        self.path = path
+        self.workers = workers
+        self.user_limit = user_limit
+        self.ttl = ttl   # seconds finished jobs are kept
+        self.timeout = timeout   # seconds a job may stay queued or running
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pid = None
+        conn = self._conn()
+        conn.execute(SCHEMA)
+        conn.execute(OWNER_INDEX)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = connect(self.path)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _ensure_pool(self):
+        # Pools do not survive fork, so each web worker starts its own; a pool
+        # broken by a worker that died (e.g. killed for memory) is replaced.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            context = multiprocessing.get_context('spawn')
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=context,
+                                             initializer=_init_worker, initargs=(self.path,))
+            self._pid = os.getpid()
+
+    def submit(self, method, params, owner):
+        if method not in molsim.SIMULATIONS:
+            raise JobError(f"Unknown simulation '{method}'")
+        unknown = set(params) - set(parameters(method))
+        if unknown:
+            raise JobError(f"Unknown parameters for {method}: {', '.join(sorted(unknown))}")
+        self._ensure_pool()
+        self._reap()
+
+        job_id = uuid.uuid4().hex
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            active, = conn.execute("SELECT COUNT(*) FROM jobs WHERE owner=? AND state IN (?, ?)",
+                                   (owner,) + ACTIVE).fetchone()
+            if active >= self.user_limit:
+                raise JobLimitError(f'At most {self.user_limit} simulations may run at once; '
+                                    'wait for one to finish or cancel it')
+            conn.execute("INSERT INTO jobs (id, owner, method, params, state, host, submitted) "
+                         "VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+                         (job_id, owner, method, json.dumps(params), os.getpid(), time.time()))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+        try:
+            future = self._pool.submit(_run, method, params, job_id)
+        except (BrokenProcessPool, RuntimeError) as e:
+            self._broken()
+            self._fail(job_id, f'Worker failed: {e}')
+            raise JobUnavailableError('The simulation workers are restarting; try again') from e
+        future.add_done_callback(lambda f: self._lost(job_id, f))
+        return job_id
+
+    def status(self, job_id, owner):
+        """The job without its result; raises ``JobError`` for unknown ids and
+        jobs of other users."""
+        row = self._conn().execute(f"SELECT {', '.join(STATUS_FIELDS)} FROM jobs "
+                                   "WHERE id=? AND owner=?", (job_id, owner)).fetchone()
+        if row is None:
+            raise JobError(f"Unknown job '{job_id}'")
+        job = dict(zip(STATUS_FIELDS, row))
+        job['params'] = json.loads(job['params'])
+        return job
+
+    def jobs(self, owner):
+        """Status of every job of ``owner``, newest first."""
+        rows = self._conn().execute(f"SELECT {', '.join(STATUS_FIELDS)} FROM jobs "
+                                    "WHERE owner=? ORDER BY submitted DESC", (owner,)).fetchall()
+        jobs = [dict(zip(STATUS_FIELDS, row)) for row in rows]
+        for job in jobs:
+            job['params'] = json.loads(job['params'])
+        return jobs
+
+    def result(self, job_id, owner):
+        """The result of a finished job, None while it is still active or if it
+        failed or was cancelled."""
+        row = self._conn().execute("SELECT result FROM jobs WHERE id=? AND owner=?",
+                                   (job_id, owner)).fetchone()
+        if row is None:
+            raise JobError(f"Unknown job '{job_id}'")
+        return None if row[0] is None else json.loads(row[0])
+
+    def cancel(self, job_id, owner):
+        """Cancel an active job; returns False if it had already finished."""
+        self.status(job_id, owner)
+        return bool(self._conn().execute(
+            "UPDATE jobs SET state='cancelled', finished=? WHERE id=? AND state IN (?, ?)",
+            (time.time(), job_id) + ACTIVE).rowcount)
+
+    def _broken(self):
+        # A broken pool has already stopped its processes; the next
+        # submission builds a new one.
+        with self._lock:
+            if self._pid == os.getpid():
+                self._pid = None
+
+    def _fail(self, job_id, error):
+        self._conn().execute("UPDATE jobs SET state='failed', error=?, finished=? "
+                             "WHERE id=? AND state IN (?, ?)", (error, time.time(), job_id) + ACTIVE)
+
+    def _lost(self, job_id, future):
+        # _run records its own outcome; only a dead worker process gets here.
+        error = None if future.cancelled() else future.exception()
+        if isinstance(error, BrokenProcessPool):
+            self._broken()
+        if future.cancelled() or error is not None:
+            self._fail(job_id, f'Worker failed: {error or "cancelled"}')
+
+    def _reap(self):
+        """Fail jobs whose web worker has exited or that ran out of time, and
+        drop expired finished ones."""
+        conn = self._conn()
+        now = time.time()
+        # Also catches jobs whose web worker's pid was reused by another process.
+        conn.execute("UPDATE jobs SET state='failed', error='Timed out', finished=? "
+                     "WHERE submitted<? AND state IN (?, ?)", (now, now - self.timeout) + ACTIVE)
+        hosts = [pid for pid, in conn.execute(
+            "SELECT DISTINCT host FROM jobs WHERE state IN (?, ?)", ACTIVE)]
+        for pid in hosts:
+            if not _alive(pid):
+                conn.execute("UPDATE jobs SET state='failed', error='Server restarted', finished=? "
+                             "WHERE host=? AND state IN (?, ?)", (time.time(), pid) + ACTIVE)
+        conn.execute("DELETE FROM jobs WHERE finished<?", (now - self.ttl,))
+
+
+def queue_from_env(path):
+    return JobQueue(path, workers=int(os.getenv('SIMULATION_WORKERS', 2)),
+                    user_limit=int(os.getenv('SIMULATION_USER_LIMIT', 2)),
+                    ttl=float(os.getenv('JOB_TTL', 7 * 86400)),
+                    timeout=float(os.getenv('JOB_TIMEOUT', 86400)))
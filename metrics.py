@@ -0,0 +1,274 @@
+"""Per-route latency, throughput and error metrics in Prometheus text format.
+
+Every request records, per endpoint, its total time, compute time (the view
+minus template rendering), render time and the response status class.
+Outbound HTTP calls (exchange rates) and the errors views recover from are
+recorded the same way.  Observing is a couple of array increments; the text
+exposition is only built when ``/metrics`` is scraped.
+
+Counters live in one NumPy array per process.  With ``METRICS=dir:<path>``
+the array is a memory-mapped ``.npy`` file in that directory, one per worker,
+and a scrape of any worker sums all of them, so a gunicorn deployment reports
+as a whole.  Use a fresh directory per deployment.
+"""
+import bisect
+import functools
+import glob
+import hashlib
+import os
+import threading
+import time
+
+import numpy as np
+from flask import got_request_exception, has_request_context, request
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+TIMERS = (
+    ('request', 'app_request_duration_seconds', 'Time spent handling the request.'),
+    ('compute', 'app_compute_duration_seconds', 'View time excluding template rendering.'),
+    ('render', 'app_render_duration_seconds', 'Time spent rendering Jinja templates.'),
+    ('outbound', 'app_outbound_http_duration_seconds', 'Time spent in outbound HTTP calls.'),
+)
+# Errors are bucketed by the first of these names found in the exception's MRO.
+ERRORS = ('BatchError', 'RateError', 'KeyError', 'ArithmeticError', 'ValueError',
+          'RuntimeError', 'other')
+STATUSES = ('2xx', '3xx', '4xx', '5xx')
+
+_TIMER_WIDTH = len(BUCKETS) + 2          # buckets, +Inf, sum
+_ERROR_OFFSET = len(TIMERS) * _TIMER_WIDTH
+_STATUS_OFFSET = _ERROR_OFFSET + len(ERRORS)
+_WIDTH = _STATUS_OFFSET + len(STATUSES)
+
+_TIMER_BASE = {name: i * _TIMER_WIDTH for i, (name, _, _) in enumerate(TIMERS)}
+
+BACKGROUND = '<background>'   # outbound calls made outside a request
+UNMATCHED = '<unmatched>'     # 404s and other requests without an endpoint
+
+
+class Metrics:
+    def __init__(self, directory=None, enabled=True):
+        self.directory = directory
+        self.enabled = enabled
+        self.endpoints = None
+        self._offsets = {}
+        self._data = None
+        self._cells = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._wrapped = False
+
+    def init_app(self, app):
+        self.app = app
+        if not self.enabled:
+            return
+        # A WSGI wrapper, view wrappers and a timed template class instead of
+        # request hooks and template signals, whose dispatch alone costs more
+        # than the bookkeeping.
+        app.wsgi_app = self._middleware(app.wsgi_app)
+        app.jinja_env.template_class = self._timed_template(app.jinja_env.template_class)
+        got_request_exception.connect(self._on_exception, app)
+
+    # ---- storage ----
+
+    def _layout(self):
+        # Routes are all registered by the first request, so every worker
+        # derives the same endpoint order.
+        endpoints = sorted(e for e in self.app.view_functions if e != 'static')
+        return endpoints + [UNMATCHED, BACKGROUND]
+
+    def _layout_id(self, endpoints):
+        raw = repr((endpoints, BUCKETS, TIMERS, ERRORS, STATUSES)).encode('utf-8')
+        return hashlib.sha1(raw).hexdigest()[:12]
+
+    def _open(self):
+        if self._pid == os.getpid():
+            return self._cells
+        with self._lock:
+            if self._pid != os.getpid():
+                # First use in this process (or after a fork): never share
+                # the parent's counters.
+                self.endpoints = self._layout()
+                self._offsets = {name: i * _WIDTH for i, name in enumerate(self.endpoints)}
+                shape = (len(self.endpoints), _WIDTH)
+                if self.directory:
+                    os.makedirs(self.directory, exist_ok=True)
+                    path = os.path.join(self.directory, f'metrics-{self._layout_id(self.endpoints)}'
+                                                        f'-{os.getpid()}.npy')
+                    if os.path.exists(path):
+                        self._data = np.load(path, mmap_mode='r+')
+                    else:
+                        self._data = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64,
+                                                               shape=shape)
+                else:
+                    self._data = np.zeros(shape)
+                # Flat float view: item updates are much cheaper than NumPy indexing.
+                self._cells = memoryview(self._data.reshape(-1)).cast('B').cast('d')
+                self._pid = os.getpid()
+        return self._cells
+
+    def _offset(self, endpoint):
+        return self._offsets.get(endpoint, self._offsets[UNMATCHED])
+
+    # ---- recording ----
+
+    @staticmethod
+    def _observe(cells, offset, timer, seconds):
+        base = offset + _TIMER_BASE[timer]
+        cells[base + bisect.bisect_left(BUCKETS, seconds)] += 1
+        cells[base + _TIMER_WIDTH - 1] += seconds
+
+    def observe(self, timer, endpoint, seconds):
+        cells = self._open()
+        offset = self._offset(endpoint)
+        with self._lock:
+            self._observe(cells, offset, timer, seconds)
+
+    def count_error(self, exc, endpoint=None):
+        if not self.enabled:
+            return
+        if endpoint is None:
+            endpoint = request.endpoint if has_request_context() else BACKGROUND
+        names = {cls.__name__ for cls in type(exc).__mro__}
+        error = next((name for name in ERRORS if name in names), 'other')
+        cells = self._open()
+        offset = self._offset(endpoint)
+        with self._lock:
+            cells[offset + _ERROR_OFFSET + ERRORS.index(error)] += 1
+
+    def observe_outbound(self, seconds):
+        if self.enabled:
+            endpoint = request.endpoint if has_request_context() else BACKGROUND
+            self.observe('outbound', endpoint, seconds)
+
+    # Per-request timings live in a thread local and are written in one
+    # locked update when the response is returned.
+
+    def _middleware(self, wsgi_app):
+        local = self._local
+
+        def instrumented(environ, start_response):
+            if not self._wrapped:
+                self._wrap_views()
+            status = []
+
+            def capture(code, headers, exc_info=None):
+                status.append(code)
+                return start_response(code, headers, exc_info)
+
+            local.endpoint, local.view, local.render = UNMATCHED, 0.0, 0.0
+            start = time.perf_counter()
+            try:
+                return wsgi_app(environ, capture)
+            finally:
+                self._record(local.endpoint, time.perf_counter() - start, local.view,
+                             local.render, int(status[-1][:3]) if status else 500)
+        return instrumented
+
+    def _wrap_views(self):
+        with self._lock:
+            if self._wrapped:
+                return
+            for endpoint, view in list(self.app.view_functions.items()):
+                self.app.view_functions[endpoint] = self._timed_view(endpoint, view)
+            self._wrapped = True
+
+    def _timed_view(self, endpoint, view):
+        local = self._local
+
+        @functools.wraps(view)
+        def timed(*args, **kwargs):
+            local.endpoint = endpoint
+            start = time.perf_counter()
+            try:
+                return view(*args, **kwargs)
+            finally:
+                local.view += time.perf_counter() - start
+        return timed
+
+    def _timed_template(self, base):
+        local = self._local
+
+        class TimedTemplate(base):
+            def render(self, *args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return super().render(*args, **kwargs)
+                finally:
+                    if hasattr(local, 'render'):
+                        local.render += time.perf_counter() - start
+        return TimedTemplate
+
+    def _record(self, endpoint, total, view, render, status):
+        cells = self._open()
+        offset = self._offset(endpoint)
+        status_class = min(max(status // 100, 2), 5)
+        with self._lock:
+            self._observe(cells, offset, 'request', total)
+            if view:
+                self._observe(cells, offset, 'compute', max(view - render, 0.0))
+            if render:
+                self._observe(cells, offset, 'render', render)
+            cells[offset + _STATUS_OFFSET + status_class - 2] += 1
+
+    def _on_exception(self, sender, exception, **extra):
+        self.count_error(exception)
+
+    # ---- exposition ----
+
+    def totals(self):
+        """Counters summed over every worker sharing the metrics directory."""
+        self._open()
+        data = np.array(self._data)
+        if self.directory:
+            pattern = os.path.join(self.directory, f'metrics-{self._layout_id(self.endpoints)}-*.npy')
+            data = np.zeros_like(data)
+            for path in glob.glob(pattern):
+                try:
+                    data += np.load(path, mmap_mode='r')
+                except (OSError, ValueError):
+                    continue
+        return data
+
+    def expose(self):
+        data = self.totals()
+        lines = []
+        for t, (_, name, help_text) in enumerate(TIMERS):
+            base = t * _TIMER_WIDTH
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for row, endpoint in enumerate(self.endpoints):
+                counts = data[row, base:base + len(BUCKETS) + 1]
+                total = counts.sum()
+                if not total:
+                    continue
+                cumulative = np.cumsum(counts)
+                for le, count in zip(BUCKETS, cumulative):
+                    lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="{le}"}} {int(count)}')
+                lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="+Inf"}} {int(total)}')
+                lines.append(f'{name}_sum{{endpoint="{endpoint}"}} {float(data[row, base + _TIMER_WIDTH - 1])!r}')
+                lines.append(f'{name}_count{{endpoint="{endpoint}"}} {int(total)}')
+
+        for name, help_text, label, offset, values in (
+                ('app_responses_total', 'Responses by status class.', 'status',
+                 _STATUS_OFFSET, STATUSES),
+                ('app_errors_total', 'Errors handled or raised while serving a route.', 'error',
+                 _ERROR_OFFSET, ERRORS)):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} counter')
+            for row, endpoint in enumerate(self.endpoints):
+                for i, value in enumerate(values):
+                    count = data[row, offset + i]
+                    if count:
+                        lines.append(f'{name}{{endpoint="{endpoint}",{label}="{value}"}} {int(count)}')
+        return '\n'.join(lines) + '\n'
+
+
+def metrics_from_env():
+    spec = os.getenv('METRICS', 'memory')
+    if spec == 'off':
+        return Metrics(enabled=False)
+    kind, _, location = spec.partition(':')
+    if kind == 'dir':
+        return Metrics(directory=location or 'metrics')
+    return Metrics()
@@ -0,0 +1,448 @@
+"""Lennard-Jones fluid simulations in reduced units (σ = ε = m = k_B = 1).
+
+* ``monte_carlo()``               – NVT Metropolis with single-particle moves,
+  optionally with Widom test-particle insertions for the excess chemical
+  potential
+* ``langevin()``                  – Langevin dynamics with the BAOAB splitting
+* ``thermodynamic_integration()`` – excess free energy by switching the
+  interactions on over λ windows (soft-core, Gauss–Legendre quadrature)
+
+Pairs interact through LJ truncated at ``CUTOFF`` with the usual tail
+corrections.  Neighbours come from a cell list (cells at least one cutoff
+wide, 27 around each particle), which makes every energy and force
+evaluation O(N); small boxes where that would not pay fall back to all
+pairs.  Distances, energies and forces are evaluated as NumPy arrays over
+all candidate neighbours (all pairs for the dynamics), so only the
+Metropolis loop itself runs particle by particle.
+
+Every run takes a ``progress`` callback, called with the completed fraction,
+so a job runner can report on it, and returns a dict of plain floats and
+lists.  Statistical errors are standard errors over ``BLOCKS`` block
+averages.
+"""
+import itertools
+import math
+
+import numpy as np
+
+CUTOFF = 2.5
+SOFT_CORE = 0.5   # α of the soft-core potential used for λ < 1
+BLOCKS = 10
+
+# Limits on one run; runs are CPU-bound and go through the job queue.
+LIMITS = {'N': (2, 4000), 'density': (1e-4, 1.2), 'T': (0.05, 10.0),
+          'sweeps': (1, 100000), 'equilibration': (0, 100000), 'steps': (1, 1000000),
+          'windows': (2, 32)}
+# Limits on a run's total work, whatever mix of parameters produces it:
+# single-particle Metropolis moves (≈ 10⁴/s, so about 20 minutes) and
+# particle time steps of the dynamics (≈ 3·10⁴/s).
+MAX_MOVES = 10_000_000
+MAX_PARTICLE_STEPS = 50_000_000
+
+
+def _tail(density, rc=CUTOFF):
+    """Per-particle energy and pressure tail corrections beyond ``rc``."""
+    u = 8 / 3 * math.pi * density * (rc ** -9 / 3 - rc ** -3)
+    p = 16 / 3 * math.pi * density ** 2 * (2 / 3 * rc ** -9 - rc ** -3)
+    return u, p
+
+
+def _pair(r2, lam=1.0):
+    """Energy u, virial w = −r·du/dr and ∂u/∂λ of pairs at squared distance ``r2``.
+
+    λ scales a soft-core LJ, 4λ[1/x² − 1/x] with x = r⁶ + α(1 − λ), which is
+    plain LJ at λ = 1 and stays finite at r = 0 for λ < 1.
+    """
+    x = r2 ** 3 + SOFT_CORE * (1 - lam)
+    inv = 1 / x
+    inv2 = inv * inv
+    u = 4 * lam * (inv2 - inv)
+    w = 24 * lam * r2 ** 3 * (2 * inv2 * inv - inv2)
+    dudl = 4 * (inv2 - inv) + 4 * lam * SOFT_CORE * (2 * inv2 * inv - inv2)
+    return u, w, dudl
+
+
+class CellList:
+    """Particles binned into cubic cells at least ``rc`` wide.
+
+    ``members`` is a padded ``(cells, capacity)`` index array (−1 for empty
+    slots), so the neighbours of many points are gathered in one indexing
+    operation.
+    """
+
+    def __init__(self, L, rc, N):
+        self.L = L
+        self.m = m = int(L // rc)
+        # 27·capacity candidates per particle only beat N when cells are small.
+        self.enabled = m >= 3 and 27 * (N / m ** 3 + 4) < N
+        if self.enabled:
+            shape = (m, m, m)
+            ijk = np.stack(np.unravel_index(np.arange(m ** 3), shape), axis=-1)
+            offsets = np.array(list(itertools.product((-1, 0, 1), repeat=3)))
+            self.neighbours = np.ravel_multi_index(
+                tuple(np.moveaxis((ijk[:, None] + offsets) % m, -1, 0)), shape)
+
+    def cell(self, pos):
+        ijk = np.floor(pos * (self.m / self.L)).astype(int) % self.m
+        return np.ravel_multi_index(tuple(np.moveaxis(ijk, -1, 0)), (self.m,) * 3)
+
+    def build(self, pos):
+        if not self.enabled:
+            self.all = np.arange(len(pos))
+            return
+        self.cell_of = self.cell(pos)
+        self.counts = np.bincount(self.cell_of, minlength=self.m ** 3)
+        order = np.argsort(self.cell_of, kind='stable')
+        starts = np.cumsum(self.counts) - self.counts
+        sorted_cells = self.cell_of[order]
+        self.members = np.full((self.m ** 3, self.counts.max() + 4), -1)
+        self.members[sorted_cells, np.arange(len(pos)) - starts[sorted_cells]] = order
+
+    def move(self, i, new):
+        if not self.enabled or self.cell_of[i] == new:
+            return
+        old = self.cell_of[i]
+        row = self.members[old]
+        last = self.counts[old] - 1
+        row[np.flatnonzero(row[:last + 1] == i)[0]] = row[last]
+        row[last] = -1
+        self.counts[old] -= 1
+        if self.counts[new] == self.members.shape[1]:
+            self.members = np.pad(self.members, ((0, 0), (0, 4)), constant_values=-1)
+        self.members[new, self.counts[new]] = i
+        self.counts[new] += 1
+        self.cell_of[i] = new
+
+    def candidates(self, cells):
+        """Padded candidate neighbours (−1 = none) of points in ``cells``."""
+        if not self.enabled:
+            return np.broadcast_to(self.all, np.shape(cells) + self.all.shape)
+        c = self.members[self.neighbours[cells]]
+        return c.reshape(c.shape[:-2] + (-1,))
+
+
+class LJBox:
+    """N particles in a periodic cube at the given density, started on a lattice."""
+
+    def __init__(self, N, density, rng, lam=1.0):
+        self.N = N
+        self.L = (N / density) ** (1 / 3)
+        self.volume = self.L ** 3
+        self.density = density
+        self.rc = min(CUTOFF, self.L / 2)
+        self.lam = lam
+        self.rng = rng
+        k = math.ceil(N ** (1 / 3))
+        grid = np.stack(np.unravel_index(np.arange(N), (k, k, k)))
+        # Coordinates are stored component-major, which the Metropolis loop
+        # reads fastest; ``pos`` is the (N, 3) view of the same memory.
+        self.xyz = (grid + 0.5) * (self.L / k)
+        self.pos = self.xyz.T
+        self.cells = CellList(self.L, self.rc, N)
+        self.cells.build(self.pos)
+        self.U, self.W, self.dUdl, _ = self.forces(need_forces=False)
+        self.u_tail, self.p_tail = _tail(density, self.rc)
+
+    def _image(self, d):
+        return d - self.L * np.rint(d / self.L)
+
+    def pairs(self):
+        """Indices ``(i, j)`` of every candidate pair, each once."""
+        N = self.N
+        if not self.cells.enabled:
+            return np.triu_indices(N, 1)
+        self.cells.build(self.pos)
+        cand = self.cells.candidates(self.cells.cell_of)
+        i = np.broadcast_to(np.arange(N)[:, None], cand.shape)
+        keep = cand > i  # also drops the −1 padding
+        return i[keep], cand[keep]
+
+    def forces(self, need_forces=True):
+        """Total energy, virial, ∂U/∂λ and (optionally) the forces."""
+        i, j = self.pairs()
+        d = self._image(self.pos[j] - self.pos[i])
+        r2 = np.einsum('ij,ij->i', d, d)
+        near = r2 < self.rc ** 2
+        i, j, d, r2 = i[near], j[near], d[near], r2[near]
+        u, w, dudl = _pair(r2, self.lam)
+        F = None
+        if need_forces:
+            f = (w / r2)[:, None] * d  # force on j from i
+            F = np.stack([np.bincount(j, f[:, k], self.N) - np.bincount(i, f[:, k], self.N)
+                          for k in range(3)], axis=-1)
+        return u.sum(), w.sum(), dudl.sum(), F
+
+    def particle(self, i, points):
+        """Energy, virial and ∂U/∂λ of particle ``i`` placed at each of ``points``."""
+        cells = self.cells.cell(points) if self.cells.enabled else np.zeros(len(points), int)
+        cand = self.cells.candidates(cells)
+        d = self._image(self.pos[cand] - points[:, None])
+        r2 = np.einsum('...k,...k->...', d, d)
+        valid = (cand >= 0) & (cand != i) & (r2 < self.rc ** 2)
+        u, w, dudl = _pair(np.where(valid, r2, 1.0), self.lam)
+        return ((u * valid).sum(-1), (w * valid).sum(-1), (dudl * valid).sum(-1), cells)
+
+    def insertion_energy(self, points):
+        """Energies of test particles at ``points`` (Widom), vectorized over points."""
+        return self.particle(-1, points)[0]
+
+    def pressure(self, W, T):
+        return self.density * T + W / (3 * self.volume) + self.p_tail * self.lam
+
+    def _separations(self, i, cand, points):
+        """Squared distances (``(k, n)``) from ``points`` (``(3, k)``) to the
+        candidates ``cand`` (None for all particles), inf where they do not
+        interact."""
+        xyz = self.xyz if cand is None else self.xyz[:, cand]
+        d = xyz[:, None, :] - points[:, :, None]
+        d -= self.L * np.rint(d * (1 / self.L))
+        d *= d
+        r2 = d[0] + d[1]
+        r2 += d[2]
+        if cand is None:
+            r2[:, i] = np.inf
+        else:
+            r2[:, (cand < 0) | (cand == i)] = np.inf
+        r2[r2 >= self.rc ** 2] = np.inf
+        return r2
+
+    def sweep(self, T, delta):
+        """N Metropolis single-particle moves; returns the number accepted."""
+        rng, cells = self.rng, self.cells
+        picks = rng.integers(self.N, size=self.N)
+        steps = (rng.random((self.N, 3)) - 0.5) * delta
+        thresholds = np.log(rng.random(self.N)) * -T  # accept if ΔU < threshold
+        a = SOFT_CORE * (1 - self.lam)
+        accepted = 0
+        for i, step, threshold in zip(picks, steps, thresholds):
+            old = self.xyz[:, i]
+            points = np.stack((old, (old + step) % self.L), axis=1)
+            new_cell = 0
+            if not cells.enabled:
+                r2 = self._separations(i, None, points)
+            else:
+                new_cell = cells.cell(points[:, 1])
+                if new_cell == cells.cell_of[i]:
+                    r2 = self._separations(i, cells.candidates(new_cell), points)
+                else:
+                    r2 = [self._separations(i, cells.candidates(c), points[:, k:k + 1])[0]
+                          for k, c in enumerate((cells.cell_of[i], new_cell))]
+            inv = [1 / (r ** 3 + a) for r in r2]
+            u = [4 * self.lam * (x * x - x).sum() for x in inv]
+            if u[1] - u[0] < threshold:
+                w, dudl = [], []
+                for r in r2:
+                    near = np.isfinite(r)
+                    _, w_, dudl_ = _pair(r[near], self.lam)
+                    w.append(w_.sum())
+                    dudl.append(dudl_.sum())
+                self.xyz[:, i] = points[:, 1]
+                cells.move(i, new_cell)
+                self.U += u[1] - u[0]
+                self.W += w[1] - w[0]
+                self.dUdl += dudl[1] - dudl[0]
+                accepted += 1
+        return accepted
+
+    def recompute(self):
+        """Refresh the running sums, which drift by rounding over many moves."""
+        self.U, self.W, self.dUdl, _ = self.forces(need_forces=False)
+
+
+def _blocks(samples):
+    """Mean and standard error from ``BLOCKS`` block averages."""
+    samples = np.asarray(samples, dtype=float)
+    n = len(samples) // BLOCKS * BLOCKS
+    if n < BLOCKS:
+        return float(samples.mean()), float('nan')
+    means = samples[-n:].reshape(BLOCKS, -1).mean(axis=1)
+    return float(samples.mean()), float(means.std(ddof=1) / math.sqrt(BLOCKS))
+
+
+def _log_mean_exp(x):
+    top = np.max(x)
+    return float(top + np.log(np.mean(np.exp(x - top))))
+
+
+def _check(name, value, kind=float):
+    lo, hi = LIMITS[name]
+    value = kind(value)
+    if not lo <= value <= hi:
+        raise ValueError(f'{name} must be between {lo} and {hi}')
+    return value
+
+
+def _check_work(work, limit, what):
+    if work > limit:
+        raise ValueError(f'{what} come to {work:,}, more than the {limit:,} one run may take')
+
+
+def _run_mc(box, T, sweeps, equilibration, insertions, progress, offset=0.0, scale=1.0):
+    """Equilibrate (tuning the step size), then sample every sweep."""
+    delta = 0.3
+    total = equilibration + sweeps
+    U, P, dUdl, widom = [], [], [], []
+    accepted = 0
+    for n in range(total):
+        rate = box.sweep(T, delta) / box.N
+        if n < equilibration:
+            delta = float(np.clip(delta * (1 + (rate - 0.4)), 0.02, box.L / 2))
+        else:
+            accepted += rate
+            if (n - equilibration) % 50 == 49:
+                box.recompute()
+            U.append(box.U / box.N + box.u_tail * box.lam)
+            P.append(box.pressure(box.W, T))
+            dUdl.append(box.dUdl / box.N + box.u_tail)
+            if insertions:
+                points = box.rng.random((insertions, 3)) * box.L
+                widom.append(-box.insertion_energy(points) / T)
+        if progress is not None:
+            progress(offset + scale * (n + 1) / total)
+    return U, P, dUdl, widom, accepted / sweeps, delta
+
+
+def monte_carlo(N=256, density=0.5, T=1.5, sweeps=2000, equilibration=500, insertions=0,
+                seed=None, progress=None):
+    """NVT Metropolis Monte Carlo of the LJ fluid.
+
+    Returns per-particle energy ``U`` (with tail correction), pressure
+    ``P``, each with its standard error, the acceptance rate and tuned
+    ``max_displacement``, and per-sweep ``U_series``/``P_series``.  With
+    ``insertions`` > 0 that many Widom test particles are inserted after
+    every sweep and ``mu_ex``, the excess chemical potential
+    −T ln⟨exp(−ΔU/T)⟩ (plus its tail correction), is returned too.
+    """
+    N = _check('N', N, int)
+    density, T = _check('density', density), _check('T', T)
+    sweeps = _check('sweeps', sweeps, int)
+    equilibration = _check('equilibration', equilibration, int)
+    insertions = int(insertions)
+    if not 0 <= insertions <= 10000:
+        raise ValueError('insertions must be between 0 and 10000')
+    _check_work((equilibration + sweeps) * N, MAX_MOVES, '(equilibration + sweeps) × N moves')
+
+    box = LJBox(N, density, np.random.default_rng(seed))
+    U, P, _, widom, acceptance, delta = _run_mc(box, T, sweeps, equilibration, insertions,
+                                                progress)
+    result = {'N': N, 'density': density, 'T': T, 'box': box.L, 'sweeps': sweeps,
+              'acceptance': acceptance, 'max_displacement': delta,
+              'U_series': U, 'P_series': P}
+    result['U'], result['U_error'] = _blocks(U)
+    result['P'], result['P_error'] = _blocks(P)
+    if insertions:
+        # −T ln⟨e^{−ΔU/T}⟩ per sweep block, accumulated as log-mean-exp.
+        per_sweep = [_log_mean_exp(x) for x in widom]
+        mu = [-T * x for x in per_sweep]
+        result['mu_ex'] = -T * _log_mean_exp(np.concatenate(widom)) + 2 * box.u_tail
+        result['mu_ex_error'] = _blocks(mu)[1]
+    return result
+
+
+def langevin(N=256, density=0.5, T=1.5, steps=5000, dt=0.005, friction=1.0,
+             sample_every=10, equilibration=1000, seed=None, progress=None):
+    """Langevin dynamics of the LJ fluid with the BAOAB integrator.
+
+    B: half kick, A: half drift, O: exact Ornstein–Uhlenbeck velocity
+    update, A, B.  The first ``equilibration`` steps relax the lattice start
+    and are discarded; over the next ``steps`` it returns the average
+    kinetic temperature ``T_kin`` (should match ``T``), per-particle energy
+    ``U``, pressure ``P``, the diffusion coefficient ``D`` from the
+    mean-squared displacement, and the sampled ``t``/``msd``/``T_series``.
+    """
+    N = _check('N', N, int)
+    density, T = _check('density', density), _check('T', T)
+    steps = _check('steps', steps, int)
+    equilibration = _check('equilibration', equilibration, int)
+    _check_work((equilibration + steps) * N, MAX_PARTICLE_STEPS,
+                '(equilibration + steps) × N particle steps')
+    dt, friction, sample_every = float(dt), float(friction), int(sample_every)
+    if not 0 < dt <= 0.02 or friction < 0 or sample_every < 1:
+        raise ValueError('dt must be in (0, 0.02], friction >= 0 and sample_every >= 1')
+
+    rng = np.random.default_rng(seed)
+    box = LJBox(N, density, rng)
+    v = rng.normal(0.0, math.sqrt(T), (N, 3))
+    v -= v.mean(axis=0)
+    c1 = math.exp(-friction * dt)
+    c2 = math.sqrt((1 - c1 * c1) * T)
+    _, W, _, F = box.forces()
+    unwrapped = box.pos.copy()
+    start = unwrapped.copy()
+    total = equilibration + steps
+    t, msd, T_kin, U, P = [], [], [], [], []
+    for n in range(1, total + 1):
+        v += 0.5 * dt * F
+        drift = 0.5 * dt * v
+        v = c1 * v + c2 * rng.standard_normal((N, 3))
+        drift += 0.5 * dt * v
+        box.pos[:] = (box.pos + drift) % box.L
+        unwrapped += drift
+        U_total, W, _, F = box.forces()
+        v += 0.5 * dt * F
+        if n == equilibration:
+            start = unwrapped.copy()  # the MSD origin, past the transient
+        elif n > equilibration and (n - equilibration) % sample_every == 0:
+            kinetic = float((v * v).sum() / (3 * N))
+            t.append((n - equilibration) * dt)
+            msd.append(float(((unwrapped - start) ** 2).sum() / N))
+            T_kin.append(kinetic)
+            U.append(U_total / N + box.u_tail)
+            P.append(box.pressure(W, kinetic))
+        if progress is not None and n % 10 == 0:
+            progress(n / total)
+
+    result = {'N': N, 'density': density, 'T': T, 'box': box.L, 'steps': steps,
+              'equilibration': equilibration, 'dt': dt,
+              't': t, 'msd': msd, 'T_series': T_kin}
+    result['T_kin'], result['T_kin_error'] = _blocks(T_kin)
+    result['U'], result['U_error'] = _blocks(U)
+    result['P'], result['P_error'] = _blocks(P)
+    # Einstein relation on the second half, past the ballistic regime.
+    half = len(t) // 2
+    result['D'] = (float(np.polyfit(t[half:], msd[half:], 1)[0] / 6)
+                   if len(t) - half >= 2 else float('nan'))
+    return result
+
+
+def thermodynamic_integration(N=128, density=0.5, T=1.5, windows=8, sweeps=1000,
+                              equilibration=200, seed=None, progress=None):
+    """Excess Helmholtz energy per particle by thermodynamic integration.
+
+    The interactions are switched on along the soft-core path λ = 0 → 1
+    and F_ex/N = ∫ ⟨∂U/∂λ⟩_λ dλ / N is evaluated with Gauss–Legendre
+    quadrature on ``windows`` λ values, each an independent NVT run.
+    Returns ``F_ex`` with its error and the per-window ``lambdas``,
+    ``dUdl`` and ``dUdl_error``.
+    """
+    N = _check('N', N, int)
+    density, T = _check('density', density), _check('T', T)
+    windows, sweeps = _check('windows', windows, int), _check('sweeps', sweeps, int)
+    equilibration = _check('equilibration', equilibration, int)
+    _check_work(windows * (equilibration + sweeps) * N, MAX_MOVES,
+                'windows × (equilibration + sweeps) × N moves')
+
+    nodes, weights = np.polynomial.legendre.leggauss(windows)
+    lambdas, weights = (nodes + 1) / 2, weights / 2
+    rng = np.random.default_rng(seed)
+    means, errors = [], []
+    for k, lam in enumerate(lambdas):
+        box = LJBox(N, density, rng, lam=float(lam))
+        _, _, dUdl, _, _, _ = _run_mc(box, T, sweeps, equilibration, 0, progress,
+                                      offset=k / windows, scale=1 / windows)
+        mean, error = _blocks(dUdl)
+        means.append(mean)
+        errors.append(error)
+    return {
+        'N': N, 'density': density, 'T': T, 'windows': windows, 'sweeps': sweeps,
+        'lambdas': lambdas.tolist(), 'dUdl': means, 'dUdl_error': errors,
+        'F_ex': float(np.dot(weights, means)),
+        'F_ex_error': float(np.sqrt(np.dot(weights ** 2, np.square(errors)))),
+    }
+
+
+SIMULATIONS = {
+    'monte_carlo': monte_carlo,
+    'langevin': langevin,
+    'thermodynamic_integration': thermodynamic_integration,
+}
@@ -0,0 +1,87 @@
+"""Canonical partition functions of arbitrary energy spectra, vectorized.
+
+``thermodynamics()`` takes a spectrum of energy levels ``E`` (last axis,
+any number of levels) with degeneracies ``g`` and temperatures ``T``, and
+returns per particle
+
+* ``Z`` and ``ln_Z`` – Z = Σ g·exp(−E / kT)
+* ``U``              – mean energy
+* ``S``              – entropy, k(ln Z + U / kT)
+* ``F``              – Helmholtz free energy, −kT ln Z
+* ``Cv``             – heat capacity, (⟨E²⟩ − ⟨E⟩²) / kT²
+
+The leading axes of ``E`` and ``g`` broadcast against ``T``, so one
+spectrum over a temperature array is a whole heat-capacity curve, and
+spectra of shape ``(S, 1, L)`` with ``T`` of shape ``(M,)`` give an
+``(S, M)`` grid.
+
+Energies are measured from each spectrum's lowest populated level before
+exponentiating (log-sum-exp), so every Boltzmann factor is at most ``g``
+and the sum at least the ground degeneracy: nothing overflows however
+large E / kT gets, and ln Z stays exact where Z itself does not fit a
+float.  The variance behind Cv is taken about the mean rather than as
+⟨E²⟩ − ⟨E⟩², which would cancel catastrophically at low temperature.
+"""
+import numpy as np
+
+from constants import KB
+
+# Boltzmann factors evaluated at once; bounds the memory of large grids.
+CHUNK = 1 << 22
+
+
+def thermodynamics(E, T, g=None, chunk=CHUNK):
+    """Z, ln Z, U, S, F and Cv of the spectra ``E`` [J] at temperatures ``T`` [K].
+
+    ``E`` has the levels on its last axis, ``g`` (default 1) broadcasts
+    against it, and the remaining axes broadcast against ``T``.  Returns a
+    dict of arrays of the broadcast shape, in J and J/K per particle.
+    """
+    E = np.asarray(E, dtype=float)
+    if E.ndim == 0:
+        E = E[None]
+    g = np.broadcast_to(np.ones(1) if g is None else np.asarray(g, dtype=float), E.shape)
+    T = np.asarray(T, dtype=float)
+    if not (np.isfinite(E).all() and np.isfinite(g).all() and np.isfinite(T).all()):
+        raise ValueError('inputs must be finite')
+    if (g < 0).any() or not (g > 0).any(axis=-1).all():
+        raise ValueError('degeneracies must be >= 0 with at least one populated level')
+    if (T <= 0).any():
+        raise ValueError('temperatures must be > 0')
+
+    E0 = np.min(np.where(g > 0, E, np.inf), axis=-1)
+    levels = E.shape[-1]
+    shape = np.broadcast_shapes(E.shape[:-1], T.shape)
+    grid = shape or (1,)
+    eps = np.broadcast_to(E - E0[..., None], grid + (levels,))
+    g = np.broadcast_to(g, grid + (levels,))
+    E0 = np.broadcast_to(E0, grid).ravel()
+    beta = np.broadcast_to(1 / (KB * T), grid).ravel()
+
+    size = beta.size
+    ln_sum, mean, var = (np.empty(size) for _ in range(3))
+    step = max(1, chunk // max(levels, 1))
+    for start in range(0, size, step):
+        # Gather only this chunk's rows of the (broadcast, uncopied) spectra.
+        rows = np.unravel_index(np.arange(start, min(start + step, size)), grid)
+        e, b = eps[rows], beta[start:start + step, None]
+        w = g[rows] * np.exp(-b * e)
+        total = w.sum(axis=-1)
+        m = (w * e).sum(axis=-1) / total
+        var[start:start + step] = (w * (e - m[:, None]) ** 2).sum(axis=-1) / total
+        mean[start:start + step] = m
+        ln_sum[start:start + step] = np.log(total)
+
+    ln_Z = ln_sum - beta * E0
+    U = E0 + mean
+    with np.errstate(over='ignore'):
+        Z = np.exp(ln_Z)
+    result = {
+        'ln_Z': ln_Z,
+        'Z': Z,
+        'U': U,
+        'S': KB * (ln_sum + beta * mean),
+        'F': -ln_Z / beta,
+        'Cv': KB * beta ** 2 * var,
+    }
+    return {key: value.reshape(shape) for key, value in result.items()}
@@ -0,0 +1,132 @@
+"""Plot series cut down to a point budget and packed compactly for Plotly.
+
+A screen a few hundred pixels wide cannot show more than a few points per
+pixel, so long curves are decimated before they are embedded in a page or
+returned by the API:
+
+* ``lttb()``    – Largest-Triangle-Three-Buckets: splits the points into
+  equal buckets and keeps from each the one spanning the largest triangle
+  with its neighbours' picks, which keeps the visual shape of any ordered
+  curve (also parametric ones, like a trajectory)
+* ``min_max()`` – keeps the lowest and highest point of every bucket, so
+  no peak of a noisy or oscillating time series is lost
+
+Both always keep the first and last point and return indices, so every
+column of a series (t, x, v, ...) is cut at the same points, and batches
+(``(..., samples)`` arrays) are decimated row by row to the same length.
+
+``encode()`` packs an array as Plotly's typed-array object
+``{'dtype': 'f4', 'bdata': <base64>}``, which plotly.js ≥ 2.28 takes
+anywhere it takes a list of numbers: float32 is 4 bytes a point (5.3 in
+base64) against 18 or so for a float written out in JSON, and NaN and ±inf
+survive as themselves.
+"""
+import base64
+
+import numpy as np
+
+DTYPES = {'f4': '<f4', 'f8': '<f8'}
+
+
+def lttb(x, y, n):
+    """Indices of the ``n`` points LTTB keeps of the curve ``(x, y)``, along
+    the last axis; all of them if there are no more than ``n``."""
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+    shape, size = y.shape, y.shape[-1]
+    if size <= n:
+        return np.broadcast_to(np.arange(size), shape)
+    if n < 3:
+        raise ValueError('the point budget must be at least 3')
+    x, y = x.reshape(-1, size), y.reshape(-1, size)
+    rows = np.arange(len(y))
+
+    # n - 2 buckets over the inner points; the last one's neighbour is the end point.
+    ends = np.append(np.linspace(1, size - 1, n - 1).astype(int), size)
+    # Centroid of each bucket's right-hand neighbour, all at once.
+    counts = np.diff(ends)[1:]
+    cx = np.add.reduceat(x, ends[1:-1], axis=-1) / counts
+    cy = np.add.reduceat(y, ends[1:-1], axis=-1) / counts
+    picked = np.empty((len(y), n), dtype=np.intp)
+    picked[:, 0], picked[:, -1] = 0, size - 1
+    ax, ay = x[:, 0], y[:, 0]
+    for i in range(n - 2):
+        lo, hi = ends[i], ends[i + 1]
+        # Twice the area of the triangle (a, b, c) for every candidate b;
+        # fmax turns NaN (gaps in the curve) into -1 so they are never picked.
+        area = np.fmax(np.abs((ax - cx[:, i])[:, None] * (y[:, lo:hi] - ay[:, None])
+                              - (ax[:, None] - x[:, lo:hi]) * (cy[:, i] - ay)[:, None]), -1)
+        j = lo + area.argmax(axis=-1)
+        picked[:, i + 1] = j
+        ax, ay = x[rows, j], y[rows, j]
+    return picked.reshape(shape[:-1] + (n,))
+
+
+def min_max(y, n):
+    """Indices of the lowest and highest point of ``(n - 2) // 2`` buckets,
+    in order, between the first and last point; all if there are no more
+    than ``n``."""
+    y = np.asarray(y, dtype=float)
+    size = y.shape[-1]
+    if size <= n:
+        return np.broadcast_to(np.arange(size), y.shape)
+    if n < 4:
+        raise ValueError('the point budget must be at least 4')
+
+    buckets = (n - 2) // 2
+    width = -(-(size - 2) // buckets)
+    # Pad the inner points to whole buckets by repeating the last of them.
+    inner = np.pad(y[..., 1:-1], [(0, 0)] * (y.ndim - 1) + [(0, buckets * width - size + 2)],
+                   mode='edge').reshape(y.shape[:-1] + (buckets, width))
+    offsets = 1 + width * np.arange(buckets)
+    pair = np.sort(np.stack((np.nanargmin(inner, axis=-1), np.nanargmax(inner, axis=-1)),
+                            axis=-1), axis=-1)
+    inner_picks = np.minimum(offsets[:, None] + pair, size - 2).reshape(y.shape[:-1] + (-1,))
+    first = np.zeros(y.shape[:-1] + (1,), dtype=np.intp)
+    return np.concatenate((first, inner_picks, first + size - 1), axis=-1)
+
+
+METHODS = ('lttb', 'minmax')
+
+
+def decimate(series, budget, x, y, method='lttb'):
+    """Copy of the dict ``series`` with the curve ``(series[x], series[y])``
+    cut to at most ``budget`` points (no cut if ``budget`` is None).
+
+    Every value shaped like ``series[y]``, and ``series[x]`` itself, is cut
+    at the same indices; a shared 1-D ``x`` then takes the batch shape of
+    ``y``.  Other values (per-curve scalars) are left alone."""
+    if method not in METHODS:
+        raise ValueError(f"decimation must be one of {', '.join(METHODS)}")
+    shape = np.shape(series[y])
+    if budget is None or not shape or shape[-1] <= budget:
+        return dict(series)
+    if method == 'lttb':
+        picked = lttb(series[x], series[y], budget)
+    else:
+        picked = min_max(series[y], budget)
+    out = dict(series)
+    for key, value in series.items():
+        if key == x or np.shape(value) == shape:
+            out[key] = np.take_along_axis(np.broadcast_to(value, shape), picked, axis=-1)
+    return out
+
+
+def encode(values, dtype='f4'):
+    """Plotly's typed-array object for the float array ``values``, with the
+    shape as ``'rows, columns'`` for more than one dimension."""
+    if dtype not in DTYPES:
+        raise ValueError(f"encoding must be one of json, {', '.join(DTYPES)}")
+    values = np.ascontiguousarray(values, dtype=DTYPES[dtype])
+    packed = {'dtype': dtype, 'bdata': base64.b64encode(values.tobytes()).decode('ascii')}
+    if values.ndim > 1:
+        packed['shape'] = ', '.join(map(str, values.shape))
+    return packed
+
+
+def pack(series, budget, x, y, method='lttb', dtype='f4'):
+    """``decimate()`` then ``encode()`` every float array of ``series``."""
+    out = decimate(series, budget, x, y, method)
+    for key, value in out.items():
+        if isinstance(value, np.ndarray) and value.ndim and value.dtype.kind == 'f':
+            out[key] = encode(value, dtype)
+    return out
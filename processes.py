@@ -0,0 +1,86 @@
+"""P–V curves of the four textbook processes of an ideal gas.
+
+``process_curve()`` returns the whole curve as NumPy arrays at any
+resolution, together with the work done and the final pressure.
+``iter_process_chunks()`` produces the same points chunk by chunk, so a curve
+of millions of points can be streamed with memory bounded by the chunk size.
+"""
+import math
+
+import numpy as np
+
+PROCESSES = ('isothermal', 'adiabatic', 'isobaric', 'isochoric')
+
+
+def _validate(process, P1, V1, V2, gamma, P, resolution):
+    if process not in PROCESSES:
+        raise ValueError(f"process must be one of {', '.join(PROCESSES)}")
+    if resolution < 2:
+        raise ValueError('resolution must be at least 2')
+    if process in ('isothermal', 'adiabatic') and (V1 <= 0 or V2 <= 0):
+        raise ValueError('V₁ and V₂ must be positive')
+    if process == 'adiabatic' and gamma == 1:
+        raise ValueError('γ must not be 1 for an adiabatic process')
+    if not all(math.isfinite(x) for x in (P1, V1, V2, gamma, P)):
+        raise ValueError('inputs must be finite')
+    if process == 'isobaric' and P <= 0:
+        raise ValueError('P must be positive')
+    if process != 'isobaric' and P1 <= 0:
+        raise ValueError('P₁ must be positive')
+
+
+def _endpoints(process, P1, V1, V2, P):
+    """(start, stop) of the swept variable: volume, or pressure if isochoric."""
+    if process == 'isochoric':
+        return P1, P1 * 1.5
+    return V1, V2
+
+
+def process_points(process, P1, V1, gamma, P, x):
+    """Volumes and pressures for the swept volumes ``x`` (pressures if isochoric)."""
+    if process == 'isothermal':
+        return x, (P1 * V1) / x
+    if process == 'adiabatic':
+        return x, (P1 * V1 ** gamma) / x ** gamma
+    if process == 'isobaric':
+        return x, np.full_like(x, P)
+    return np.full_like(x, V1), x
+
+
+def process_work(process, P1, V1, V2, gamma=1.4, P=0.0):
+    """Work done by the gas and the final pressure (None unless adiabatic)."""
+    if process == 'isothermal':
+        return P1 * V1 * math.log(V2 / V1), None
+    if process == 'adiabatic':
+        P2 = P1 * V1 ** gamma / V2 ** gamma
+        return (P1 * V1 - P2 * V2) / (gamma - 1), P2
+    if process == 'isobaric':
+        return P * (V2 - V1), None
+    return 0.0, None
+
+
+def process_curve(process, P1=0.0, V1=0.0, V2=0.0, gamma=1.4, P=0.0, resolution=50):
+    """Return ``{'V', 'P', 'W', 'P2'}`` with ``resolution`` points on the curve."""
+    _validate(process, P1, V1, V2, gamma, P, resolution)
+    x = np.linspace(*_endpoints(process, P1, V1, V2, P), resolution)
+    V, pressure = process_points(process, P1, V1, gamma, P, x)
+    W, P2 = process_work(process, P1, V1, V2, gamma, P)
+    return {'V': V, 'P': pressure, 'W': W, 'P2': P2}
+
+
+def iter_process_chunks(process, P1=0.0, V1=0.0, V2=0.0, gamma=1.4, P=0.0,
+                        resolution=50, chunk_size=65536):
+    """Return an iterator of ``(V, P)`` array pairs covering the same points as
+    ``process_curve``.  The inputs are validated before it is returned."""
+    _validate(process, P1, V1, V2, gamma, P, resolution)
+    start, stop = _endpoints(process, P1, V1, V2, P)
+    step = (stop - start) / (resolution - 1)
+
+    def chunks():
+        for first in range(0, resolution, chunk_size):
+            index = np.arange(first, min(first + chunk_size, resolution), dtype=float)
+            x = start + index * step
+            if first + len(index) == resolution:
+                x[-1] = stop  # same as np.linspace: hit the end point exactly
+            yield process_points(process, P1, V1, gamma, P, x)
+    return chunks()
@@ -0,0 +1,177 @@
+"""Exchange-rate provider for the currency converter.
+
+Rates come from a pluggable backend (the exchangerate-api HTTP service or a
+local JSON file) and are kept in an in-process TTL cache keyed by base
+currency.  Cross rates are derived from the cached reference table, so most
+conversions never touch the network, and a daemon thread keeps the reference
+table fresh in the background.
+"""
+import json
+import os
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# ISO 4217 currency codes; anything else is refused before it reaches a URL.
+CURRENCY_CODE = re.compile(r'[A-Z]{3}')
+
+
+class RateError(Exception):
+    """No usable rate for the requested currencies."""
+
+
+class HttpRateBackend:
+    url = 'https://api.exchangerate-api.com/v4/latest/{base}'
+
+    def __init__(self, timeout=(3.05, 5), pool_size=10, retries=2, on_request=None):
+        self.timeout = timeout
+        self.on_request = on_request  # called with the seconds each fetch took
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=retries, backoff_factor=0.3,
+                              status_forcelist=(429, 500, 502, 503, 504)),
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def fetch(self, base):
+        start = time.perf_counter()
+        try:
+            response = self.session.get(self.url.format(base=base), timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()['rates']
+        except (requests.RequestException, ValueError, KeyError) as e:
+            raise RateError(f'Rate lookup for {base} failed: {e}') from e
+        finally:
+            if self.on_request is not None:
+                self.on_request(time.perf_counter() - start)
+
+
+class FileRateBackend:
+    """Serves rates from a JSON file shaped like the HTTP API response."""
+
+    def __init__(self, path):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        self.base = data['base']
+        self.table = data['rates']
+
+    def fetch(self, base):
+        if base not in self.table:
+            raise RateError(f'Unknown currency {base}')
+        scale = self.table[base]
+        return {code: rate / scale for code, rate in self.table.items()}
+
+
+class RateProvider:
+    def __init__(self, backend, reference='USD', ttl=3600, max_stale=86400,
+                 min_fetch_interval=30, refresh_interval=None):
+        self.backend = backend
+        self.reference = reference
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.min_fetch_interval = min_fetch_interval
+        self.refresh_interval = refresh_interval
+        self._cache = {}          # base -> (fetched_at, rates)
+        self._last_attempt = {}   # base -> monotonic time of last upstream call
+        self._lock = threading.Lock()
+        self._fetch_locks = {}
+        self._refresher_pid = None
+
+    def rate(self, from_currency, to_currency):
+        if from_currency == to_currency:
+            return 1.0
+        self._ensure_refresher()
+
+        cached = self._fresh(from_currency)
+        if cached is not None and to_currency in cached:
+            return cached[to_currency]
+
+        # Codes come from users: only those in the reference table are looked
+        # up, so made-up ones never grow the caches or reach the upstream API.
+        table = self.rates(self.reference)
+        for code in (from_currency, to_currency):
+            if code not in table:
+                raise RateError(f'Unknown currency {code}')
+        return table[to_currency] / table[from_currency]
+
+    def convert(self, amount, from_currency, to_currency):
+        return amount * self.rate(from_currency, to_currency)
+
+    def rates(self, base, force=False):
+        if not isinstance(base, str) or not CURRENCY_CODE.fullmatch(base):
+            raise RateError(f'Invalid currency code {base!r}')
+        table = None if force else self._fresh(base)
+        if table is not None:
+            return table
+
+        with self._fetch_lock(base):
+            now = time.monotonic()
+            if not force:
+                # Another thread may have refreshed it while we waited.
+                table = self._fresh(base)
+                if table is not None:
+                    return table
+                last = self._last_attempt.get(base)
+                if last is not None and now - last < self.min_fetch_interval:
+                    return self._stale(base)
+            self._last_attempt[base] = now
+            try:
+                table = self.backend.fetch(base)
+            except RateError:
+                return self._stale(base)
+            self._cache[base] = (now, table)
+            return table
+
+    def refresh(self):
+        return self.rates(self.reference, force=True)
+
+    def _fresh(self, base):
+        entry = self._cache.get(base)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+        return None
+
+    def _stale(self, base):
+        # Upstream is rate limited or failing: fall back to an older table.
+        entry = self._cache.get(base)
+        if entry is not None and time.monotonic() - entry[0] < self.max_stale:
+            return entry[1]
+        raise RateError(f'No exchange rates available for {base}')
+
+    def _fetch_lock(self, base):
+        with self._lock:
+            return self._fetch_locks.setdefault(base, threading.Lock())
+
+    def _ensure_refresher(self):
+        # Threads do not survive fork, so each worker starts its own.
+        if not self.refresh_interval or self._refresher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._refresher_pid == os.getpid():
+                return
+            self._refresher_pid = os.getpid()
+        threading.Thread(target=self._refresh_loop, name='rate-refresher', daemon=True).start()
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            try:
+                self.refresh()
+            except RateError:
+                pass
+
+
+def provider_from_env():
+    path = os.getenv('RATES_FILE')
+    if path:
+        backend = FileRateBackend(path)
+        return RateProvider(backend, reference=backend.base, ttl=float('inf'))
+    ttl = float(os.getenv('RATES_TTL', 3600))
+    return RateProvider(HttpRateBackend(), ttl=ttl, refresh_interval=ttl * 0.9)
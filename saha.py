@@ -0,0 +1,173 @@
+"""Saha ionization equilibrium of a gas mixture, vectorized over (T, n) grids.
+
+For every pair of neighbouring ionization stages i → i + 1 of an element
+
+    n_{i+1} n_e / n_i = 2 (U_{i+1} / U_i) (2π m_e kT / h²)^{3/2} exp(−χ_i / kT)
+
+with χ_i the ionization energy and U the partition functions, here the
+statistical weights of the ground states.  The free electrons come from the
+gas itself, so n_e is closed by charge neutrality:
+
+    n_e = n · Σ_elements abundance · (mean charge of the element)
+
+``ionize()`` solves that closure for every cell of a temperature / density
+grid at once.  The mean charge falls as n_e rises, so the closure has one
+root; it is bracketed and found by safeguarded Newton on ln n_e (the
+slope is analytic: one plus the variance of the charge over the mean
+charge), with all ratios kept as
+logarithms, so cool dense cells (n_e ~ 10⁻³⁰⁰ n) and fully ionized hot ones
+are handled alike.
+"""
+import numpy as np
+
+from constants import EV, H, KB, ME
+
+# Ionization energies χ_i [eV] and ground-state statistical weights g_0 … g_Z.
+ELEMENTS = {
+    'H': ((13.598,), (2, 1)),
+    'He': ((24.587, 54.418), (1, 2, 1)),
+    'Na': ((5.139,), (2, 1)),
+    'Ca': ((6.113, 11.872), (1, 2, 1)),
+    'Fe': ((7.902, 16.188), (9, 10, 9)),
+}
+
+# Number abundances relative to all nuclei, roughly solar.
+SOLAR = {'H': 0.9207, 'He': 0.0784, 'Fe': 2.9e-5, 'Ca': 2.0e-6, 'Na': 1.6e-6}
+
+# Named mixtures accepted wherever an element name is.
+MIXTURES = {'solar': SOLAR}
+
+ITERATIONS = 64
+TOLERANCE = 1e-12  # on ln n_e
+
+
+def thermal_density(T):
+    """(2π m_e kT / h²)^{3/2} [1/m³], the electron quantum concentration."""
+    return (2 * np.pi * ME * KB * T / H ** 2) ** 1.5
+
+
+def _species(elements, chi, g):
+    """``[(abundance, chi, g), ...]`` from element names or one explicit ladder."""
+    if chi is not None:
+        chi = np.atleast_1d(np.asarray(chi, dtype=float))
+        g = np.ones(chi.size + 1) if g is None else np.asarray(g, dtype=float)
+        if chi.ndim != 1 or g.shape != (chi.size + 1,):
+            raise ValueError('give one ionization energy per stage and one more weight')
+        if (chi <= 0).any() or (g <= 0).any():
+            raise ValueError('ionization energies and weights must be > 0')
+        return [(1.0, chi, g)]
+    if isinstance(elements, str):
+        elements = MIXTURES.get(elements, {elements: 1.0})
+    if not isinstance(elements, dict) or not all(
+            isinstance(name, str) and isinstance(abundance, (int, float))
+            and not isinstance(abundance, bool) for name, abundance in elements.items()):
+        raise TypeError('elements must be an element or mixture name, or {element: abundance}')
+    unknown = set(elements) - set(ELEMENTS)
+    if unknown:
+        raise ValueError(f"elements must be among {', '.join(ELEMENTS)}")
+    total = sum(elements.values())
+    if not elements or total <= 0 or min(elements.values()) < 0:
+        raise ValueError('abundances must be >= 0 and not all zero')
+    return [(abundance / total, np.asarray(ELEMENTS[name][0]), np.asarray(ELEMENTS[name][1], float))
+            for name, abundance in elements.items()]
+
+
+def _log_fractions(ln_S, ln_ne):
+    """ln of the stage fractions for the Saha factors ``ln_S`` (``(..., Z)``)."""
+    steps = ln_S - ln_ne[..., None]
+    ln_pop = np.concatenate((np.zeros(steps.shape[:-1] + (1,)), np.cumsum(steps, axis=-1)),
+                            axis=-1)
+    top = ln_pop.max(axis=-1, keepdims=True)
+    return ln_pop - top - np.log(np.exp(ln_pop - top).sum(axis=-1, keepdims=True))
+
+
+def ionize(T, n, elements='H', chi=None, g=None):
+    """Ionization equilibrium at temperatures ``T`` [K] and nucleus densities ``n`` [1/m³].
+
+    The gas is an element of ``ELEMENTS``, a ``{element: abundance}``
+    mixture or a name from ``MIXTURES``, or one explicit ladder of
+    ionization energies ``chi`` [eV] with statistical weights ``g``.  ``T``
+    and ``n`` broadcast.  Returns ``n_e``, ``mean_charge`` (free electrons
+    per nucleus), ``neutral_fraction`` (of all nuclei) and, per element, its
+    stage fractions (``shape + (stages,)``) under ``fractions``.
+    """
+    species = _species(elements, chi, g)
+    T, n = np.broadcast_arrays(np.asarray(T, dtype=float), np.asarray(n, dtype=float))
+    if not (np.isfinite(T).all() and np.isfinite(n).all()):
+        raise ValueError('inputs must be finite')
+    if (T <= 0).any() or (n <= 0).any():
+        raise ValueError('temperatures and densities must be > 0')
+
+    shape = T.shape
+    T, ln_n = T.ravel(), np.log(n.ravel())
+    ln_Q = np.log(2 * thermal_density(T))
+    ln_S = [ln_Q[:, None] + np.log(g[1:] / g[:-1]) - chi * EV / (KB * T[:, None])
+            for _, chi, g in species]
+    charges = [np.arange(len(g)) for _, _, g in species]
+
+    def mean_charge(ln_ne, rows=slice(None)):
+        """Free electrons per nucleus and its derivative with respect to ln n_e."""
+        z_bar = slope = 0.0
+        for (a, _, _), s, z in zip(species, ln_S, charges):
+            f = np.exp(_log_fractions(s[rows], ln_ne))
+            mean = f @ z
+            z_bar = z_bar + a * mean
+            slope = slope - a * (f @ (z * z) - mean * mean)
+        return z_bar, slope
+
+    def excess(ln_ne, rows=slice(None)):
+        # Zero at the root; increasing in ln n_e, with slope 1 − z̄′/z̄ ≥ 1.
+        z_bar, slope = mean_charge(ln_ne, rows)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return ln_ne - ln_n[rows] - np.log(z_bar), 1 - slope / z_bar
+
+    # n_e can never exceed n·Z_max.  Below, it is at least the first-stage
+    # estimate √(n S₀) of the most easily ionized species, less a margin.
+    hi = ln_n + np.log(sum(a * z[-1] for (a, _, _), z in zip(species, charges)))
+    first = np.max([np.log(a) + s[:, 0] for (a, _, _), s in zip(species, ln_S) if a > 0],
+                   axis=0)
+    lo = np.minimum(0.5 * (ln_n + first), hi) - 10
+    for _ in range(ITERATIONS):
+        high = excess(lo)[0] > 0
+        if not high.any():
+            break
+        lo = np.where(high, lo - 2 * (hi - lo), lo)
+
+    # Newton from the upper end, bisecting whenever a step leaves the
+    # bracket; converged cells drop out of the iteration.
+    x = hi.copy()
+    active = np.arange(x.size)
+    for _ in range(ITERATIONS):
+        xa, la, ha = x[active], lo[active], hi[active]
+        F, dF = excess(xa, active)
+        la = np.where(F < 0, xa, la)
+        ha = np.where(F > 0, xa, ha)
+        with np.errstate(invalid='ignore'):
+            guess = xa - F / dF
+        inside = np.isfinite(guess) & (guess >= la) & (guess <= ha)
+        step = np.where(inside, guess, 0.5 * (la + ha)) - xa
+        x[active], lo[active], hi[active] = xa + step, la, ha
+        active = active[np.abs(step) >= TOLERANCE]
+        if not active.size:
+            break
+
+    ln_ne = x
+    if chi is not None:
+        names = ['custom']
+    else:
+        names = list(MIXTURES.get(elements, [elements]) if isinstance(elements, str) else elements)
+    fractions = [np.exp(_log_fractions(s, ln_ne)) for s in ln_S]
+    neutral = sum(a * f[:, 0] for (a, _, _), f in zip(species, fractions))
+    return {
+        'n_e': np.exp(ln_ne).reshape(shape),
+        'mean_charge': mean_charge(ln_ne)[0].reshape(shape),
+        'neutral_fraction': neutral.reshape(shape),
+        'fractions': {name: f.reshape(shape + f.shape[-1:]) for name, f in zip(names, fractions)},
+    }
+
+
+def ionization_map(T, n, elements='H', chi=None, g=None):
+    """``ionize()`` on the grid of every ``T`` with every ``n``: outputs are
+    ``(len(T), len(n))`` plus the stage axis."""
+    T, n = np.meshgrid(np.ravel(T), np.ravel(n), indexing='ij')
+    return ionize(T, n, elements, chi, g)
@@ -0,0 +1,31 @@
+/* Stand-in for Plotly on pages that plot.
+   The real bundle (data-plotly) is fetched the first time the page draws a
+   plot; until it has loaded, calls are queued and then replayed in order.
+   Like Plotly's own, every call returns a promise. */
+(function () {
+  var src = document.currentScript.getAttribute('data-plotly');
+  var loading = null;
+
+  function load() {
+    if (!loading) {
+      loading = new Promise(function (resolve, reject) {
+        var script = document.createElement('script');
+        script.src = src;
+        script.onload = function () { resolve(window.Plotly); };
+        script.onerror = function () { reject(new Error('Could not load ' + src)); };
+        document.head.appendChild(script);
+      });
+    }
+    return loading;
+  }
+
+  var standIn = {};
+  ['newPlot', 'react', 'restyle', 'relayout', 'update', 'purge', 'toImage', 'downloadImage']
+    .forEach(function (name) {
+      standIn[name] = function () {
+        var args = arguments;
+        return load().then(function (Plotly) { return Plotly[name].apply(Plotly, args); });
+      };
+    });
+  window.Plotly = standIn;
+})();
@@ -0,0 +1,261 @@
+"""Precomputed isotherm and saturation tables for the cubic equations of state.
+
+An offline build evaluates ``eos.py`` once on dense grids and writes one
+``.npy`` file per table plus an ``index.json``:
+
+    python tables.py --out data/tables
+
+Lookups memory-map those files, so every worker shares the same pages and a
+request only touches the grid cells it interpolates.  Tables are in reduced
+units (Tr = T/Tc, Pr = P/Pc, vr = v·Pc/(R·Tc)):
+
+* isotherms – y = Pr·(vr − br)/Tr on a uniform (Tr, ln(vr − br)) grid,
+  interpolated bilinearly.  y stays bounded where P diverges at v → b, and
+  P = y·Tr/(vr − br) keeps the van der Waals loops below Tc.
+* saturation – ln Pr and the liquid / vapour ln vr on a grid uniform in
+  1/Tr, interpolated linearly (exact for a Clausius–Clapeyron line).
+
+van der Waals and Redlich–Kwong reduce to one table for every fluid, so they
+also serve explicit van der Waals ``a``/``b``; Soave and Peng–Robinson
+depend on the acentric factor and get one table per gas in ``GASES``.
+
+Each table records the largest error found at the midpoints of its cells,
+where linear interpolation errs most: isotherm pressures are within
+``error_bound·(|P| + Pc)`` and saturation pressures within
+``error_bound·P_sat`` inside the tabulated range.  Outside it lookups
+return NaN.
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+from eos import EOS, GASES, R, solve
+
+# Reduced forms that do not depend on the acentric factor.
+UNIVERSAL = ('vdw', 'rk')
+
+# Compressibility at the critical point, i.e. the reduced critical volume.
+CRITICAL_Z = {'vdw': 3 / 8, 'rk': 1 / 3, 'srk': 1 / 3, 'pr': 0.3074}
+
+TR_RANGE = (0.45, 3.0)
+SATURATION_TR_RANGE = (0.45, 0.995)
+VOLUME_RANGE = (0.05, 100.0)  # (vr − br) / br at the dense end, vr − br at the other
+
+
+class TableError(Exception):
+    """A table that was not built."""
+
+
+def table_key(eos, gas=None):
+    return eos if eos in UNIVERSAL else f'{eos}-{gas}'
+
+
+def _axis(lo, hi, n):
+    return {'start': lo, 'stop': hi, 'count': n}
+
+
+def _grid(axis):
+    return np.linspace(axis['start'], axis['stop'], axis['count'])
+
+
+def _midpoints(values):
+    return 0.5 * (values[1:] + values[:-1])
+
+
+# ---------------- Build ----------------
+
+# solve() in reduced units: with Tc = 1/R and Pc = 1, P is Pr and v is vr.
+
+def _isotherm_y(eos, omega, Tr, x, br):
+    vr = br + np.exp(x)
+    P = solve(eos, V=vr, T=Tr / R, Tc=1 / R, Pc=1.0, omega=omega)['P']
+    return P * (vr - br) / Tr
+
+
+def _saturation(eos, omega, Tr, iterations=100):
+    """Reduced saturation pressure and coexisting volumes (equal fugacity)."""
+    # Safeguarded Newton on ln P: d(ln φ_v − ln φ_l)/d ln P = Z_v − Z_l > 0,
+    # falling back to bisection of the bracket that every iterate narrows.
+    ln_P = 5.373 * (1 + omega) * (1 - 1 / Tr)  # Wilson's estimate
+    lo, hi = np.full_like(Tr, -np.inf), np.zeros_like(Tr)
+    for _ in range(iterations):
+        liquid, vapor = (solve(eos, P=np.exp(ln_P), T=Tr / R, Tc=1 / R, Pc=1.0, omega=omega,
+                               phase=phase) for phase in ('liquid', 'vapor'))
+        residual = vapor['ln_phi'] - liquid['ln_phi']
+        dZ = vapor['Z'] - liquid['Z']
+        two_phase = dZ > 1e-9
+        # With a single root, a vapour-like volume means P is still too low.
+        too_high = np.where(two_phase, residual > 0, vapor['V'] < CRITICAL_Z[eos])
+        hi = np.where(too_high, np.minimum(hi, ln_P), hi)
+        lo = np.where(too_high, lo, np.maximum(lo, ln_P))
+        guess = np.where(two_phase, ln_P - residual / np.where(two_phase, dZ, 1),
+                         np.where(too_high, ln_P - 0.1, ln_P + 0.1))
+        done = two_phase & (np.abs(residual) < 1e-12)
+        if done.all():
+            break
+        inside = two_phase & (guess > lo) & (guess < hi)
+        bisect = np.where(np.isfinite(lo), 0.5 * (lo + hi), guess)
+        ln_P = np.where(done, ln_P, np.where(inside, guess, bisect))
+    return np.stack((ln_P, np.log(liquid['V']), np.log(vapor['V'])), axis=-1)
+
+
+def build_table(eos, omega, temperatures, volumes, saturation_points):
+    """Return the isotherm and saturation arrays and their index entry."""
+    br = EOS[eos].omega_b
+    Tr_axis = _axis(*TR_RANGE, temperatures)
+    x_axis = _axis(np.log(VOLUME_RANGE[0] * br), np.log(VOLUME_RANGE[1]), volumes)
+    inv_axis = _axis(1 / SATURATION_TR_RANGE[1], 1 / SATURATION_TR_RANGE[0], saturation_points)
+
+    Tr, x = _grid(Tr_axis), _grid(x_axis)
+    isotherms = _isotherm_y(eos, omega, Tr[:, None], x[None, :], br)
+    saturation = _saturation(eos, omega, 1 / _grid(inv_axis))
+
+    # Worst interpolation error, at the cell midpoints.
+    Tm, xm = _midpoints(Tr)[:, None], _midpoints(x)[None, :]
+    exact = _isotherm_y(eos, omega, Tm, xm, br)
+    guess = 0.25 * (isotherms[1:, 1:] + isotherms[1:, :-1]
+                    + isotherms[:-1, 1:] + isotherms[:-1, :-1])
+    scale = Tm / np.exp(xm)
+    isotherm_error = np.nanmax(np.abs(guess - exact) * scale / (np.abs(exact) * scale + 1))
+
+    exact = _saturation(eos, omega, 1 / _midpoints(_grid(inv_axis)))[:, 0]
+    saturation_error = np.max(np.abs(np.expm1(_midpoints(saturation[:, 0]) - exact)))
+
+    entry = {
+        'eos': eos,
+        'omega': omega,
+        'br': br,
+        'Tr': Tr_axis,
+        'x': x_axis,
+        'inverse_Tr': inv_axis,
+        'isotherm_error_bound': float(isotherm_error),
+        'saturation_error_bound': float(saturation_error),
+    }
+    return isotherms, saturation, entry
+
+
+def build(directory, eos_names=tuple(EOS), temperatures=256, volumes=512, saturation_points=256):
+    os.makedirs(directory, exist_ok=True)
+    index = {}
+    for eos in eos_names:
+        fluids = [(None, 0.0)] if eos in UNIVERSAL else [(gas, GASES[gas][2]) for gas in GASES]
+        for gas, omega in fluids:
+            key = table_key(eos, gas)
+            with np.errstate(all='ignore'):
+                isotherms, saturation, entry = build_table(eos, omega, temperatures, volumes,
+                                                           saturation_points)
+            np.save(os.path.join(directory, f'{key}.isotherms.npy'), isotherms)
+            np.save(os.path.join(directory, f'{key}.saturation.npy'), saturation)
+            index[key] = entry
+            print(f"{key:<12} isotherms ±{entry['isotherm_error_bound']:.1e}  "
+                  f"saturation ±{entry['saturation_error_bound']:.1e}")
+    with open(os.path.join(directory, 'index.json'), 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=1)
+    return index
+
+
+# ---------------- Lookup ----------------
+
+def locate(values, axis):
+    """Cell index and fraction along a uniform axis; NaN outside it."""
+    step = (axis['stop'] - axis['start']) / (axis['count'] - 1)
+    position = (values - axis['start']) / step
+    inside = (position >= 0) & (position <= axis['count'] - 1)
+    cell = np.clip(np.floor(np.where(inside, position, 0)), 0, axis['count'] - 2).astype(np.intp)
+    return cell, np.where(inside, position - cell, np.nan)
+
+
+class Tables:
+    """Interpolated lookups in the tables under ``directory``."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._index = None
+        self._arrays = {}
+
+    @property
+    def index(self):
+        if self._index is None:
+            try:
+                with open(os.path.join(self.directory, 'index.json'), encoding='utf-8') as f:
+                    self._index = json.load(f)
+            except FileNotFoundError:
+                raise TableError(f"No tables in {self.directory}; run 'python tables.py'") from None
+        return self._index
+
+    def _table(self, eos, gas, kind):
+        if eos not in EOS:
+            raise ValueError(f"eos must be one of {', '.join(EOS)}")
+        if eos not in UNIVERSAL and gas not in GASES:
+            raise ValueError(f"{EOS[eos].title} tables need a gas, one of {', '.join(GASES)}")
+        key = table_key(eos, gas)
+        entry = self.index.get(key)
+        if entry is None:
+            raise TableError(f"No '{key}' table in {self.directory}")
+        if (key, kind) not in self._arrays:
+            path = os.path.join(self.directory, f'{key}.{kind}.npy')
+            self._arrays[key, kind] = np.load(path, mmap_mode='r')
+        return entry, self._arrays[key, kind]
+
+    @staticmethod
+    def _critical(eos, gas, Tc, Pc, a, b):
+        if a is not None and b is not None:
+            if eos != 'vdw':
+                raise ValueError('a and b can only be given for van der Waals; use Tc and Pc')
+            a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+            return 8 * a / (27 * R * b), a / (27 * b * b)
+        if gas is not None:
+            if gas not in GASES:
+                raise ValueError(f"gas must be one of {', '.join(GASES)}")
+            return GASES[gas][:2]
+        if Tc is None or Pc is None:
+            raise ValueError('give a gas, Tc and Pc, or van der Waals a and b')
+        return np.asarray(Tc, dtype=float), np.asarray(Pc, dtype=float)
+
+    def isotherms(self, eos, T, V, n=1.0, gas=None, Tc=None, Pc=None, a=None, b=None):
+        """Pressure [Pa] at temperatures ``T`` and total volumes ``V`` of ``n`` mol."""
+        entry, table = self._table(eos, gas, 'isotherms')
+        Tc, Pc = self._critical(eos, gas, Tc, Pc, a, b)
+        with np.errstate(all='ignore'):
+            Tr = np.asarray(T, dtype=float) / Tc
+            gap = np.asarray(V, dtype=float) / n * Pc / (R * Tc) - entry['br']
+            i, s = locate(Tr, entry['Tr'])
+            j, t = locate(np.log(gap), entry['x'])
+            y = ((1 - s) * ((1 - t) * table[i, j] + t * table[i, j + 1])
+                 + s * ((1 - t) * table[i + 1, j] + t * table[i + 1, j + 1]))
+            P = y * Tr / gap * Pc
+        return {'P': P, 'error_bound': entry['isotherm_error_bound']}
+
+    def saturation(self, eos, T, gas=None, Tc=None, Pc=None, a=None, b=None):
+        """Saturation pressure [Pa] and coexisting molar volumes [m³/mol] at ``T``."""
+        entry, table = self._table(eos, gas, 'saturation')
+        Tc, Pc = self._critical(eos, gas, Tc, Pc, a, b)
+        with np.errstate(all='ignore'):
+            i, s = locate(Tc / np.asarray(T, dtype=float), entry['inverse_Tr'])
+            row = (1 - s)[..., None] * table[i] + s[..., None] * table[i + 1]
+            scale = R * np.asarray(Tc)[..., None] / np.asarray(Pc)[..., None]
+            volumes = np.exp(row[..., 1:]) * scale
+        return {
+            'P_sat': np.exp(row[..., 0]) * Pc,
+            'V_liquid': volumes[..., 0],
+            'V_vapor': volumes[..., 1],
+            'error_bound': entry['saturation_error_bound'],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the isotherm and saturation tables.')
+    parser.add_argument('--out', default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                      'data', 'tables'))
+    parser.add_argument('--eos', nargs='+', choices=tuple(EOS), default=tuple(EOS))
+    parser.add_argument('--temperatures', type=int, default=256, help='Tr grid points')
+    parser.add_argument('--volumes', type=int, default=512, help='volume grid points')
+    parser.add_argument('--saturation-points', type=int, default=256)
+    args = parser.parse_args()
+    build(args.out, args.eos, args.temperatures, args.volumes, args.saturation_points)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""Projectile trajectories for whole batches of launches at once.
+
+``trajectories()`` broadcasts speed, angle, launch height, gravity and drag
+coefficient against each other and returns every sampled path as NumPy
+arrays of shape ``batch_shape + (samples,)``.  Drag is one of:
+
+* ``'none'``      – closed form
+* ``'linear'``    – F = -k·m·v, closed form; ``drag_coefficient`` is k in 1/s
+* ``'quadratic'`` – F = -c·m·|v|·v, RK4; ``drag_coefficient`` is c in 1/m
+
+Each path is sampled uniformly in time from launch until the projectile is
+back at y = 0.
+"""
+import math
+
+import numpy as np
+
+DRAG_MODELS = ('none', 'linear', 'quadratic')
+
+
+def _vacuum_flight_time(vy0, height, g):
+    return (vy0 + np.sqrt(vy0 ** 2 + 2 * g * height)) / g
+
+
+def _vacuum(vx0, vy0, height, g, k, frac):
+    T = _vacuum_flight_time(vy0, height, g)
+    t = T[:, None] * frac
+    return {
+        't': t,
+        'x': vx0[:, None] * t,
+        'y': height[:, None] + vy0[:, None] * t - 0.5 * g[:, None] * t ** 2,
+        'vx': np.broadcast_to(vx0[:, None], t.shape).copy(),
+        'vy': vy0[:, None] - g[:, None] * t,
+    }
+
+
+def _linear_y(t, vy0, height, g, k):
+    vt = g / k  # terminal speed
+    return height + (vy0 + vt) / k * -np.expm1(-k * t) - vt * t
+
+
+def _linear(vx0, vy0, height, g, k, frac):
+    # y(t) is concave, so bisect between the apex and a point below ground.
+    vt = g / k
+    lo = np.maximum(np.log1p(np.maximum(vy0, 0) / vt) / k, 0)
+    hi = np.maximum(_vacuum_flight_time(vy0, height, g), lo) + 1e-12
+    while True:
+        above = _linear_y(hi, vy0, height, g, k) > 0
+        if not above.any():
+            break
+        hi = np.where(above, 2 * hi, hi)
+    for _ in range(64):
+        mid = 0.5 * (lo + hi)
+        above = _linear_y(mid, vy0, height, g, k) > 0
+        lo = np.where(above, mid, lo)
+        hi = np.where(above, hi, mid)
+    T = np.where(_linear_y(lo, vy0, height, g, k) > 0, hi, lo)
+
+    t = T[:, None] * frac
+    kc, vtc = k[:, None], vt[:, None]
+    decay = np.exp(-kc * t)
+    return {
+        't': t,
+        'x': vx0[:, None] / kc * -np.expm1(-kc * t),
+        'y': _linear_y(t, vy0[:, None], height[:, None], g[:, None], kc),
+        'vx': vx0[:, None] * decay,
+        'vy': (vy0[:, None] + vtc) * decay - vtc,
+    }
+
+
+def _rk4_step(state, dt, g, c):
+    def deriv(s):
+        x, y, vx, vy = s
+        speed = np.hypot(vx, vy)
+        return np.stack((vx, vy, -c * speed * vx, -g - c * speed * vy))
+
+    k1 = deriv(state)
+    k2 = deriv(state + 0.5 * dt * k1)
+    k3 = deriv(state + 0.5 * dt * k2)
+    k4 = deriv(state + dt * k3)
+    return state + dt / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+
+def _quadratic(vx0, vy0, height, g, c, frac, resolution=1000):
+    n = vx0.size
+    start = np.stack((np.zeros(n), height, vx0, vy0))
+
+    # Pass 1: find each landing time on a per-shot step size.
+    dt = np.maximum(_vacuum_flight_time(vy0, height, g), 1e-9) / resolution
+    T = np.where(_vacuum_flight_time(vy0, height, g) > 0, np.nan, 0.0)
+    state, t = start.copy(), np.zeros(n)
+    for _ in range(50 * resolution):
+        flying = np.isnan(T)
+        if not flying.any():
+            break
+        new = _rk4_step(state, dt, g, c)
+        landed = flying & (new[1] <= 0)
+        # Linear interpolation of the ground crossing inside the last step.
+        share = state[1] / np.where(landed, state[1] - new[1], 1)
+        T = np.where(landed, t + share * dt, T)
+        state = np.where(flying, new, state)
+        t = t + dt
+    T = np.where(np.isnan(T), t, T)
+
+    # Pass 2: integrate again on a grid that hits every output sample.
+    samples = frac.shape[-1]
+    substeps = max(1, math.ceil(resolution / max(samples - 1, 1)))
+    dt = T / (max(samples - 1, 1) * substeps)
+    out = np.empty((4, n, samples))
+    state = start.copy()
+    out[:, :, 0] = state
+    for i in range(1, samples):
+        for _ in range(substeps):
+            state = _rk4_step(state, dt, g, c)
+        out[:, :, i] = state
+    return {'t': T[:, None] * frac, 'x': out[0], 'y': out[1], 'vx': out[2], 'vy': out[3]}
+
+
+def trajectories(speed, angle, height=0.0, gravity=9.80665, drag='none',
+                 drag_coefficient=0.0, samples=100):
+    """Sample the paths of a batch of launches (angles in degrees)."""
+    if drag not in DRAG_MODELS:
+        raise ValueError(f"drag must be one of {', '.join(DRAG_MODELS)}")
+    if samples < 2:
+        raise ValueError('samples must be at least 2')
+
+    arrays = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in
+                                   (speed, angle, height, gravity, drag_coefficient)))
+    shape = arrays[0].shape
+    speed, angle, height, g, k = (a.ravel() for a in arrays)
+    if (speed < 0).any() or (height < 0).any():
+        raise ValueError('speed and height must not be negative')
+    if (g <= 0).any():
+        raise ValueError('gravity must be positive')
+    if drag != 'none' and (k <= 0).any():
+        raise ValueError('drag_coefficient must be positive when drag is enabled')
+
+    theta = np.radians(angle)
+    vx0, vy0 = speed * np.cos(theta), speed * np.sin(theta)
+    frac = np.linspace(0.0, 1.0, samples)
+    solver = {'none': _vacuum, 'linear': _linear, 'quadratic': _quadratic}[drag]
+    path = solver(vx0, vy0, height, g, k, frac)
+
+    result = {key: value.reshape(shape + (samples,)) for key, value in path.items()}
+    result['flight_time'] = path['t'][:, -1].reshape(shape)
+    result['range'] = path['x'][:, -1].reshape(shape)
+    # Vacuum and linear-drag apexes are analytic; the sampled max is
+    # within one sample spacing for quadratic drag.
+    if drag == 'none':
+        apex = height + np.maximum(vy0, 0) ** 2 / (2 * g)
+    elif drag == 'linear':
+        apex = _linear_y(np.log1p(np.maximum(vy0, 0) * k / g) / k, vy0, height, g, k)
+    else:
+        apex = path['y'].max(axis=-1)
+    result['max_height'] = apex.reshape(shape)
+    return result
@@ -0,0 +1,180 @@
+"""Units and dimensions shared by the calculators, the converters and the API.
+
+A unit is a scale factor (and, for °C / °F, an offset) to SI together with
+its dimension, the exponents of the SI base quantities (length, mass,
+time, current, temperature, amount).  ``unit()`` parses compound symbols
+as the calculators write them:
+
+    'm/s²'  'J/mol·K'  'W/m·K'  'Pa·m⁶/mol²'  'kJ/kg'  '1/m³'  'N*m^2'
+
+Everything after the '/' is the denominator, so 'J/mol·K' is
+J / (mol·K).  Named units take SI prefixes ('kPa', 'µs', 'MeV').  Offsets
+only apply to a temperature on its own; inside a compound ('J/kg·°C') a
+degree is a temperature difference.
+
+Parsing and the dimension check happen once per pair of symbols:
+``converter()`` is cached and returns the ``(scale, shift)`` that
+``convert()`` then applies to whole arrays.  ``GROUPS`` lists the units the
+converter pages offer, and ``TABLES`` their precomputed factors to SI.
+"""
+import functools
+import math
+import re
+from collections import namedtuple
+
+import numpy as np
+
+import constants
+
+BASE = ('m', 'kg', 's', 'A', 'K', 'mol')
+DIMENSION_SYMBOLS = ('L', 'M', 'T', 'I', 'Θ', 'N')
+
+Unit = namedtuple('Unit', 'factor offset dimension')
+
+
+class UnitError(ValueError):
+    """Unknown unit symbol or conversion between different dimensions."""
+
+
+def _dim(**exponents):
+    return tuple(exponents.get(name, 0) for name in BASE)
+
+
+NONE = _dim()
+
+# symbol -> (factor to SI, dimension or defining expression, offset)
+_ATOMS = {
+    'm': (1.0, _dim(m=1)), 'g': (1e-3, _dim(kg=1)), 's': (1.0, _dim(s=1)),
+    'A': (1.0, _dim(A=1)), 'K': (1.0, _dim(K=1)), 'mol': (1.0, _dim(mol=1)),
+    # derived SI
+    'N': (1.0, 'kg·m/s²'), 'J': (1.0, 'N·m'), 'W': (1.0, 'J/s'), 'Pa': (1.0, 'N/m²'),
+    'Hz': (1.0, '1/s'), 'C': (1.0, 'A·s'), 'V': (1.0, 'W/A'), 'Ω': (1.0, 'V/A'),
+    'F': (1.0, 'C/V'), 'T': (1.0, 'kg/A·s²'), 'Wb': (1.0, 'V·s'), 'H': (1.0, 'Wb/A'),
+    'S': (1.0, 'A/V'), 'L': (1e-3, 'm³'), 'eV': (constants.EV, 'J'),
+    'rad': (1.0, NONE), 'sr': (1.0, NONE),
+    # not prefixed
+    '%': (0.01, NONE), 'deg': (math.pi / 180, NONE), '°': (math.pi / 180, NONE),
+    'min': (60.0, 's'), 'h': (3600.0, 's'), 'day': (86400.0, 's'), 'yr': (3.15576e7, 's'),
+    'in': (0.0254, 'm'), 'ft': (0.3048, 'm'), 'yd': (0.9144, 'm'), 'mi': (1609.344, 'm'),
+    'nmi': (1852.0, 'm'), 'Å': (1e-10, 'm'), 'au': (1.495978707e11, 'm'),
+    'mph': (0.44704, 'm/s'), 'knot': (1852 / 3600, 'm/s'),
+    'lb': (0.45359237, 'kg'), 'oz': (0.028349523125, 'kg'), 't': (1000.0, 'kg'),
+    'u': (constants.AMU, 'kg'),
+    'gal': (3.785411784e-3, 'm³'), 'ha': (1e4, 'm²'),
+    'dyn': (1e-5, 'N'), 'lbf': (4.4482216152605, 'N'),
+    'erg': (1e-7, 'J'), 'cal': (4.184, 'J'), 'Btu': (1055.05585262, 'J'), 'Wh': (3600.0, 'J'),
+    'hp': (745.69987158227, 'W'),
+    'bar': (1e5, 'Pa'), 'atm': (101325.0, 'Pa'), 'psi': (6894.757293168, 'Pa'),
+    'mmHg': (133.322387415, 'Pa'), 'Torr': (101325 / 760, 'Pa'),
+    'M': (1000.0, 'mol/m³'),
+    '°C': (1.0, 'K', 273.15), '°F': (5 / 9, 'K', 273.15 - 32 * 5 / 9), '°R': (5 / 9, 'K'),
+}
+_PREFIXABLE = {'m', 'g', 's', 'A', 'K', 'mol', 'M', 'N', 'J', 'W', 'Pa', 'Hz', 'C', 'V', 'Ω', 'F',
+               'T', 'Wb', 'H', 'S', 'L', 'eV', 'cal', 'Wh', 'bar', 'rad'}
+_PREFIXES = {'Y': 1e24, 'Z': 1e21, 'E': 1e18, 'P': 1e15, 'T': 1e12, 'G': 1e9, 'M': 1e6,
+             'k': 1e3, 'h': 1e2, 'da': 1e1, 'd': 1e-1, 'c': 1e-2, 'm': 1e-3, 'µ': 1e-6,
+             'μ': 1e-6, 'u': 1e-6, 'n': 1e-9, 'p': 1e-12, 'f': 1e-15, 'a': 1e-18}
+
+_SUPERSCRIPTS = str.maketrans('⁰¹²³⁴⁵⁶⁷⁸⁹⁻', '0123456789-')
+_FACTOR = re.compile(r'^(.*?)(?:\^?(-?\d+))?$')
+_SEPARATORS = re.compile(r'[·*⋅ ]+')
+
+# Units offered by the converter pages, first the SI (or reference) unit.
+GROUPS = {
+    'length': ('m', 'km', 'cm', 'mm', 'µm', 'nm', 'Å', 'in', 'ft', 'yd', 'mi', 'nmi'),
+    'mass': ('kg', 'g', 'mg', 't', 'lb', 'oz', 'u'),
+    'time': ('s', 'ms', 'µs', 'min', 'h', 'day', 'yr'),
+    'speed': ('m/s', 'km/h', 'cm/s', 'mph', 'ft/s', 'knot'),
+    'volume': ('m³', 'L', 'mL', 'cm³', 'gal', 'ft³'),
+    'energy': ('J', 'kJ', 'MJ', 'cal', 'kcal', 'eV', 'keV', 'erg', 'Wh', 'kWh', 'Btu'),
+    'power': ('W', 'kW', 'MW', 'hp'),
+    'pressure': ('Pa', 'kPa', 'MPa', 'bar', 'atm', 'psi', 'mmHg', 'Torr'),
+    'force': ('N', 'kN', 'dyn', 'lbf'),
+    'temperature': ('K', '°C', '°F', '°R'),
+}
+
+
+def _atom(symbol):
+    """(factor, dimension, offset) of a single named unit, with an optional prefix."""
+    if symbol in _ATOMS:
+        factor, definition, *offset = _ATOMS[symbol]
+        if not isinstance(definition, tuple):
+            inner = unit(definition)
+            factor, definition = factor * inner.factor, inner.dimension
+        return factor, definition, offset[0] if offset else 0.0
+    for prefix, scale in _PREFIXES.items():
+        rest = symbol[len(prefix):]
+        if symbol.startswith(prefix) and rest in _PREFIXABLE:
+            factor, dimension, _ = _atom(rest)
+            return scale * factor, dimension, 0.0
+    raise UnitError(f"Unknown unit '{symbol}'")
+
+
+def _product(text, sign):
+    factor, dimension, offsets = 1.0, [0] * len(BASE), []
+    for part in _SEPARATORS.split(text.strip()):
+        if part in ('', '1'):
+            continue
+        symbol, power = _FACTOR.match(part.translate(_SUPERSCRIPTS)).groups()
+        power = sign * int(power or 1)
+        f, d, offset = _atom(symbol)
+        factor *= f ** power
+        dimension = [a + b * power for a, b in zip(dimension, d)]
+        offsets.append((offset, power))
+    return factor, dimension, offsets
+
+
+@functools.lru_cache(maxsize=1024)
+def unit(symbol):
+    """Parse a unit symbol into a ``Unit``; '' is dimensionless."""
+    if not isinstance(symbol, str):
+        raise UnitError('units must be strings')
+    numerator, _, denominator = symbol.partition('/')
+    factor, dimension, offsets = _product(numerator, 1)
+    if denominator:
+        f, d, o = _product(denominator, -1)
+        factor *= f
+        dimension = [a + b for a, b in zip(dimension, d)]
+        offsets += o
+    offset = offsets[0][0] if len(offsets) == 1 and offsets[0][1] == 1 else 0.0
+    return Unit(factor, offset, tuple(dimension))
+
+
+def dimension(symbol):
+    """The dimension of ``symbol`` written out, e.g. 'L·T⁻²' for 'm/s²'."""
+    parts = []
+    for name, power in zip(DIMENSION_SYMBOLS, unit(symbol).dimension):
+        if power:
+            exp = '' if power == 1 else str(power).translate(str.maketrans('0123456789-', '⁰¹²³⁴⁵⁶⁷⁸⁹⁻'))
+            parts.append(name + exp)
+    return '·'.join(parts) or '1'
+
+
+@functools.lru_cache(maxsize=4096)
+def converter(source, target):
+    """``(scale, shift)`` with value_target = value_source · scale + shift."""
+    a, b = unit(source), unit(target)
+    if a.dimension != b.dimension:
+        raise UnitError(f"Cannot convert {source or 'dimensionless'} ({dimension(source)}) "
+                        f"to {target or 'dimensionless'} ({dimension(target)})")
+    # Round off the last bit that chains of factors like (0.01)³ pick up.
+    scale = float(f'{a.factor / b.factor:.15g}')
+    return scale, float(f'{(a.offset - b.offset) / b.factor:.15g}')
+
+
+def convert(values, source, target):
+    """``values`` (scalar or array) in ``source`` units, expressed in ``target``."""
+    scale, shift = converter(source, target)
+    if isinstance(values, (int, float)):
+        return values * scale + shift
+    values = np.asarray(values, dtype=float)
+    return values * scale + shift if shift else values * scale
+
+
+def rates(aliases, base):
+    """``{key: factor to base}`` for ``{key: unit symbol}``, for the converter pages."""
+    return {key: converter(symbol, base)[0] for key, symbol in aliases.items()}
+
+
+TABLES = {group: {symbol: unit(symbol)[:2] for symbol in symbols}
+          for group, symbols in GROUPS.items()}
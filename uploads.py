@@ -0,0 +1,79 @@
+"""Numeric data uploads, read in bounded chunks.
+
+An upload is a ``.npy`` array or text: numbers separated by whitespace or
+commas, one row per line.  ``read_chunks()`` yields it a block at a time,
+so files far larger than memory can be reduced on the fly.  Flat reads
+yield 1-D arrays in file order; row reads yield ``(rows, columns)`` blocks
+of whole rows.
+"""
+import io
+import math
+
+import numpy as np
+
+READ_SIZE = 1 << 20  # bytes parsed at once
+
+
+def _read_npy(stream, read_size, rows):
+    version = np.lib.format.read_magic(stream)
+    read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                   else np.lib.format.read_array_header_2_0)
+    shape, fortran, dtype = read_header(stream)
+    width = math.prod(shape[1:]) if rows else 1
+    if rows and (len(shape) < 2 or fortran):
+        raise ValueError('upload a 2-D array in C order')
+    remaining = math.prod(shape) // width if width else 0
+    count = max(1, read_size // (dtype.itemsize * width))
+    while remaining:
+        n = min(count, remaining)
+        size = n * width * dtype.itemsize
+        data = stream.read(size)
+        if len(data) < size:
+            raise ValueError('truncated .npy file')
+        values = np.frombuffer(data, dtype).astype(float)
+        yield values.reshape(n, width) if rows else values
+        remaining -= n
+
+
+def read_chunks(stream, read_size=READ_SIZE, rows=False):
+    """Yield the numbers of an open binary file as float arrays.
+
+    With ``rows`` each block is 2-D and every row (text line, or leading
+    index of the array) must have the same length.
+    """
+    if hasattr(stream, 'seekable') and stream.seekable():
+        stream.seek(0)
+    head = stream.read(6)
+    if head == b'\x93NUMPY':
+        stream.seek(0)
+        yield from _read_npy(stream, read_size, rows)
+        return
+
+    width = None
+    tail = head
+    while True:
+        block = stream.read(read_size)
+        text = tail + block
+        if not block:
+            tail = b''
+        else:
+            # Keep a row or number cut by the block boundary for the next block.
+            cut = text.rfind(b'\n') if rows else max(text.rfind(b'\n'), text.rfind(b','),
+                                                       text.rfind(b' '))
+            text, tail = (text[:cut + 1], text[cut + 1:]) if cut >= 0 else (b'', text)
+        if text.strip():
+            text = text.replace(b',', b' ')
+            try:
+                if rows:
+                    values = np.loadtxt(io.BytesIO(text), ndmin=2)
+                    if width is not None and values.shape[1] != width:
+                        raise ValueError
+                    width = values.shape[1]
+                else:
+                    values = np.array(text.split(), dtype=float)
+            except ValueError:
+                raise ValueError('uploads must contain only numbers'
+                                 + (', the same count on every line' if rows else '')) from None
+            yield values
+        if not block:
+            return